@@ -12,6 +12,7 @@ from billing.models import (
     Payment,
     SiteConfiguration,
 )
+from core.models import HistoryLog
 
 admin.site.register(EnrollmentType)
 
@@ -153,7 +154,12 @@ class PaymentAdmin(admin.ModelAdmin):
 
     # Admin actions
     def mark_as_completed(self, request, queryset):
+        newly_completed = list(queryset.exclude(payment_status="completed").select_related("student"))
         updated = queryset.update(payment_status="completed", payment_date=date.today())
+        HistoryLog.log_many(
+            (("payment_completed", f"Pago completado: {p.student.full_name} (€{p.amount})") for p in newly_completed),
+            icon="paid",
+        )
         self.message_user(request, f"{updated} payments marked as completed.")
 
     mark_as_completed.short_description = "Mark selected payments as completed"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "comms"
+
+    def ready(self):
+        from comms import signals  # noqa: F401
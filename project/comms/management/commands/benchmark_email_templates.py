@@ -0,0 +1,99 @@
+"""
+Mide la latencia de render de cada plantilla de email.
+
+Renderiza todas las plantillas de core/templates/emails/ N veces con contextos
+representativos (los mismos datos de ``test_all_emails``) y muestra, por plantilla,
+el primer render (compilacion si la cache del loader estaba fria) y la media y el p95
+de los renders siguientes. Sirve para detectar regresiones al editar plantillas.
+No envia emails ni toca la base de datos.
+
+Uso:
+    python manage.py benchmark_email_templates
+    python manage.py benchmark_email_templates --iterations 500 --only happy_birthday,fun_friday
+    python manage.py benchmark_email_templates --warm-up   # Primer render con la cache ya caliente
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from comms.management.commands.test_all_emails import get_email_apps
+from comms.services.email_service import email_template_names, warm_up_email_templates
+
+# Plantillas sin ejemplo en test_all_emails
+EXTRA_CONTEXTS = {
+    "base_email": {},
+    "newsletter": {
+        "group_name": "Grupo A",
+        "message": "Esta semana repasamos los colores.\nNo olvideis traer el libro.",
+        "newsletter_link": "https://example.com/newsletter",
+    },
+    "receipt_enrollment": {"student_name": "Alumno de Prueba", "academic_year": "2025-2026"},
+}
+
+
+def representative_contexts() -> dict[str, dict]:
+    """Contexto de ejemplo para cada plantilla de email."""
+    contexts = dict(EXTRA_CONTEXTS)
+    for app in get_email_apps():
+        contexts.setdefault(app["template"], app["context"])
+    return contexts
+
+
+class Command(BaseCommand):
+    help = "Benchmark del render de las plantillas de email (latencia por plantilla)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Renders por plantilla")
+        parser.add_argument("--only", type=str, help="Solo estas plantillas (separadas por coma)")
+        parser.add_argument(
+            "--warm-up", action="store_true", help="Precompilar antes de medir (como al arrancar un worker)"
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        if iterations < 1:
+            raise CommandError("--iterations debe ser al menos 1")
+
+        names = email_template_names()
+        if options.get("only"):
+            only = [n.strip() for n in options["only"].split(",")]
+            unknown = sorted(set(only) - set(names))
+            if unknown:
+                raise CommandError(f"Plantillas desconocidas: {', '.join(unknown)}")
+            names = [n for n in names if n in only]
+
+        if options["warm_up"]:
+            warm_up_email_templates()
+
+        contexts = representative_contexts()
+        self.stdout.write(f"{len(names)} plantillas x {iterations} renders\n")
+        self.stdout.write(f"  {'plantilla':26s} {'primero':>9s} {'media':>9s} {'p95':>9s}")
+
+        total = 0.0
+        for name in names:
+            first, timings = self._measure(name, contexts.get(name, {}), iterations)
+            total += first + sum(timings)
+            mean = statistics.fmean(timings) if timings else first
+            p95 = self._percentile(timings, 95) if timings else first
+            self.stdout.write(f"  {name:26s} {first:8.3f}ms {mean:8.3f}ms {p95:8.3f}ms")
+
+        self.stdout.write(self.style.SUCCESS(f"Total: {total:.1f}ms"))
+
+    def _measure(self, name: str, context: dict, iterations: int) -> tuple[float, list[float]]:
+        """Milisegundos del primer render y de cada render siguiente."""
+        timings = []
+        for _ in range(iterations):
+            # Mismas variables globales que EmailService.send_email
+            render_context = {"year": 2025, "site_name": "Five a Day", **context}
+            started = time.perf_counter()
+            render_to_string(f"emails/{name}.html", render_context)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings[0], timings[1:]
+
+    @staticmethod
+    def _percentile(values: list[float], percent: int) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
@@ -0,0 +1,95 @@
+"""
+Mide documentos por segundo del render de certificados fiscales.
+
+Compara el render anterior (un HTML con <style> propio y un ``HTML().write_pdf()``
+nuevo por documento, que vuelve a parsear el CSS y resolver fuentes cada vez) con
+la API por lotes actual (``render_tax_certificate_batch``: hoja de estilos parseada
+una vez y FontConfiguration compartida). Usa datos sinteticos, no toca la base de datos.
+
+Uso:
+    python manage.py benchmark_tax_certificates
+    python manage.py benchmark_tax_certificates --count 200 --students 2 --payments 10
+"""
+
+import time
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from comms.services.pdf_service import pdf_resources
+from comms.services.tax_certificate_service import (
+    CertificatePayment,
+    CertificateStudent,
+    TaxCertificate,
+    render_tax_certificate_batch,
+    render_tax_certificate_html,
+)
+
+
+def synthetic_certificates(count: int, students: int, payments: int, year: int = 2025) -> list[TaxCertificate]:
+    """Certificados de prueba con `students` hijos y `payments` pagos por hijo."""
+    certificates = []
+    for i in range(count):
+        children = []
+        for s in range(students):
+            rows = [
+                CertificatePayment(
+                    date=date(year, 1 + p % 12, 5),
+                    concept=f"Mensualidad {p + 1}",
+                    payment_type="Monthly Fee",
+                    amount=Decimal("54.00"),
+                )
+                for p in range(payments)
+            ]
+            children.append(CertificateStudent(name=f"Estudiante {i}-{s}", payments=rows, total=Decimal(54 * payments)))
+        certificates.append(
+            TaxCertificate(
+                parent_id=i,
+                parent_name=f"Padre {i}",
+                parent_dni=f"{i:08d}X",
+                parent_email=f"padre{i}@example.com",
+                year=year,
+                students=children,
+                total=sum((c.total for c in children), Decimal("0.00")),
+            )
+        )
+    return certificates
+
+
+class Command(BaseCommand):
+    help = "Benchmark del render de certificados fiscales (documentos/segundo, antes y despues)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100, help="Certificados a renderizar")
+        parser.add_argument("--students", type=int, default=2, help="Estudiantes por certificado")
+        parser.add_argument("--payments", type=int, default=10, help="Pagos por estudiante")
+
+    def handle(self, *args, **options):
+        certificates = synthetic_certificates(options["count"], options["students"], options["payments"])
+        resources = pdf_resources()
+        if resources is None:
+            self.stdout.write(self.style.WARNING("weasyprint no disponible: solo se mide la generacion de HTML"))
+
+        self.stdout.write(f"{len(certificates)} certificados, {options['students']}x{options['payments']} pagos")
+        before = self._measure("antes (CSS y fuentes por documento)", self._render_naive, certificates)
+        after = self._measure("despues (lote, CSS y fuentes compartidos)", render_tax_certificate_batch, certificates)
+        self.stdout.write(self.style.SUCCESS(f"Mejora: x{after / before:.2f}"))
+
+    def _measure(self, label, render, certificates):
+        started = time.perf_counter()
+        render(certificates)
+        elapsed = time.perf_counter() - started
+        docs_per_second = len(certificates) / elapsed if elapsed else float("inf")
+        self.stdout.write(f"  {label}: {docs_per_second:.1f} docs/s ({elapsed:.2f}s)")
+        return docs_per_second
+
+    def _render_naive(self, certificates):
+        resources = pdf_resources()
+        HTML = resources[0] if resources else None
+
+        for certificate in certificates:
+            html_content = render_tax_certificate_html(certificate, inline_css=True)
+            if HTML is not None:
+                HTML(string=html_content).write_pdf(BytesIO())
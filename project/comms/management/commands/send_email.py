@@ -11,9 +11,10 @@ Uso:
 """
 
 import json
-from datetime import date, datetime
+from datetime import datetime
 
 from django.conf import settings
+from django.core.mail import get_connection
 from django.core.management.base import BaseCommand, CommandError
 
 from comms.services.email_functions import (
@@ -25,6 +26,7 @@ from comms.services.email_functions import (
     send_vacation_closure_email,
 )
 from comms.services.email_service import email_service
+from comms.services.recipient_service import AUDIENCE_BIRTHDAY_TODAY, resolve_recipients
 from students.models import Parent, Student
 
 
@@ -119,27 +121,24 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("Email enviado") if success else self.style.ERROR("Error al enviar"))
 
     def send_birthday_emails(self):
-        today = date.today()
-        birthday_students = Student.objects.filter(
-            birth_date__month=today.month, birth_date__day=today.day, active=True
-        ).prefetch_related("parents")
-        if not birthday_students.exists():
+        recipients = resolve_recipients(AUDIENCE_BIRTHDAY_TODAY, is_adult=None)
+        if not recipients:
             self.stdout.write(self.style.WARNING("No hay cumpleaños hoy"))
             return
         sent, failed = 0, 0
-        for student in birthday_students:
-            parent = student.parents.exclude(email="").exclude(email__isnull=True).first()
-            if not parent:
-                failed += 1
-                continue
-            success = email_service.send_email(
-                template_name="happy_birthday",
-                recipients=parent.email,
-                subject=f"¡Feliz Cumpleaños {student.first_name}!",
-                context={"name": student.first_name},
-            )
-            sent += 1 if success else 0
-            failed += 0 if success else 1
+        with get_connection() as connection:
+            for recipient in recipients:
+                for student in recipient.students:
+                    success = email_service.send_email(
+                        template_name="happy_birthday",
+                        recipients=recipient.email,
+                        subject=f"¡Feliz Cumpleaños {student.first_name}!",
+                        context={"name": student.first_name},
+                        fail_silently=True,
+                        connection=connection,
+                    )
+                    sent += 1 if success else 0
+                    failed += 0 if success else 1
         self.stdout.write(self.style.SUCCESS(f"Resultado: {sent} enviados, {failed} fallidos"))
 
     def send_monthly_reports(self):
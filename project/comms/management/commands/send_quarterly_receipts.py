@@ -0,0 +1,79 @@
+"""
+Envía los recibos trimestrales a todas las familias con pagos completados en el trimestre.
+
+Mismo pipeline que el formulario de recibos, pero los PDFs se renderizan en
+paralelo (un proceso por núcleo por defecto) y se envían a medida que salen del
+pool, sobre una única conexión SMTP.
+
+Uso:
+    python manage.py send_quarterly_receipts octubre noviembre diciembre
+    python manage.py send_quarterly_receipts octubre noviembre diciembre --workers 4
+    python manage.py send_quarterly_receipts enero febrero marzo --on 2026-04-01 --dry-run
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from comms.services.pdf_service import STAGE_RENDER, default_workers
+from comms.services.receipt_service import load_quarterly_receipts, run_quarterly_receipt_pipeline
+from core.constants import MESES_ES
+
+
+class Command(BaseCommand):
+    help = "Genera en paralelo y envía los recibos trimestrales de todas las familias"
+
+    def add_arguments(self, parser):
+        parser.add_argument("months", nargs=3, help="Los tres meses del trimestre (p.ej. octubre noviembre diciembre)")
+        parser.add_argument(
+            "--on",
+            type=date.fromisoformat,
+            default=None,
+            help="Fecha de referencia para deducir el año del trimestre (por defecto hoy)",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Procesos de render de PDF (por defecto uno por núcleo)"
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=25, help="Mostrar progreso cada N recibos (0 = nunca)"
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Muestra cuántos recibos se enviarían")
+
+    def handle(self, *args, **options):
+        months = [month.strip().lower() for month in options["months"]]
+        unknown = [month for month in months if month not in MESES_ES]
+        if unknown:
+            raise CommandError(f"Mes no válido: {', '.join(unknown)}")
+        workers = default_workers() if options["workers"] is None else options["workers"]
+        if workers < 1:
+            raise CommandError("--workers debe ser al menos 1")
+        quarter = "/".join(months)
+
+        if options["dry_run"]:
+            receipts = load_quarterly_receipts(months, options["on"])
+            with_email = sum(1 for r in receipts if r.parent_email)
+            self.stdout.write(
+                f"{quarter}: {len(receipts)} familia(s) con pagos, {with_email} con email, "
+                f"{len(receipts) - with_email} sin email"
+            )
+            return
+
+        self.stdout.write(f"Recibos {quarter} con {workers} proceso(s) de render...")
+        every = options["progress_every"]
+        started = time.monotonic()
+
+        def on_progress(stage, done, total):
+            if every and (done % every == 0 or done == total):
+                label = "Renderizados" if stage == STAGE_RENDER else "Enviados"
+                self.stdout.write(f"  {label} {done}/{total}")
+
+        results = run_quarterly_receipt_pipeline(months, options["on"], workers=workers, on_progress=on_progress)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resultado: {results['sent']} enviados, {results['skipped']} omitidos, "
+                f"{results['failed']} fallidos ({elapsed:.1f}s)"
+            )
+        )
@@ -0,0 +1,67 @@
+"""
+Envía los certificados fiscales del año a todos los padres con pagos completados.
+
+Los PDFs se renderizan en paralelo (un proceso por núcleo por defecto) y se
+envían a medida que salen del pool, sobre una única conexión SMTP.
+
+Uso:
+    python manage.py send_tax_certificates                  # Año anterior, un proceso por núcleo
+    python manage.py send_tax_certificates --year 2025 --workers 4
+    python manage.py send_tax_certificates --dry-run        # Solo cuenta destinatarios
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from comms.services.pdf_service import STAGE_RENDER, default_workers
+from comms.services.tax_certificate_service import load_tax_certificates, run_tax_certificate_pipeline
+
+
+class Command(BaseCommand):
+    help = "Genera en paralelo y envía los certificados fiscales del año"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Año fiscal (por defecto el anterior)")
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Procesos de render de PDF (por defecto uno por núcleo)"
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=25, help="Mostrar progreso cada N certificados (0 = nunca)"
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Muestra cuántos certificados se enviarían")
+
+    def handle(self, *args, **options):
+        year = options["year"] or date.today().year - 1
+        workers = default_workers() if options["workers"] is None else options["workers"]
+        if workers < 1:
+            raise CommandError("--workers debe ser al menos 1")
+
+        if options["dry_run"]:
+            certificates = load_tax_certificates(year)
+            with_email = sum(1 for c in certificates if c.parent_email)
+            self.stdout.write(
+                f"{year}: {len(certificates)} padre(s) con pagos, {with_email} con email, "
+                f"{len(certificates) - with_email} sin email"
+            )
+            return
+
+        self.stdout.write(f"Certificados fiscales {year} con {workers} proceso(s) de render...")
+        every = options["progress_every"]
+        started = time.monotonic()
+
+        def on_progress(stage, done, total):
+            if every and (done % every == 0 or done == total):
+                label = "Renderizados" if stage == STAGE_RENDER else "Enviados"
+                self.stdout.write(f"  {label} {done}/{total}")
+
+        results = run_tax_certificate_pipeline(year, workers=workers, on_progress=on_progress)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resultado: {results['sent']} enviados, {results['skipped']} omitidos, "
+                f"{results['failed']} fallidos ({elapsed:.1f}s)"
+            )
+        )
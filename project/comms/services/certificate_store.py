@@ -0,0 +1,173 @@
+"""
+Almacen de documentos generados (certificados fiscales, recibos), direccionado por contenido.
+
+Cada documento se guarda en el storage por defecto (disco en local, S3/objeto en
+produccion) bajo ``<document.store_dir>/<digest>.<ext>``, donde ``digest`` es el
+SHA-256 de ``document.digest_payload()`` (titular y filas de pago incluidas). Si los
+pagos no cambian, el mismo digest apunta al PDF ya generado y no se vuelve a invocar
+WeasyPrint; cualquier cambio en un pago del documento produce otro digest, asi que
+nunca se sirve un documento desactualizado.
+
+Las versiones anteriores de un documento se borran al guardar una nueva y via signal
+(comms/signals.py) cuando cambia un pago que aparece en el: certificados fiscales del
+ano del pago (``purge_certificates``) y recibos de su trimestre (``purge_receipts``).
+
+Uso:
+    from comms.services.certificate_store import get_or_render
+    from comms.services.tax_certificate_service import render_tax_certificate_batch
+
+    rendered = get_or_render(certificate, render_tax_certificate_batch)  # del store o recien generado
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Callable, Iterable, Iterator
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from comms.services.pdf_service import EXTENSIONS, MIMETYPES, RenderedDocument
+
+logger = logging.getLogger(__name__)
+
+STORE_PREFIX = "tax_certificates"
+
+# Subir al cambiar el diseno de los documentos para que no se sirvan PDFs antiguos
+RENDER_VERSION = 2
+
+RenderBatch = Callable[[list], list[RenderedDocument]]
+
+
+def document_digest(document) -> str:
+    """SHA-256 de todo lo que aparece en el documento."""
+    payload = {"version": RENDER_VERSION, "document": document.digest_payload()}
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def certificate_dir(parent_id: int, year: int) -> str:
+    return f"{STORE_PREFIX}/{year}/{parent_id}"
+
+
+def document_path(document, extension: str, digest: str | None = None) -> str:
+    digest = digest or document_digest(document)
+    return f"{document.store_dir}/{digest}.{extension}"
+
+
+def find_stored(document) -> tuple[str, str] | None:
+    """Ruta y mimetype del documento almacenado para estos pagos, o None."""
+    digest = document_digest(document)
+    for extension, mimetype in MIMETYPES.items():
+        path = document_path(document, extension, digest)
+        if default_storage.exists(path):
+            return path, mimetype
+    return None
+
+
+def get_stored(document) -> RenderedDocument | None:
+    """Documento almacenado para estos pagos, o None si hay que generarlo."""
+    stored = find_stored(document)
+    if stored is None:
+        return None
+    path, mimetype = stored
+    with default_storage.open(path, "rb") as f:
+        return RenderedDocument(document, f.read(), mimetype)
+
+
+def store_document(rendered: RenderedDocument) -> str | None:
+    """
+    Guarda un documento renderizado y borra sus versiones anteriores.
+
+    Returns:
+        Ruta en el storage, o None si el render fallo
+    """
+    if rendered.error:
+        return None
+    document = rendered.document
+    path = document_path(document, EXTENSIONS[rendered.mimetype])
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(rendered.content))
+    purge_dir(document.store_dir, keep=path)
+    return path
+
+
+def get_or_render(document, render_batch: RenderBatch) -> RenderedDocument:
+    """Sirve el documento desde el store; si no esta (o los pagos cambiaron), lo genera y guarda."""
+    stored = get_stored(document)
+    if stored is not None:
+        return stored
+    rendered = render_batch([document])[0]
+    store_document(rendered)
+    return rendered
+
+
+def ensure_stored(document, render_batch: RenderBatch) -> tuple[str, str] | None:
+    """Ruta y mimetype del documento en el store, generandolo si hace falta (None si el render falla)."""
+    stored = find_stored(document)
+    if stored is not None:
+        return stored
+    rendered = render_batch([document])[0]
+    path = store_document(rendered)
+    if path is None:
+        logger.error(f"Error generando {document.filename_stem}: {rendered.error}")
+        return None
+    return path, rendered.mimetype
+
+
+def render_with_store(
+    documents: list,
+    render: Callable[[list], Iterable[RenderedDocument]],
+) -> Iterator[RenderedDocument]:
+    """
+    Renderiza solo los documentos que faltan en el store y guarda cada uno nuevo.
+
+    Los nuevos salen primero (mientras se envian, el pool sigue renderizando); los ya
+    almacenados se leen del store al final. Si un signal borra alguno entre la
+    comprobacion y la lectura, se vuelve a renderizar en vez de devolver None.
+
+    Args:
+        documents: Documentos a servir
+        render: Render de una lista de documentos (p.ej. render paralelo del pipeline)
+    """
+    missing = [d for d in documents if find_stored(d) is None]
+    missing_ids = {id(d) for d in missing}
+
+    for item in render(missing):
+        store_document(item)
+        yield item
+
+    purged = []
+    for document in documents:
+        if id(document) not in missing_ids:
+            stored = get_stored(document)
+            if stored is None:
+                purged.append(document)
+            else:
+                yield stored
+
+    if purged:
+        for item in render(purged):
+            store_document(item)
+            yield item
+
+
+def purge_dir(directory: str, keep: str | None = None) -> int:
+    """Borra los documentos almacenados en `directory`, salvo `keep`. Devuelve cuantos."""
+    try:
+        _, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+    deleted = 0
+    for name in files:
+        path = f"{directory}/{name}"
+        if path != keep:
+            default_storage.delete(path)
+            deleted += 1
+    return deleted
+
+
+def purge_certificates(parent_id: int, year: int) -> int:
+    """Borra los certificados fiscales almacenados de un (padre, ano)."""
+    return purge_dir(certificate_dir(parent_id, year))
@@ -276,18 +276,25 @@ def send_payment_reminder_email(
 
 
 def send_quarterly_receipt_email(
-    parent_email: str, student_name: str, month_1: str, month_2: str, month_3: str, receipt_pdf: tuple = None
+    parent_email: str,
+    student_name: str,
+    month_1: str,
+    month_2: str,
+    month_3: str,
+    receipt_pdf: tuple = None,
+    connection=None,
 ) -> bool:
     """
     Envia recibo trimestral para ninos.
 
     Args:
         parent_email: Email del padre/tutor
-        student_name: Nombre del estudiante
+        student_name: Nombre del estudiante (o de los hermanos, un email por familia)
         month_1: Primer mes del trimestre
         month_2: Segundo mes del trimestre
         month_3: Tercer mes del trimestre
         receipt_pdf: Tupla (filename, content, mimetype) con el recibo PDF
+        connection: Conexion SMTP compartida (envios por lotes)
 
     Returns:
         True si se envio correctamente
@@ -306,6 +313,7 @@ def send_quarterly_receipt_email(
         },
         attachments=attachments,
         fail_silently=True,
+        connection=connection,
     )
 
 
@@ -368,156 +376,51 @@ def send_vacation_closure_email(
 # ============================================================================
 
 
+def _empty_tax_certificate(parent, year: int):
+    """Certificado sin pagos (total 0) para un padre."""
+    from decimal import Decimal
+
+    from comms.services.tax_certificate_service import TaxCertificate
+
+    return TaxCertificate(
+        parent_id=parent.id,
+        parent_name=parent.full_name,
+        parent_dni=parent.dni,
+        parent_email=(parent.email or "").strip(),
+        year=year,
+        students=[],
+        total=Decimal("0.00"),
+    )
+
+
 def generate_tax_certificate_pdf(parent, year: int) -> bytes:
     """
     Genera un PDF con el certificado fiscal para la declaracion de la renta.
     Incluye todos los pagos realizados por el padre durante el ano.
+    Si los pagos no cambiaron, se devuelve el PDF del certificate_store.
 
     Args:
         parent: Instancia del modelo Parent
         year: Ano fiscal
 
     Returns:
-        Bytes del PDF generado
+        Bytes del PDF generado (HTML si weasyprint no esta instalado)
     """
-    from decimal import Decimal
-    from io import BytesIO
-
-    from billing.models import Payment
-
-    # Obtener todos los pagos completados del padre en ese ano
-    payments = (
-        Payment.objects.filter(parent=parent, payment_status="completed", payment_date__year=year)
-        .select_related("student")
-        .order_by("payment_date")
+    from comms.services.certificate_store import get_or_render
+    from comms.services.tax_certificate_service import (
+        load_tax_certificates,
+        render_tax_certificate,
+        render_tax_certificate_batch,
     )
 
-    # Agrupar pagos por estudiante
-    students_data = {}
-    total_year = Decimal("0.00")
-
-    for payment in payments:
-        student_name = payment.student.full_name
-        if student_name not in students_data:
-            students_data[student_name] = {"payments": [], "total": Decimal("0.00")}
-
-        students_data[student_name]["payments"].append(
-            {
-                "date": payment.payment_date,
-                "concept": payment.concept,
-                "amount": payment.amount,
-                "payment_type": payment.get_payment_type_display(),
-            }
-        )
-        students_data[student_name]["total"] += payment.amount
-        total_year += payment.amount
-
-    # Generar HTML del certificado
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; font-size: 12px; }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .header h1 {{ color: #4F46E5; margin-bottom: 5px; }}
-            .header p {{ color: #666; }}
-            .info-box {{ background: #f5f5f5; padding: 15px; margin: 20px 0; border-radius: 5px; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 15px 0; }}
-            th {{ background: #4F46E5; color: white; padding: 10px; text-align: left; }}
-            td {{ padding: 8px; border-bottom: 1px solid #ddd; }}
-            .total-row {{ font-weight: bold; background: #e8e8e8; }}
-            .student-section {{ margin: 25px 0; }}
-            .student-name {{ color: #4F46E5; font-size: 14px; font-weight: bold; margin-bottom: 10px; }}
-            .grand-total {{ font-size: 16px; text-align: right; margin-top: 30px; padding: 15px; background: #4F46E5; color: white; }}
-            .footer {{ margin-top: 40px; font-size: 10px; color: #666; text-align: center; }}
-            .legal {{ margin-top: 30px; font-size: 9px; color: #888; border-top: 1px solid #ddd; padding-top: 15px; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Five a Day English Academy</h1>
-            <p>C/Hermanos Jimenez 25 - 02004 Albacete</p>
-            <p>CIF: XXXXXXXXX | Tel: 967 049 096</p>
-        </div>
-
-        <h2 style="text-align: center;">CERTIFICADO FISCAL - AÑO {year}</h2>
-
-        <div class="info-box">
-            <p><strong>Titular:</strong> {parent.full_name}</p>
-            <p><strong>DNI:</strong> {parent.dni}</p>
-            <p><strong>Periodo:</strong> 01/01/{year} - 31/12/{year}</p>
-        </div>
-
-        <p>Five a Day English Academy certifica que durante el ano <strong>{year}</strong>
-        se han recibido los siguientes pagos en concepto de servicios educativos:</p>
-    """
-
-    for student_name, data in students_data.items():
-        html_content += f"""
-        <div class="student-section">
-            <p class="student-name">Estudiante: {student_name}</p>
-            <table>
-                <tr>
-                    <th>Fecha</th>
-                    <th>Concepto</th>
-                    <th>Tipo</th>
-                    <th style="text-align: right;">Importe</th>
-                </tr>
-        """
-
-        for p in data["payments"]:
-            html_content += f"""
-                <tr>
-                    <td>{p["date"].strftime("%d/%m/%Y")}</td>
-                    <td>{p["concept"]}</td>
-                    <td>{p["payment_type"]}</td>
-                    <td style="text-align: right;">{p["amount"]:.2f} EUR</td>
-                </tr>
-            """
-
-        html_content += f"""
-                <tr class="total-row">
-                    <td colspan="3">Subtotal {student_name}</td>
-                    <td style="text-align: right;">{data["total"]:.2f} EUR</td>
-                </tr>
-            </table>
-        </div>
-        """
-
-    html_content += f"""
-        <div class="grand-total">
-            TOTAL PAGADO EN {year}: {total_year:.2f} EUR
-        </div>
-
-        <div class="legal">
-            <p>Este documento tiene validez a efectos de la declaracion del Impuesto sobre la Renta
-            de las Personas Fisicas (IRPF) segun la normativa vigente.</p>
-            <p>Los importes indicados corresponden a gastos de ensenanza de idiomas que pueden
-            ser deducibles segun la legislacion aplicable en cada Comunidad Autonoma.</p>
-        </div>
-
-        <div class="footer">
-            <p>Documento generado automaticamente el {__import__("datetime").date.today().strftime("%d/%m/%Y")}</p>
-            <p>Five a Day English Academy - www.fiveadayenglish.com</p>
-        </div>
-    </body>
-    </html>
-    """
-
-    # Convertir HTML a PDF
-    # Usamos weasyprint si esta disponible, sino devolvemos el HTML como fallback
-    try:
-        from weasyprint import HTML
-
-        pdf_buffer = BytesIO()
-        HTML(string=html_content).write_pdf(pdf_buffer)
-        return pdf_buffer.getvalue()
-    except ImportError:
-        # Fallback: devolver HTML como texto si weasyprint no esta instalado
-        logger.warning("weasyprint no instalado, generando certificado en HTML")
-        return html_content.encode("utf-8")
+    certificates = load_tax_certificates(year, parent_ids=[parent.id])
+    if certificates:
+        rendered = get_or_render(certificates[0], render_tax_certificate_batch)
+    else:
+        rendered = render_tax_certificate(_empty_tax_certificate(parent, year))
+    if rendered.error:
+        raise RuntimeError(rendered.error)
+    return rendered.content
 
 
 def send_tax_certificate_email(parent, year: int) -> bool:
@@ -532,92 +435,38 @@ def send_tax_certificate_email(parent, year: int) -> bool:
     Returns:
         True si se envio correctamente
     """
-    from billing.models import Payment
-    from students.models import Parent
-
-    # Si se pasa un ID, obtener el objeto Parent
-    if isinstance(parent, int):
-        try:
-            parent = Parent.objects.get(id=parent)
-        except Parent.DoesNotExist:
-            logger.error(f"Parent con ID {parent} no encontrado")
-            return False
-
-    # Verificar que el padre tiene pagos en ese ano
-    payments_count = Payment.objects.filter(parent=parent, payment_status="completed", payment_date__year=year).count()
-
-    if payments_count == 0:
-        logger.info(f"No hay pagos para {parent.full_name} en {year}, no se envia certificado")
-        return False
-
-    # Generar el PDF del certificado
-    try:
-        pdf_content = generate_tax_certificate_pdf(parent, year)
-
-        # Determinar si es PDF o HTML (fallback)
-        if pdf_content.startswith(b"<!DOCTYPE") or pdf_content.startswith(b"<html"):
-            mimetype = "text/html"
-            extension = "html"
-        else:
-            mimetype = "application/pdf"
-            extension = "pdf"
+    from comms.services.tax_certificate_service import (
+        load_tax_certificates,
+        render_with_store,
+        send_tax_certificates,
+    )
 
-        certificate_attachment = (f"certificado_fiscal_{year}_{parent.dni}.{extension}", pdf_content, mimetype)
+    parent_id = parent if isinstance(parent, int) else parent.id
+    certificates = load_tax_certificates(year, parent_ids=[parent_id])
 
-    except Exception as e:
-        logger.error(f"Error generando PDF para {parent.full_name}: {e}")
+    if not certificates:
+        logger.info(f"No hay pagos completados del padre {parent_id} en {year}, no se envia certificado")
         return False
 
-    return email_service.send_email(
-        template_name="tax_certificate",
-        recipients=parent.email,
-        subject=f"Certificado Fiscal {year} - Five a Day",
-        context={
-            "year": year,
-            "parent_name": parent.full_name,
-        },
-        attachments=[certificate_attachment],
-        fail_silently=True,
-    )
+    results = send_tax_certificates(render_with_store(certificates, workers=1), total=1)
+    return results["sent"] == 1
 
 
-def send_all_tax_certificates(year: int) -> dict[str, int]:
+def send_all_tax_certificates(year: int, workers: int | None = 1) -> dict[str, int]:
     """
     Envia certificados fiscales a TODOS los padres que tengan pagos en el ano.
 
+    Delegado en el pipeline de comms.services.tax_certificate_service. Por defecto
+    renderiza en el propio proceso (se llama desde la vista web); el comando
+    ``send_tax_certificates --workers N`` usa el pool de procesos.
+
     Args:
         year: Ano fiscal
+        workers: Procesos de render (None = uno por nucleo)
 
     Returns:
         Dict con {sent: N, skipped: N, failed: N}
     """
-    from students.models import Parent
-
-    # Obtener todos los padres con pagos completados en ese ano
-    parents_with_payments = Parent.objects.filter(
-        payments__payment_status="completed", payments__payment_date__year=year
-    ).distinct()
-
-    results = {"sent": 0, "skipped": 0, "failed": 0}
-
-    for parent in parents_with_payments:
-        if not parent.email:
-            logger.warning(f"{parent.full_name}: sin email")
-            results["skipped"] += 1
-            continue
-
-        success = send_tax_certificate_email(parent, year)
-
-        if success:
-            results["sent"] += 1
-            logger.info(f"Certificado enviado a {parent.full_name}")
-        else:
-            results["failed"] += 1
-            logger.error(f"Error enviando a {parent.full_name}")
-
-    logger.info(
-        f"Certificados fiscales {year}: {results['sent']} enviados, "
-        f"{results['skipped']} omitidos, {results['failed']} fallidos"
-    )
+    from comms.services.tax_certificate_service import run_tax_certificate_pipeline
 
-    return results
+    return run_tax_certificate_pipeline(year, workers=workers)
@@ -7,11 +7,12 @@ Moved from core/email.py as part of the comms app split.
 
 import logging
 import os
-from email.mime.image import MIMEImage
 
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
+
+from comms.services.mime_cache import mime_cache
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,37 @@ def get_email_config():
     }
 
 
+EMAIL_TEMPLATES_DIR = os.path.join("core", "templates", "emails")
+
+
+def email_template_names() -> list[str]:
+    """Nombres (sin .html) de todas las plantillas de core/templates/emails/."""
+    directory = os.path.join(settings.BASE_DIR, EMAIL_TEMPLATES_DIR)
+    return sorted(name.removesuffix(".html") for name in os.listdir(directory) if name.endswith(".html"))
+
+
+def warm_up_email_templates() -> int:
+    """
+    Compila todas las plantillas de email en la cache del loader del proceso.
+
+    Se llama al arrancar los procesos web (wsgi/asgi) y cada worker de Celery, para
+    que el primer envio no pague la lectura y el parseo de las plantillas. Una
+    plantilla rota se registra y no impide arrancar el proceso.
+
+    Returns:
+        Numero de plantillas compiladas
+    """
+    compiled = 0
+    for name in email_template_names():
+        try:
+            get_template(f"emails/{name}.html")
+            compiled += 1
+        except Exception:
+            logger.exception(f"Error precompilando la plantilla de email '{name}'")
+    logger.info(f"{compiled} plantillas de email precompiladas")
+    return compiled
+
+
 class EmailService:
     """
     Servicio generico para envio de emails con templates HTML
@@ -65,6 +97,7 @@ class EmailService:
         fail_silently: bool = False,
         attachments: list | None = None,
         inline_images: dict[str, str] | None = None,
+        connection=None,
     ) -> bool:
         """
         Envia un email usando un template HTML
@@ -80,6 +113,8 @@ class EmailService:
             attachments: Lista de tuplas (filename, content, mimetype)
             inline_images: Dict de {content_id: file_path} para imagenes inline
                            En el template usar: <img src="cid:content_id">
+            connection: Conexion SMTP abierta a reutilizar (ver get_connection()); si es None
+                        se abre una nueva para este email
 
         Returns:
             True si se envio correctamente, False en caso contrario
@@ -106,7 +141,13 @@ class EmailService:
 
             # Crear email con alternativas (texto y HTML)
             email = EmailMultiAlternatives(
-                subject=subject, body=text_content, from_email=self.from_email, to=recipients, cc=cc, bcc=bcc
+                subject=subject,
+                body=text_content,
+                from_email=self.from_email,
+                to=recipients,
+                cc=cc,
+                bcc=bcc,
+                connection=connection,
             )
             email.attach_alternative(html_content, "text/html")
 
@@ -115,11 +156,8 @@ class EmailService:
                 email.mixed_subtype = "related"
                 for content_id, image_path in inline_images.items():
                     if os.path.exists(image_path):
-                        with open(image_path, "rb") as img_file:
-                            img = MIMEImage(img_file.read())
-                            img.add_header("Content-ID", f"<{content_id}>")
-                            img.add_header("Content-Disposition", "inline", filename=os.path.basename(image_path))
-                            email.attach(img)
+                        # Leida y codificada una vez por proceso (ver mime_cache)
+                        email.attach(mime_cache.inline_image(content_id, image_path))
 
             # Anadir adjuntos si existen
             if attachments:
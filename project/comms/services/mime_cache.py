@@ -0,0 +1,139 @@
+"""
+Cache en memoria de las partes MIME que se repiten en los emails (logo, PDFs fijos).
+
+Una campana adjunta el mismo logo o el mismo PDF a miles de emails. Sin cache, cada
+envio vuelve a abrir y leer el fichero y a codificarlo en base64 (``MIMEImage``).
+Aqui cada fichero se lee y se prepara una vez por proceso (worker de Celery o
+proceso web) y se sirve desde memoria en los envios siguientes.
+
+- Clave: ruta + ``mtime_ns`` + tamano del fichero. Si el fichero cambia en disco,
+  la clave cambia y se vuelve a leer; la entrada vieja acaba saliendo por LRU.
+- Limite de tamano: ``EMAIL_MIME_CACHE_MAX_BYTES`` (suma de los tamanos de los
+  ficheros cacheados). Al superarlo se descartan las entradas menos usadas.
+- Metricas: ``mime_cache.stats()`` devuelve aciertos, fallos, descartes y ocupacion.
+
+Uso:
+    from comms.services.mime_cache import mime_cache
+
+    email.attach(mime_cache.inline_image("logo", logo_path))
+    attachments.append(mime_cache.attachment(pdf_path))
+"""
+
+import copy
+import logging
+import os
+import threading
+from collections import OrderedDict
+from email.mime.image import MIMEImage
+from typing import Any
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class MimeCache:
+    """LRU acotado por bytes, compartido por todos los envios del proceso (thread-safe)."""
+
+    def __init__(self, max_bytes: int | None = None):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, "EMAIL_MIME_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+    def inline_image(self, content_id: str, path: str) -> MIMEImage:
+        """
+        Imagen inline lista para ``email.attach()`` (``<img src="cid:content_id">``).
+
+        Devuelve una copia de la parte cacheada: las cabeceras son propias de cada
+        email, el payload en base64 se comparte.
+
+        Raises:
+            OSError: si el fichero no existe o no se puede leer
+        """
+        part = self._get(("image", content_id), path, self._prepare_image, content_id)
+        return copy.deepcopy(part)
+
+    def attachment(self, path: str, mimetype: str = "application/pdf") -> tuple[str, bytes, str]:
+        """
+        Adjunto (filename, content, mimetype) con el contenido del fichero.
+
+        Raises:
+            OSError: si el fichero no existe o no se puede leer
+        """
+        return self._get(("attachment", mimetype), path, self._prepare_attachment, mimetype)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        """Vacia la cache y reinicia las metricas."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.current_bytes = 0
+
+    def _get(self, kind: tuple, path: str, prepare, *args):
+        stat = os.stat(path)
+        key = (*kind, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+        value = prepare(path, data, *args)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, len(data))
+                self.current_bytes += len(data)
+                self._evict()
+        return value
+
+    def _evict(self):
+        """Descarta las entradas menos usadas hasta volver al limite (llamar con el lock)."""
+        max_bytes = self.max_bytes
+        while self.current_bytes > max_bytes and self._entries:
+            key, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            logger.debug(f"mime_cache: descartado {key[2]} ({size} bytes)")
+
+    @staticmethod
+    def _prepare_image(path: str, data: bytes, content_id: str) -> MIMEImage:
+        part = MIMEImage(data)
+        part.add_header("Content-ID", f"<{content_id}>")
+        part.add_header("Content-Disposition", "inline", filename=os.path.basename(path))
+        return part
+
+    @staticmethod
+    def _prepare_attachment(path: str, data: bytes, mimetype: str) -> tuple[str, bytes, str]:
+        return (os.path.basename(path), data, mimetype)
+
+
+# Instancia del proceso: cada worker de Celery / proceso web tiene la suya
+mime_cache = MimeCache()
@@ -0,0 +1,187 @@
+"""
+Render de documentos PDF (certificados fiscales, recibos) con WeasyPrint.
+
+Piezas comunes a todos los documentos que se adjuntan en los emails:
+
+- Plantillas Django en ``core/templates/documents/`` con una hoja de estilos
+  compartida (``documents/documents.css``).
+- ``pdf_resources()``: la hoja de estilos se parsea una sola vez por proceso y la
+  FontConfiguration se reutiliza en cada ``write_pdf()``.
+- ``render_documents()``: render por lotes; nunca lanza, los errores quedan en
+  ``RenderedDocument.error`` para que un documento roto no pare una campana.
+- ``render_parallel()``: reparte lotes en un ``ProcessPoolExecutor`` y devuelve
+  los resultados en orden a medida que terminan.
+
+Los documentos son NamedTuples con datos planos (sin ORM) que exponen
+``filename_stem``; asi viajan a los procesos del pool sin tocar la base de datos.
+"""
+
+import logging
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from itertools import chain
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_STYLESHEET = "documents/documents.css"
+
+# Etapas que se notifican a on_progress(stage, done, total)
+STAGE_RENDER = "render"
+STAGE_SEND = "send"
+
+ProgressCallback = Callable[[str, int, int], None]
+
+MIMETYPES = {"pdf": "application/pdf", "html": "text/html"}
+EXTENSIONS = {mimetype: extension for extension, mimetype in MIMETYPES.items()}
+
+
+class RenderedDocument(NamedTuple):
+    """Resultado del render. `error` no vacio si el documento no se pudo generar."""
+
+    document: Any
+    content: bytes
+    mimetype: str
+    error: str = ""
+
+    @property
+    def attachment(self) -> tuple[str, bytes, str]:
+        return (f"{self.document.filename_stem}.{EXTENSIONS[self.mimetype]}", self.content, self.mimetype)
+
+
+@lru_cache(maxsize=1)
+def stylesheet_source() -> str:
+    """CSS de los documentos, leido una vez por proceso."""
+    from django.template.loader import get_template
+
+    return get_template(DOCUMENT_STYLESHEET).template.source
+
+
+@lru_cache(maxsize=1)
+def pdf_resources():
+    """
+    Recursos de WeasyPrint compartidos por todos los documentos del proceso.
+
+    Cada worker del pool tiene los suyos.
+
+    Returns:
+        (HTML, CSS parseado, FontConfiguration), o None si WeasyPrint no esta disponible
+    """
+    try:
+        from weasyprint import CSS, HTML
+        from weasyprint.text.fonts import FontConfiguration
+    except (ImportError, OSError):
+        # OSError: paquete instalado pero faltan las librerias del sistema (pango)
+        logger.warning("weasyprint no disponible, generando documentos en HTML")
+        return None
+
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=stylesheet_source(), font_config=font_config)
+    return HTML, stylesheet, font_config
+
+
+def render_html(template_name: str, context: dict, inline_css: bool = True) -> str:
+    """
+    Renderiza la plantilla del documento.
+
+    Con ``inline_css=False`` el HTML sale sin <style>: WeasyPrint recibe la hoja ya
+    parseada de pdf_resources().
+    """
+    from django.template.loader import render_to_string
+
+    return render_to_string(template_name, {**context, "inline_css": stylesheet_source() if inline_css else ""})
+
+
+def render_documents(
+    template_name: str, documents: list, build_context: Callable[[Any], dict]
+) -> list[RenderedDocument]:
+    """
+    Renderiza varios documentos en una llamada reutilizando plantilla, CSS y fuentes.
+
+    Args:
+        template_name: Plantilla en core/templates/documents/
+        documents: NamedTuples con los datos de cada documento
+        build_context: Contexto de plantilla para un documento
+
+    Returns:
+        Un RenderedDocument por documento, en el mismo orden (PDF, o HTML sin WeasyPrint)
+    """
+    resources = pdf_resources()
+    rendered = []
+    for document in documents:
+        try:
+            context = build_context(document)
+            if resources is None:
+                html_content = render_html(template_name, context)
+                rendered.append(RenderedDocument(document, html_content.encode("utf-8"), "text/html"))
+                continue
+
+            html_class, stylesheet, font_config = resources
+            html_content = render_html(template_name, context, inline_css=False)
+            pdf_buffer = BytesIO()
+            html_class(string=html_content).write_pdf(pdf_buffer, stylesheets=[stylesheet], font_config=font_config)
+            rendered.append(RenderedDocument(document, pdf_buffer.getvalue(), "application/pdf"))
+        except Exception as e:
+            rendered.append(RenderedDocument(document, b"", "", error=str(e)))
+    return rendered
+
+
+def default_workers() -> int:
+    """Un proceso de render por nucleo disponible."""
+    return os.cpu_count() or 1
+
+
+def init_render_worker():
+    """Arranque de cada proceso del pool (necesario con los metodos spawn/forkserver)."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def render_parallel(
+    render_batch: Callable[[list], list[RenderedDocument]],
+    documents: list,
+    workers: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Iterator[RenderedDocument]:
+    """
+    Renderiza los documentos en paralelo y los devuelve en orden a medida que terminan.
+
+    Con ``workers=1`` (o un solo documento) se renderiza en el propio proceso, sin
+    pool. El generador permite que la etapa de envio empiece con el primer PDF
+    mientras el pool sigue renderizando los siguientes.
+
+    Args:
+        render_batch: Funcion de nivel de modulo (serializable) que renderiza un lote
+        documents: Documentos a renderizar
+        workers: Numero de procesos (por defecto uno por nucleo)
+        on_progress: Callback (STAGE_RENDER, hechos, total)
+    """
+    total = len(documents)
+    if not total:
+        return
+    workers = min(workers or default_workers(), total)
+
+    if workers == 1:
+        yield from _report(render_batch(documents), total, on_progress)
+        return
+
+    # Lotes pequenos: menos viajes entre procesos sin dejar workers ociosos al final
+    batch_size = max(1, total // (workers * 4))
+    batches = [documents[i : i + batch_size] for i in range(0, total, batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as executor:
+        rendered = chain.from_iterable(executor.map(render_batch, batches))
+        yield from _report(rendered, total, on_progress)
+
+
+def _report(rendered: Iterable[RenderedDocument], total: int, on_progress: ProgressCallback | None) -> Iterator:
+    """Reenvia los documentos renderizados notificando el progreso del render."""
+    for done, item in enumerate(rendered, start=1):
+        if on_progress:
+            on_progress(STAGE_RENDER, done, total)
+        yield item
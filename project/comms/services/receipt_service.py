@@ -0,0 +1,255 @@
+"""
+Recibos trimestrales por familia (ninos).
+
+Mismo pipeline que los certificados fiscales (tax_certificate_service):
+    1. Carga: los pagos completados del trimestre de TODAS las familias en UNA
+       consulta ``values()``, agrupados por padre y estudiante.
+    2. Render: plantilla documents/quarterly_receipt.html -> PDF en lotes, en
+       paralelo con ``pdf_service.render_parallel``. Los recibos ya generados con
+       los mismos pagos salen del ``certificate_store`` sin renderizar.
+    3. Envio: UN email por familia con su recibo adjunto, sobre una unica conexion SMTP.
+
+Un pago entra en el recibo si su vencimiento (``due_date``) cae en el trimestre:
+es el periodo que se factura, aunque se pagara antes o despues.
+
+Uso:
+    from comms.services.receipt_service import run_quarterly_receipt_pipeline
+
+    results = run_quarterly_receipt_pipeline(["octubre", "noviembre", "diciembre"])
+    results["sent"], results["skipped"], results["failed"]
+"""
+
+import calendar
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from comms.services.pdf_service import (
+    STAGE_SEND,
+    ProgressCallback,
+    RenderedDocument,
+    render_documents,
+    render_parallel,
+)
+from comms.services.tax_certificate_service import CertificateStudent, group_family_payments, students_payload
+from core.constants import MESES_ES
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_TEMPLATE = "documents/quarterly_receipt.html"
+RECEIPTS_PREFIX = "receipts"
+
+
+class QuarterlyReceipt(NamedTuple):
+    """Datos de un recibo trimestral de una familia: todo lo que necesita el render, sin ORM."""
+
+    parent_id: int
+    parent_name: str
+    parent_dni: str
+    parent_email: str
+    months: tuple[str, str, str]
+    period_start: date
+    period_end: date
+    students: list[CertificateStudent]
+    total: Decimal
+
+    @property
+    def student_names(self) -> str:
+        """Nombres para el asunto y el cuerpo del email ("Lucas y Sara")."""
+        names = [s.name for s in self.students]
+        return names[0] if len(names) == 1 else f"{', '.join(names[:-1])} y {names[-1]}"
+
+    @property
+    def filename_stem(self):
+        return f"recibo_{self.period_start:%Y%m}_{self.period_end:%Y%m}_{self.parent_dni}"
+
+    @property
+    def store_dir(self):
+        return receipt_dir(self.parent_id, self.period_start)
+
+    def digest_payload(self):
+        return [
+            self.period_start.isoformat(),
+            self.period_end.isoformat(),
+            list(self.months),
+            self.parent_id,
+            self.parent_name,
+            self.parent_dni,
+            students_payload(self.students),
+        ]
+
+
+def receipt_dir(parent_id: int, period_start: date) -> str:
+    return f"{RECEIPTS_PREFIX}/{period_start:%Y-%m}/{parent_id}"
+
+
+def purge_receipts(parent_id: int, due_date: date) -> int:
+    """Borra los recibos almacenados de un padre cuyo trimestre puede incluir un pago con este vencimiento."""
+    from comms.services.certificate_store import purge_dir
+
+    deleted = 0
+    for offset in range(3):  # trimestres que empiezan en el mes del vencimiento o en los dos anteriores
+        year, month = divmod(due_date.year * 12 + due_date.month - 1 - offset, 12)
+        deleted += purge_dir(receipt_dir(parent_id, date(year, month + 1, 1)))
+    return deleted
+
+
+def quarter_period(months: list[str], on: date | None = None) -> tuple[date, date]:
+    """
+    Primer y ultimo dia del trimestre formado por `months` (nombres de MESES_ES).
+
+    El trimestre es el mas reciente que empieza en el primer mes: "octubre" pedido en
+    enero es el octubre del ano anterior. Un trimestre que cruza el ano (noviembre a
+    enero) termina en el ano siguiente.
+    """
+    on = on or date.today()
+    first = MESES_ES.index(months[0].lower()) + 1
+    last = MESES_ES.index(months[-1].lower()) + 1
+    start_year = on.year if first <= on.month else on.year - 1
+    end_year = start_year if last >= first else start_year + 1
+    return date(start_year, first, 1), date(end_year, last, calendar.monthrange(end_year, last)[1])
+
+
+def load_quarterly_receipts(
+    months: list[str], on: date | None = None, parent_ids: list[int] | None = None
+) -> list[QuarterlyReceipt]:
+    """
+    Carga los recibos del trimestre de todas las familias con una sola consulta.
+
+    Args:
+        months: Los tres meses del trimestre (nombres de MESES_ES)
+        on: Fecha de referencia para deducir el ano (por defecto hoy)
+        parent_ids: Limitar a estos padres
+
+    Returns:
+        Un QuarterlyReceipt por padre con pagos completados en el trimestre, por apellido
+    """
+    from billing.models import Payment
+
+    period_start, period_end = quarter_period(months, on)
+    payments = Payment.objects.filter(
+        payment_status="completed",
+        parent__isnull=False,
+        student__is_adult=False,
+        due_date__gte=period_start,
+        due_date__lte=period_end,
+    )
+    if parent_ids is not None:
+        payments = payments.filter(parent_id__in=parent_ids)
+
+    return [
+        QuarterlyReceipt(
+            parent_id=row["parent_id"],
+            parent_name=f"{row['parent__first_name']} {row['parent__last_name']}",
+            parent_dni=row["parent__dni"],
+            parent_email=(row["parent__email"] or "").strip(),
+            months=tuple(months),
+            period_start=period_start,
+            period_end=period_end,
+            students=students,
+            total=total,
+        )
+        for row, students, total in group_family_payments(payments)
+    ]
+
+
+def receipt_context(receipt: QuarterlyReceipt) -> dict:
+    return {"receipt": receipt, "generated_on": date.today()}
+
+
+def render_quarterly_receipt_batch(receipts: list[QuarterlyReceipt]) -> list[RenderedDocument]:
+    """Renderiza varios recibos en una llamada (funcion de nivel de modulo para el pool)."""
+    return render_documents(RECEIPT_TEMPLATE, receipts, receipt_context)
+
+
+def render_quarterly_receipts(
+    receipts: list[QuarterlyReceipt],
+    workers: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Iterator[RenderedDocument]:
+    """Renderiza en paralelo solo los recibos que faltan en el store y guarda los nuevos."""
+    from comms.services.certificate_store import render_with_store
+
+    return render_with_store(
+        receipts,
+        lambda missing: render_parallel(
+            render_quarterly_receipt_batch, missing, workers=workers, on_progress=on_progress
+        ),
+    )
+
+
+def send_quarterly_receipts(
+    rendered: Iterable[RenderedDocument],
+    total: int,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """
+    Envia un email por familia con su recibo adjunto, sobre una unica conexion SMTP.
+
+    Returns:
+        Dict con {sent: N, failed: N}
+    """
+    from django.core.mail import get_connection
+
+    from comms.services.email_functions import send_quarterly_receipt_email
+
+    results = {"sent": 0, "failed": 0}
+    with get_connection(fail_silently=True) as connection:
+        for done, item in enumerate(rendered, start=1):
+            receipt = item.document
+            if item.error:
+                logger.error(f"Error generando recibo para {receipt.parent_name}: {item.error}")
+                results["failed"] += 1
+            elif send_quarterly_receipt_email(
+                parent_email=receipt.parent_email,
+                student_name=receipt.student_names,
+                month_1=receipt.months[0],
+                month_2=receipt.months[1],
+                month_3=receipt.months[2],
+                receipt_pdf=item.attachment,
+                connection=connection,
+            ):
+                results["sent"] += 1
+            else:
+                results["failed"] += 1
+                logger.error(f"Error enviando recibo a {receipt.parent_name}")
+            if on_progress:
+                on_progress(STAGE_SEND, done, total)
+    return results
+
+
+def run_quarterly_receipt_pipeline(
+    months: list[str],
+    on: date | None = None,
+    workers: int | None = 1,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """
+    Carga, renderiza y envia los recibos trimestrales de todas las familias.
+
+    Por defecto renderiza en el propio proceso (se llama desde la vista web); pasar
+    ``workers=None`` para usar un proceso por nucleo.
+
+    Returns:
+        Dict con {sent: N, skipped: N, failed: N}
+    """
+    receipts = []
+    skipped = 0
+    for receipt in load_quarterly_receipts(months, on):
+        if receipt.parent_email:
+            receipts.append(receipt)
+        else:
+            logger.warning(f"{receipt.parent_name}: sin email")
+            skipped += 1
+
+    rendered = render_quarterly_receipts(receipts, workers=workers, on_progress=on_progress)
+    results = send_quarterly_receipts(rendered, len(receipts), on_progress=on_progress)
+    results["skipped"] = skipped
+
+    logger.info(
+        f"Recibos trimestrales {'/'.join(months)}: {results['sent']} enviados, "
+        f"{results['skipped']} omitidos, {results['failed']} fallidos"
+    )
+    return results
@@ -0,0 +1,215 @@
+"""
+Resolucion de destinatarios para las campanas de email.
+
+Todas las campanas (formularios de apps y tareas Celery) piden aqui su lista de
+destinatarios en lugar de construirla con su propio ORM. Cada audiencia se
+resuelve con UNA sola consulta ``values()`` sobre ``students`` (con join a
+``parents``) y se agrega en Python por direccion de email.
+
+Uso:
+    from comms.services.recipient_service import AUDIENCE_GROUP, resolve_recipients
+
+    for recipient in resolve_recipients(AUDIENCE_GROUP, group_ids=[3]):
+        recipient.email, recipient.name, recipient.students, recipient.group_ids, recipient.is_adult
+
+    # Solo las direcciones (p. ej. Fun Friday por rango de edad en la fecha del evento)
+    emails = recipient_emails(AUDIENCE_AGE_RANGE, min_age=5, max_age=12, on=event_date)
+"""
+
+from datetime import date
+from typing import NamedTuple
+
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, QuerySet, When
+from django.db.models.functions import Lower, Trim
+
+from students.models import Student
+
+AUDIENCE_ALL = "all"
+AUDIENCE_GROUP = "group"
+AUDIENCE_AGE_RANGE = "age_range"
+AUDIENCE_BIRTHDAY_TODAY = "birthday_today"
+AUDIENCE_PENDING_PAYMENTS = "pending_payments"
+
+AUDIENCES = (
+    AUDIENCE_ALL,
+    AUDIENCE_GROUP,
+    AUDIENCE_AGE_RANGE,
+    AUDIENCE_BIRTHDAY_TODAY,
+    AUDIENCE_PENDING_PAYMENTS,
+)
+
+
+class RecipientStudent(NamedTuple):
+    """Estudiante incluido en un destinatario (solo las columnas que usan los emails)."""
+
+    id: int
+    first_name: str
+    last_name: str
+    group_id: int
+    group_name: str
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class Recipient(NamedTuple):
+    """Destinatario de una campana: una direccion de email con sus estudiantes."""
+
+    email: str
+    name: str
+    students: list[RecipientStudent]
+    group_ids: list[int]
+    is_adult: bool
+
+
+def audience_students(
+    audience: str,
+    *,
+    group_ids: list[int] | None = None,
+    min_age: int | None = None,
+    max_age: int | None = None,
+    on: date | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+    is_adult: bool | None = False,
+) -> QuerySet:
+    """
+    Queryset de estudiantes activos que forman la audiencia.
+
+    Args:
+        audience: Una de AUDIENCES
+        group_ids: Grupos (AUDIENCE_GROUP)
+        min_age: Edad minima inclusiva (AUDIENCE_AGE_RANGE)
+        max_age: Edad maxima inclusiva (AUDIENCE_AGE_RANGE)
+        on: Fecha de referencia para edad y cumpleanos (por defecto hoy)
+        due_date_from: Vencimiento minimo de los pagos pendientes (AUDIENCE_PENDING_PAYMENTS)
+        due_date_to: Vencimiento maximo de los pagos pendientes (AUDIENCE_PENDING_PAYMENTS)
+        is_adult: False solo ninos (email a los padres), True solo adultos (email propio), None ambos
+    """
+    if audience not in AUDIENCES:
+        raise ValueError(f"Audiencia desconocida: {audience}")
+
+    on = on or date.today()
+    students = Student.objects.filter(active=True)
+    if is_adult is not None:
+        students = students.filter(is_adult=is_adult)
+
+    if audience == AUDIENCE_GROUP:
+        students = students.filter(group_id__in=group_ids or [])
+    elif audience == AUDIENCE_AGE_RANGE:
+        students = students.age_between(min_age, max_age, on)
+    elif audience == AUDIENCE_BIRTHDAY_TODAY:
+        students = students.birthdays_on(on)
+    elif audience == AUDIENCE_PENDING_PAYMENTS:
+        from billing.models import Payment
+
+        pending = Payment.objects.filter(student=OuterRef("pk"), payment_status="pending")
+        if due_date_from:
+            pending = pending.filter(due_date__gte=due_date_from)
+        if due_date_to:
+            pending = pending.filter(due_date__lte=due_date_to)
+        students = students.filter(Exists(pending))
+
+    return students
+
+
+def _with_recipient_email(students: QuerySet) -> QuerySet:
+    """Anota `recipient_email` (email propio para adultos, del padre para ninos) y descarta vacios."""
+    return students.annotate(
+        recipient_email=Case(
+            When(is_adult=True, then=F("email")),
+            default=F("parents__email"),
+            output_field=CharField(),
+        )
+    ).exclude(Q(recipient_email__isnull=True) | Q(recipient_email=""))
+
+
+def resolve_recipients(audience: str, **params) -> list[Recipient]:
+    """
+    Resuelve la audiencia en una lista de destinatarios con una sola consulta.
+
+    Los estudiantes se agrupan por email (sin distinguir mayusculas): una familia con
+    varios hijos en la audiencia recibe un unico Recipient con todos ellos.
+
+    Args:
+        audience: Una de AUDIENCES
+        **params: Filtros de audience_students()
+
+    Returns:
+        Lista de Recipient en orden estable (por apellido del destinatario)
+    """
+    rows = (
+        _with_recipient_email(audience_students(audience, **params))
+        .values(
+            "id",
+            "first_name",
+            "last_name",
+            "is_adult",
+            "group_id",
+            "group__group_name",
+            "recipient_email",
+            "parents__first_name",
+            "parents__last_name",
+        )
+        .order_by("parents__last_name", "last_name", "first_name", "id")
+    )
+
+    recipients: dict[str, dict] = {}
+    for row in rows:
+        key = row["recipient_email"].strip().lower()
+        entry = recipients.get(key)
+        if entry is None:
+            if row["is_adult"]:
+                name = f"{row['first_name']} {row['last_name']}"
+            else:
+                name = f"{row['parents__first_name']} {row['parents__last_name']}"
+            entry = recipients[key] = {
+                "email": row["recipient_email"].strip(),
+                "name": name,
+                "students": {},
+                "group_ids": [],
+                "is_adult": row["is_adult"],
+            }
+        if row["id"] not in entry["students"]:
+            entry["students"][row["id"]] = RecipientStudent(
+                id=row["id"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                group_id=row["group_id"],
+                group_name=row["group__group_name"],
+            )
+        if row["group_id"] not in entry["group_ids"]:
+            entry["group_ids"].append(row["group_id"])
+
+    return [
+        Recipient(
+            email=entry["email"],
+            name=entry["name"],
+            students=list(entry["students"].values()),
+            group_ids=entry["group_ids"],
+            is_adult=entry["is_adult"],
+        )
+        for entry in recipients.values()
+    ]
+
+
+def count_recipients(audience: str, **params) -> int:
+    """Numero de direcciones distintas de la audiencia (COUNT DISTINCT en la base de datos)."""
+    students = _with_recipient_email(audience_students(audience, **params))
+    return students.values(email_key=Lower(Trim("recipient_email"))).distinct().count()
+
+
+def recipient_emails(audience: str, **params) -> list[str]:
+    """
+    Direcciones distintas de la audiencia (normalizadas en minusculas) con una sola consulta.
+
+    Para campanas que envian el mismo email a todos y no necesitan los estudiantes de cada
+    destinatario: el DISTINCT se hace en la base de datos, no en Python.
+    """
+    students = _with_recipient_email(audience_students(audience, **params))
+    return list(
+        students.values_list(Lower(Trim("recipient_email")), flat=True)
+        .distinct()
+        .order_by(Lower(Trim("recipient_email")))
+    )
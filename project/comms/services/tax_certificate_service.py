@@ -0,0 +1,328 @@
+"""
+Pipeline de certificados fiscales anuales (campana de la renta, abril).
+
+Tres etapas:
+    1. Carga: TODOS los pagos completados del ano en UNA consulta ``values()``,
+       agrupados en Python por padre y estudiante (``load_tax_certificates``).
+    2. Render: plantilla documents/tax_certificate.html -> PDF con WeasyPrint, la
+       parte cara en CPU, repartida en lotes en un ``ProcessPoolExecutor``
+       (``render_tax_certificates``). Cada proceso parsea la hoja de estilos y
+       prepara las fuentes una sola vez (``pdf_resources``). Los procesos solo
+       reciben datos planos (NamedTuples), nunca tocan la base de datos. Los PDFs
+       cuyos pagos no cambiaron salen del ``certificate_store`` sin renderizar.
+    3. Envio: etapa de I/O en el proceso principal que consume los PDFs a medida
+       que salen del pool, sobre una unica conexion SMTP (``send_tax_certificates``).
+
+Uso:
+    from comms.services.tax_certificate_service import run_tax_certificate_pipeline
+
+    results = run_tax_certificate_pipeline(2025, workers=4)
+    results["sent"], results["skipped"], results["failed"]
+"""
+
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from comms.services.pdf_service import (
+    STAGE_SEND,
+    ProgressCallback,
+    RenderedDocument,
+    render_documents,
+    render_parallel,
+)
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATE_TEMPLATE = "documents/tax_certificate.html"
+
+# Resultado del render de un TaxCertificate (RenderedDocument.document es el certificado)
+RenderedCertificate = RenderedDocument
+
+
+class CertificatePayment(NamedTuple):
+    """Linea de pago de un certificado."""
+
+    date: date
+    concept: str
+    payment_type: str
+    amount: Decimal
+
+
+class CertificateStudent(NamedTuple):
+    """Pagos de un estudiante dentro del certificado."""
+
+    name: str
+    payments: list[CertificatePayment]
+    total: Decimal
+
+
+class TaxCertificate(NamedTuple):
+    """Datos completos de un certificado: todo lo que necesita el render, sin ORM."""
+
+    parent_id: int
+    parent_name: str
+    parent_dni: str
+    parent_email: str
+    year: int
+    students: list[CertificateStudent]
+    total: Decimal
+
+    @property
+    def filename_stem(self):
+        return f"certificado_fiscal_{self.year}_{self.parent_dni}"
+
+    @property
+    def store_dir(self):
+        from comms.services.certificate_store import certificate_dir
+
+        return certificate_dir(self.parent_id, self.year)
+
+    def digest_payload(self):
+        return [self.year, self.parent_id, self.parent_name, self.parent_dni, students_payload(self.students)]
+
+
+def students_payload(students: list[CertificateStudent]) -> list:
+    """Filas de pago serializables (para el digest del certificate_store)."""
+    return [
+        [student.name, [[p.date.isoformat(), p.concept, p.payment_type, str(p.amount)] for p in student.payments]]
+        for student in students
+    ]
+
+
+def group_family_payments(payments) -> list[tuple[dict, list[CertificateStudent], Decimal]]:
+    """
+    Agrupa un queryset de Payment por padre y estudiante con una sola consulta ``values()``.
+
+    Returns:
+        Lista de (fila con los datos del padre, estudiantes con sus pagos, total), por apellido
+    """
+    from billing.constants import PAYMENT_TYPE_CHOICES
+
+    payment_types = dict(PAYMENT_TYPE_CHOICES)
+    rows = payments.values(
+        "parent_id",
+        "parent__first_name",
+        "parent__last_name",
+        "parent__dni",
+        "parent__email",
+        "student__first_name",
+        "student__last_name",
+        "payment_date",
+        "concept",
+        "payment_type",
+        "amount",
+    ).order_by("parent__last_name", "parent__first_name", "parent_id", "payment_date", "id")
+
+    parents: dict[int, dict] = {}
+    for row in rows:
+        entry = parents.get(row["parent_id"])
+        if entry is None:
+            entry = parents[row["parent_id"]] = {"row": row, "students": {}}
+        student_name = f"{row['student__first_name']} {row['student__last_name']}"
+        entry["students"].setdefault(student_name, []).append(
+            CertificatePayment(
+                date=row["payment_date"],
+                concept=row["concept"],
+                payment_type=payment_types.get(row["payment_type"], row["payment_type"]),
+                amount=row["amount"],
+            )
+        )
+
+    families = []
+    for entry in parents.values():
+        students = [
+            CertificateStudent(name=name, payments=payments, total=sum((p.amount for p in payments), Decimal("0.00")))
+            for name, payments in entry["students"].items()
+        ]
+        families.append((entry["row"], students, sum((s.total for s in students), Decimal("0.00"))))
+    return families
+
+
+def load_tax_certificates(year: int, parent_ids: list[int] | None = None) -> list[TaxCertificate]:
+    """
+    Carga los datos de todos los certificados del ano con una sola consulta.
+
+    Args:
+        year: Ano fiscal
+        parent_ids: Limitar a estos padres (por defecto todos los que tengan pagos)
+
+    Returns:
+        Un TaxCertificate por padre con pagos completados en el ano, ordenados por apellido
+    """
+    from billing.models import Payment
+
+    payments = Payment.objects.filter(
+        payment_status="completed",
+        parent__isnull=False,
+        payment_date__gte=date(year, 1, 1),
+        payment_date__lte=date(year, 12, 31),
+    )
+    if parent_ids is not None:
+        payments = payments.filter(parent_id__in=parent_ids)
+
+    return [
+        TaxCertificate(
+            parent_id=row["parent_id"],
+            parent_name=f"{row['parent__first_name']} {row['parent__last_name']}",
+            parent_dni=row["parent__dni"],
+            parent_email=(row["parent__email"] or "").strip(),
+            year=year,
+            students=students,
+            total=total,
+        )
+        for row, students, total in group_family_payments(payments)
+    ]
+
+
+def certificate_context(certificate: TaxCertificate) -> dict:
+    return {"certificate": certificate, "generated_on": date.today()}
+
+
+def render_tax_certificate_html(certificate: TaxCertificate, inline_css: bool = True) -> str:
+    """HTML del certificado (plantilla documents/tax_certificate.html)."""
+    from comms.services.pdf_service import render_html
+
+    return render_html(CERTIFICATE_TEMPLATE, certificate_context(certificate), inline_css=inline_css)
+
+
+def render_tax_certificate_batch(certificates: list[TaxCertificate]) -> list[RenderedCertificate]:
+    """
+    Renderiza varios certificados en una llamada reutilizando plantilla, CSS y fuentes.
+
+    Funcion de nivel de modulo para que ProcessPoolExecutor pueda serializarla: el
+    pool recibe lotes, no documentos sueltos.
+    """
+    return render_documents(CERTIFICATE_TEMPLATE, certificates, certificate_context)
+
+
+def render_tax_certificate(certificate: TaxCertificate) -> RenderedCertificate:
+    """Convierte un certificado en PDF (o HTML si WeasyPrint no esta disponible)."""
+    return render_tax_certificate_batch([certificate])[0]
+
+
+def render_tax_certificates(
+    certificates: list[TaxCertificate],
+    workers: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Iterator[RenderedCertificate]:
+    """
+    Renderiza los certificados en paralelo y los devuelve en orden a medida que terminan.
+
+    Con ``workers=1`` (o un solo certificado) se renderiza en el propio proceso, sin pool.
+
+    Args:
+        certificates: Datos cargados con load_tax_certificates()
+        workers: Numero de procesos (por defecto uno por nucleo)
+        on_progress: Callback (STAGE_RENDER, hechos, total)
+    """
+    return render_parallel(render_tax_certificate_batch, certificates, workers=workers, on_progress=on_progress)
+
+
+def render_with_store(
+    certificates: list[TaxCertificate],
+    workers: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Iterator[RenderedCertificate]:
+    """
+    Como render_tax_certificates, pero reutilizando los PDFs del certificate_store.
+
+    Solo se envian al pool los certificados cuyos pagos cambiaron (o nuevos); cada PDF
+    nuevo se guarda en el store.
+    """
+    from comms.services import certificate_store
+
+    return certificate_store.render_with_store(
+        certificates, lambda missing: render_tax_certificates(missing, workers=workers, on_progress=on_progress)
+    )
+
+
+def send_tax_certificates(
+    rendered: Iterable[RenderedCertificate],
+    total: int,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """
+    Envia los certificados renderizados sobre una unica conexion SMTP.
+
+    Returns:
+        Dict con {sent: N, failed: N}
+    """
+    from django.core.mail import get_connection
+
+    results = {"sent": 0, "failed": 0}
+    with get_connection(fail_silently=True) as connection:
+        for done, item in enumerate(rendered, start=1):
+            _send_one(item, connection, results)
+            if on_progress:
+                on_progress(STAGE_SEND, done, total)
+    return results
+
+
+def _send_one(item: RenderedCertificate, connection, results: dict[str, int]) -> None:
+    from comms.services.email_service import email_service
+
+    certificate = item.document
+    if item.error:
+        logger.error(f"Error generando PDF para {certificate.parent_name}: {item.error}")
+        results["failed"] += 1
+        return
+
+    success = email_service.send_email(
+        template_name="tax_certificate",
+        recipients=certificate.parent_email,
+        subject=f"Certificado Fiscal {certificate.year} - Five a Day",
+        context={
+            "year": certificate.year,
+            "parent_name": certificate.parent_name,
+        },
+        attachments=[item.attachment],
+        fail_silently=True,
+        connection=connection,
+    )
+    if success:
+        results["sent"] += 1
+        logger.info(f"Certificado enviado a {certificate.parent_name}")
+    else:
+        results["failed"] += 1
+        logger.error(f"Error enviando a {certificate.parent_name}")
+
+
+def run_tax_certificate_pipeline(
+    year: int,
+    workers: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """
+    Carga, renderiza en paralelo y envia los certificados fiscales del ano.
+
+    Los padres sin email se omiten antes del render para no gastar CPU en ellos.
+
+    Args:
+        year: Ano fiscal
+        workers: Procesos de render (por defecto uno por nucleo)
+        on_progress: Callback (etapa, hechos, total)
+
+    Returns:
+        Dict con {sent: N, skipped: N, failed: N}
+    """
+    certificates = []
+    skipped = 0
+    for certificate in load_tax_certificates(year):
+        if certificate.parent_email:
+            certificates.append(certificate)
+        else:
+            logger.warning(f"{certificate.parent_name}: sin email")
+            skipped += 1
+
+    rendered = render_with_store(certificates, workers=workers, on_progress=on_progress)
+    results = send_tax_certificates(rendered, len(certificates), on_progress=on_progress)
+    results["skipped"] = skipped
+
+    logger.info(
+        f"Certificados fiscales {year}: {results['sent']} enviados, "
+        f"{results['skipped']} omitidos, {results['failed']} fallidos"
+    )
+    return results
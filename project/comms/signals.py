@@ -0,0 +1,59 @@
+"""
+Signals de comms: limpieza del certificate_store cuando cambian los pagos.
+
+El store ya es direccionado por contenido (un pago modificado produce otro digest),
+asi que esto solo borra las versiones que ya no se van a servir: certificados
+fiscales del ano del pago y recibos trimestrales de su vencimiento, antes y despues
+del cambio. Solo se limpia al crear o borrar un pago completado, o al cambiar uno
+de DOCUMENT_FIELDS; guardar otros campos (observaciones, referencia...) no toca el
+store.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from billing.models import Payment
+from comms.services.certificate_store import purge_certificates
+from comms.services.receipt_service import purge_receipts
+
+# Campos que deciden en que certificados y recibos aparece un pago, y con que importe
+DOCUMENT_FIELDS = ("parent_id", "amount", "payment_date", "payment_status", "due_date")
+DOCUMENT_FIELD_NAMES = {*DOCUMENT_FIELDS, "parent"}
+
+
+def document_row(payment) -> dict:
+    return {field: getattr(payment, field) for field in DOCUMENT_FIELDS}
+
+
+def purge_payment_documents(row: dict):
+    """Borra los certificados y recibos almacenados en los que aparece un pago con estos valores."""
+    if row["payment_status"] != "completed" or not row["parent_id"]:
+        return
+    if row["payment_date"]:
+        purge_certificates(row["parent_id"], row["payment_date"].year)
+    if row["due_date"]:
+        purge_receipts(row["parent_id"], row["due_date"])
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_documents(sender, instance, update_fields=None, **kwargs):
+    instance._document_row_before = None
+    if instance._state.adding or (update_fields is not None and DOCUMENT_FIELD_NAMES.isdisjoint(update_fields)):
+        return
+    instance._document_row_before = Payment.objects.filter(pk=instance.pk).values(*DOCUMENT_FIELDS).first()
+
+
+@receiver(post_save, sender=Payment)
+def purge_documents_on_payment_save(sender, instance, created, **kwargs):
+    before = getattr(instance, "_document_row_before", None)
+    after = document_row(instance)
+    if created:
+        purge_payment_documents(after)
+    elif before is not None and before != after:
+        purge_payment_documents(before)
+        purge_payment_documents(after)
+
+
+@receiver(post_delete, sender=Payment)
+def purge_documents_on_payment_delete(sender, instance, **kwargs):
+    purge_payment_documents(document_row(instance))
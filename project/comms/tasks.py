@@ -14,11 +14,14 @@ Usage:
 
 from datetime import date
 
-from celery import shared_task
+from celery import group, shared_task
 from celery.utils.log import get_task_logger
 
 logger = get_task_logger(__name__)
 
+# Birthday emails sent per chunk task (one SMTP connection per chunk)
+BIRTHDAY_CHUNK_SIZE = 25
+
 
 @shared_task(
     name="comms.tasks.send_welcome_email_task",
@@ -98,31 +101,42 @@ def send_welcome_email_task(self, parent_id: int, student_id: int, enrollment_id
     autoretry_for=(Exception,),
     retry_backoff=True,
 )
-def send_birthday_email_task(self, student_id: int):
+def send_birthday_email_task(self, student_id: int, recipient_email: str = None, first_name: str = None):
     """
     Async task to send a birthday email to a specific student.
 
+    Used on its own and as the per-student retry path of send_birthday_chunk_task.
+    When the chunk already resolved the recipient, it is passed in and the
+    student is not re-queried.
+
     Args:
         student_id: ID of the student
+        recipient_email: Email to send to (optional, resolved from the student otherwise)
+        first_name: Student first name for the template (optional)
     """
     from comms.services.email_service import email_service
     from students.models import Student
 
     try:
-        student = Student.objects.prefetch_related("parents").get(id=student_id)
-
-        # Get the first parent with an email
-        parent = student.parents.exclude(email="").exclude(email__isnull=True).first()
-
-        if not parent:
-            logger.warning("Student id=%d has no parent with email", student_id)
-            return {"status": "skipped", "reason": "no parent email"}
+        if not (recipient_email and first_name):
+            student = Student.objects.prefetch_related("parents").get(id=student_id)
+            first_name = student.first_name
+
+            if student.is_adult and student.email:
+                recipient_email = student.email
+            else:
+                # Get the first parent with an email
+                parent = student.parents.exclude(email="").exclude(email__isnull=True).first()
+                if not parent:
+                    logger.warning("Student id=%d has no parent with email", student_id)
+                    return {"status": "skipped", "reason": "no parent email"}
+                recipient_email = parent.email
 
         success = email_service.send_email(
             template_name="happy_birthday",
-            recipients=parent.email,
-            subject=f"🎉 ¡Feliz Cumpleaños {student.first_name}!",
-            context={"name": student.first_name},
+            recipients=recipient_email,
+            subject=f"🎉 ¡Feliz Cumpleaños {first_name}!",
+            context={"name": first_name},
         )
 
         if success:
@@ -130,41 +144,103 @@ def send_birthday_email_task(self, student_id: int):
         else:
             raise Exception("Fallo en el envio del email")
 
-        return {"status": "success", "recipient": parent.email, "student": student.full_name}
+        return {"status": "success", "recipient": recipient_email, "student": first_name}
 
     except Student.DoesNotExist:
         logger.error("Student not found: id=%d", student_id)
         return {"status": "error", "message": "Student not found"}
 
 
+@shared_task(name="comms.tasks.send_birthday_chunk_task", bind=True)
+def send_birthday_chunk_task(self, messages: list[dict]):
+    """
+    Send a chunk of birthday emails over a single SMTP connection.
+
+    Failures are not retried as a chunk (that would re-send the emails that
+    already went out): each failed message is handed to send_birthday_email_task,
+    which keeps its own per-student retry/backoff policy.
+
+    Args:
+        messages: List of {"student_id", "first_name", "recipient_email"} dicts
+    """
+    from django.core.mail import get_connection
+
+    from comms.services.email_service import email_service
+
+    sent, requeued = 0, 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception("Could not open SMTP connection for birthday chunk")
+        connection = None
+
+    try:
+        for message in messages:
+            try:
+                if connection is None:
+                    raise Exception("Sin conexion SMTP")
+                email_service.send_email(
+                    template_name="happy_birthday",
+                    recipients=message["recipient_email"],
+                    subject=f"🎉 ¡Feliz Cumpleaños {message['first_name']}!",
+                    context={"name": message["first_name"]},
+                    connection=connection,
+                )
+                sent += 1
+            except Exception:
+                logger.warning("Birthday email failed for student_id=%d, queuing retry", message["student_id"])
+                send_birthday_email_task.delay(
+                    message["student_id"],
+                    recipient_email=message["recipient_email"],
+                    first_name=message["first_name"],
+                )
+                requeued += 1
+    finally:
+        if connection is not None:
+            connection.close()
+
+    return {"status": "success", "sent": sent, "requeued": requeued}
+
+
+def chunked(items: list, size: int) -> list[list]:
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
 @shared_task(name="comms.tasks.send_birthday_emails_task", bind=True)
-def send_birthday_emails_task(self):
+def send_birthday_emails_task(self, chunk_size: int = BIRTHDAY_CHUNK_SIZE):
     """
     Scheduled task (Celery Beat) that runs daily.
-    Finds all students with a birthday today and queues individual emails.
+    Resolves today's birthday students and their recipients in one query and
+    fans them out as a Celery group of fixed-size chunks.
 
     Configured in celery.py to run at 8:00 AM.
     """
-    from students.models import Student
+    from comms.services.recipient_service import AUDIENCE_BIRTHDAY_TODAY, resolve_recipients
 
-    today = date.today()
-
-    # Find active students with a birthday today
-    birthday_students = Student.objects.filter(
-        birth_date__month=today.month, birth_date__day=today.day, active=True
-    ).values_list("id", flat=True)
+    messages = [
+        {"student_id": student.id, "first_name": student.first_name, "recipient_email": recipient.email}
+        for recipient in resolve_recipients(AUDIENCE_BIRTHDAY_TODAY, is_adult=None)
+        for student in recipient.students
+    ]
 
-    if not birthday_students:
+    if not messages:
         logger.info("No hay cumpleanos hoy")
         return {"status": "success", "birthdays_found": 0}
 
-    logger.info(f"Encontrados {len(birthday_students)} cumpleanos hoy")
+    birthdays_found = len({m["student_id"] for m in messages})
+    logger.info(f"Encontrados {birthdays_found} cumpleanos hoy ({len(messages)} emails)")
 
-    # Queue each email as a separate task (for better error handling and retries)
-    for student_id in birthday_students:
-        send_birthday_email_task.delay(student_id)
+    chunks = chunked(messages, chunk_size)
+    group(send_birthday_chunk_task.s(chunk) for chunk in chunks).apply_async()
 
-    return {"status": "success", "birthdays_found": len(birthday_students), "tasks_queued": len(birthday_students)}
+    return {
+        "status": "success",
+        "birthdays_found": birthdays_found,
+        "emails": len(messages),
+        "chunks_queued": len(chunks),
+    }
 
 
 @shared_task(name="comms.tasks.send_payment_reminders", bind=True)
@@ -276,6 +352,7 @@ def send_enrollment_confirmation_task(self, enrollment_id: int, attachments_path
     import os
 
     from comms.services.email_functions import send_enrollment_confirmation_email
+    from comms.services.mime_cache import mime_cache
     from students.models import Enrollment
 
     MONTHS_ES = [
@@ -309,13 +386,12 @@ def send_enrollment_confirmation_task(self, enrollment_id: int, attachments_path
 
         academic_year = enrollment.academic_year
 
-        # Prepare attachments
+        # Prepare attachments (read once per worker process, see mime_cache)
         attachments = []
         if attachments_paths:
             for path in attachments_paths:
                 if os.path.exists(path):
-                    with open(path, "rb") as f:
-                        attachments.append((os.path.basename(path), f.read(), "application/pdf"))
+                    attachments.append(mime_cache.attachment(path))
 
         success = send_enrollment_confirmation_email(
             parent_email=parent.email,
@@ -10,6 +10,8 @@ from django.urls import path
 from core.views import (
     apps_view,
     birthday_form,
+    download_quarterly_receipt,
+    download_tax_certificate,
     enrollment_form,
     fun_friday_form,
     monthly_report_form,
@@ -30,10 +32,20 @@ urlpatterns = [
     path("apps/payment-reminder/", payment_reminder_form, name="payment_reminder_form"),
     path("apps/vacation-closure/", vacation_closure_form, name="vacation_closure_form"),
     path("apps/tax-certificate/", tax_certificate_form, name="tax_certificate_form"),
+    path(
+        "apps/tax-certificate/<int:parent_id>/<int:year>/download/",
+        download_tax_certificate,
+        name="download_tax_certificate",
+    ),
     path("apps/monthly-report/", monthly_report_form, name="monthly_report_form"),
     path("apps/welcome/", welcome_form, name="welcome_form"),
     path("apps/birthday/", birthday_form, name="birthday_form"),
     path("apps/receipts/", receipts_form, name="receipts_form"),
+    path(
+        "apps/receipts/<int:parent_id>/<int:year>/<int:month>/download/",
+        download_quarterly_receipt,
+        name="download_quarterly_receipt",
+    ),
     path("apps/enrollment/", enrollment_form, name="enrollment_form"),
     path("apps/newsletter/", newsletter_form, name="newsletter_form"),
 ]
@@ -2,11 +2,18 @@ from datetime import date
 from decimal import Decimal
 
 import pytest
+from django.core.cache import cache
 
 from billing.models import Enrollment, EnrollmentType, Payment, SiteConfiguration
 from students.models import Group, Parent, Student, StudentParent, Teacher
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Cached payloads (e.g. navbar notifications) must not leak between tests."""
+    cache.clear()
+
+
 @pytest.fixture
 def site_config(db):
     """Create or get the singleton SiteConfiguration."""
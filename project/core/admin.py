@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import FunFridayAttendance, HistoryLog, ScheduleSlot, TodoItem
+from .models import BackgroundTask, FunFridayAttendance, HistoryLog, ScheduleSlot, TodoItem
 
 admin.site.site_header = "Five a Day eVolution"
 admin.site.site_title = "Five a Day eVolution"
@@ -35,3 +35,11 @@ class FunFridayAttendanceAdmin(admin.ModelAdmin):
     list_filter = ("date",)
     ordering = ("-date",)
     raw_id_fields = ("student",)
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ("task_name", "status", "attempts", "run_after", "created_at")
+    list_filter = ("status", "task_name")
+    ordering = ("run_after",)
+    readonly_fields = ("task_name", "args", "kwargs", "attempts", "started_at", "last_error", "created_at")
@@ -0,0 +1,283 @@
+"""
+In-process background queue for Celery tasks when no broker is configured.
+
+Small deployments run without Redis (``CELERY_BROKER_URL`` unset). Instead of
+running every ``.delay()`` inline in the request (eager mode), tasks go to:
+
+- a ``BackgroundTask`` row, written in the caller's transaction (durable copy), and
+- a bounded thread pool in the same process, fed once that transaction commits.
+
+The request returns as soon as the row is written. A poller thread re-submits
+rows that did not fit in the pool, rows whose ``run_after`` (``countdown``/``eta``)
+is due, and rows left ``running`` by a process that crashed. Successful tasks
+delete their row. A failed or crashed task is retried after an exponential
+backoff (``run_after``); tasks that keep failing, or whose name is not a
+registered task, stay as ``failed`` for inspection in the admin.
+
+Task modules are imported (Celery autodiscovery) before the pool or the
+``process_background_tasks`` command runs anything, so a process that only
+recovers rows knows every task, not just those its requests happened to import.
+
+Tasks themselves still run through Celery's ``task.apply()`` (retries included),
+so the same task code works with and without a broker.
+
+Settings:
+    BACKGROUND_TASKS_LOCAL          Enable the queue (default: no CELERY_BROKER_URL)
+    BACKGROUND_TASKS_WORKERS        Threads in the pool (default 2)
+    BACKGROUND_TASKS_MAX_QUEUED     Tasks handed to the pool at once (default 100)
+    BACKGROUND_TASKS_POLL_SECONDS   Poller interval (default 5)
+    BACKGROUND_TASKS_STALE_SECONDS  A running row older than this is recovered (default CELERY_TASK_TIME_LIMIT)
+    BACKGROUND_TASKS_MAX_ATTEMPTS   Attempts before a task is left as failed (default 3)
+    BACKGROUND_TASKS_RETRY_SECONDS  Delay before the first retry, doubled on each attempt (default 60)
+    BACKGROUND_TASKS_RETRY_MAX_SECONDS  Longest retry delay (default 3600)
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from celery import Task, current_app
+from celery.exceptions import NotRegistered
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def local_queue_enabled() -> bool:
+    return getattr(settings, "BACKGROUND_TASKS_LOCAL", False)
+
+
+def load_task_modules():
+    """Import every app's ``tasks`` module (``app.autodiscover_tasks()`` runs on this signal)."""
+    current_app.loader.import_default_modules()
+
+
+class LocalTaskQueue:
+    """Bounded thread pool backed by the ``background_tasks`` table (one per process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._poller = None
+        self._stop = threading.Event()
+
+    # -- Settings ---------------------------------------------------------
+
+    @property
+    def workers(self) -> int:
+        return getattr(settings, "BACKGROUND_TASKS_WORKERS", 2)
+
+    @property
+    def max_queued(self) -> int:
+        return getattr(settings, "BACKGROUND_TASKS_MAX_QUEUED", 100)
+
+    @property
+    def poll_seconds(self) -> float:
+        return getattr(settings, "BACKGROUND_TASKS_POLL_SECONDS", 5)
+
+    @property
+    def stale_seconds(self) -> int:
+        return getattr(settings, "BACKGROUND_TASKS_STALE_SECONDS", settings.CELERY_TASK_TIME_LIMIT)
+
+    @property
+    def max_attempts(self) -> int:
+        return getattr(settings, "BACKGROUND_TASKS_MAX_ATTEMPTS", 3)
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        """Wait before the next run of a task that failed `attempts` times: base, 2x, 4x... capped."""
+        base = getattr(settings, "BACKGROUND_TASKS_RETRY_SECONDS", 60)
+        cap = getattr(settings, "BACKGROUND_TASKS_RETRY_MAX_SECONDS", 3600)
+        return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+    # -- Producer ---------------------------------------------------------
+
+    def enqueue(self, task_name: str, args=None, kwargs=None, countdown=None, eta=None):
+        """
+        Store the task and hand it to the pool once the current transaction commits.
+
+        If the caller's transaction rolls back, the task is discarded with it.
+        """
+        from core.models import BackgroundTask
+
+        if eta is None:
+            eta = timezone.now() + timedelta(seconds=countdown or 0)
+        task = BackgroundTask.objects.create(
+            task_name=task_name, args=list(args or ()), kwargs=kwargs or {}, run_after=eta
+        )
+        if eta <= timezone.now():
+            transaction.on_commit(lambda: self.submit(task.pk))
+        else:
+            transaction.on_commit(self.start)
+        return task
+
+    def start(self):
+        """Start the pool and the poller (idempotent). Called lazily and at web process start."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            try:
+                load_task_modules()
+            except Exception:
+                logger.exception("Background tasks: could not import task modules")
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="background-task")
+            self._slots = threading.BoundedSemaphore(self.max_queued)
+            self._poller = threading.Thread(target=self._poll_loop, name="background-task-poller", daemon=True)
+            self._poller.start()
+
+    def stop(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._stop.set()
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def submit(self, task_id: int) -> bool:
+        """
+        Hand a stored task to the pool.
+
+        Returns False when the pool already holds ``max_queued`` tasks; the row
+        stays pending and the poller submits it when there is room.
+        """
+        self.start()
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            self._executor.submit(self._run_in_thread, task_id)
+        except RuntimeError:
+            # Pool shut down while submitting (process exiting): the row stays pending
+            self._slots.release()
+            return False
+        return True
+
+    # -- Consumer ---------------------------------------------------------
+
+    def run_pending(self, limit: int | None = None) -> int:
+        """
+        Run due tasks in the calling thread (recovering stale ones first).
+
+        Used by the ``process_background_tasks`` command. Returns how many tasks ran.
+        """
+        load_task_modules()
+        self.recover_stale()
+        ran = 0
+        for task_id in self.due_ids(limit):
+            if self.execute(task_id):
+                ran += 1
+        return ran
+
+    def due_ids(self, limit: int | None = None) -> list[int]:
+        from core.models import BackgroundTask
+
+        ids = BackgroundTask.objects.filter(status=BackgroundTask.PENDING, run_after__lte=timezone.now()).values_list(
+            "id", flat=True
+        )
+        return list(ids[:limit] if limit else ids)
+
+    def recover_stale(self) -> int:
+        """Put back tasks left running by a crashed process, after the backoff; give up after ``max_attempts``."""
+        from core.models import BackgroundTask
+
+        now = timezone.now()
+        stale = BackgroundTask.objects.filter(
+            status=BackgroundTask.RUNNING, started_at__lt=now - timedelta(seconds=self.stale_seconds)
+        )
+        abandoned = stale.filter(attempts__gte=self.max_attempts).update(
+            status=BackgroundTask.FAILED, last_error="Abandoned: worker stopped while running"
+        )
+        recovered = 0
+        # One UPDATE per attempt count (at most max_attempts), each with its own delay
+        for attempts in set(stale.values_list("attempts", flat=True)):
+            recovered += stale.filter(attempts=attempts).update(
+                status=BackgroundTask.PENDING, started_at=None, run_after=now + self.retry_delay(attempts)
+            )
+        if recovered or abandoned:
+            logger.warning(f"Background tasks: {recovered} recovered, {abandoned} abandoned after a crash")
+        return recovered
+
+    def execute(self, task_id: int) -> bool:
+        """
+        Claim a pending task and run it. Returns False if another thread/process claimed it first.
+
+        The claim is a single conditional UPDATE, so several web processes can share the table.
+        """
+        from core.models import BackgroundTask
+
+        claimed = BackgroundTask.objects.filter(id=task_id, status=BackgroundTask.PENDING).update(
+            status=BackgroundTask.RUNNING, started_at=timezone.now(), attempts=F("attempts") + 1
+        )
+        if not claimed:
+            return False
+
+        task = BackgroundTask.objects.get(id=task_id)
+        try:
+            celery_task = current_app.tasks[task.task_name]
+        except NotRegistered:
+            # Task modules are loaded before anything runs: retrying cannot help
+            logger.error(f"Background task #{task_id}: unknown task {task.task_name}")
+            BackgroundTask.objects.filter(id=task_id).update(
+                status=BackgroundTask.FAILED, started_at=None, last_error=f"Unknown task: {task.task_name}"
+            )
+            return True
+
+        try:
+            celery_task.apply(args=task.args, kwargs=task.kwargs).get()
+        except Exception as e:
+            logger.exception(f"Background task {task.task_name} #{task_id} failed")
+            retry = task.attempts < self.max_attempts
+            BackgroundTask.objects.filter(id=task_id).update(
+                status=BackgroundTask.PENDING if retry else BackgroundTask.FAILED,
+                run_after=timezone.now() + self.retry_delay(task.attempts),
+                started_at=None,
+                last_error=str(e)[:2000],
+            )
+            return True
+
+        BackgroundTask.objects.filter(id=task_id).delete()
+        return True
+
+    def _run_in_thread(self, task_id: int):
+        try:
+            close_old_connections()
+            self.execute(task_id)
+        except Exception:
+            logger.exception(f"Background task #{task_id} could not run")
+        finally:
+            self._slots.release()
+            close_old_connections()
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.recover_stale()
+                for task_id in self.due_ids(limit=self.max_queued):
+                    if not self.submit(task_id):
+                        break
+            except Exception:
+                logger.exception("Background task poller error")
+            finally:
+                close_old_connections()
+
+
+local_queue = LocalTaskQueue()
+
+
+class FallbackTask(Task):
+    """
+    Base class for every task of the Celery app (``Celery(task_cls=...)``).
+
+    With a broker it behaves as a normal Celery task. Without one, ``delay()`` /
+    ``apply_async()`` store the task in the local queue and return immediately
+    instead of running it inline.
+    """
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, producer=None, link=None, link_error=None, **options):
+        if not local_queue_enabled():
+            return super().apply_async(args, kwargs, task_id, producer, link, link_error, **options)
+        task = local_queue.enqueue(self.name, args, kwargs, countdown=options.get("countdown"), eta=options.get("eta"))
+        return self.AsyncResult(f"local-{task.pk}")
@@ -1,19 +1,25 @@
+import functools
 from datetime import date
 
 from django.conf import settings
+from django.utils.functional import lazy
 
 from .constants import SCHEDULED_APPS
-from .models import HistoryLog, TodoItem
+from .notifications import notifications_payload
 
 
 def today_notifications(request):
+    """
+    Navbar notifications and history badge.
+
+    Todos and the history count come from the shared cache (core/notifications.py)
+    and are lazy: a template that never uses them triggers no cache or database hit.
+    """
     today = date.today()
 
-    # Todos due today
-    try:
-        todos = list(TodoItem.objects.filter(due_date=today).values("id", "text"))
-    except Exception:
-        todos = []
+    @functools.cache
+    def payload():
+        return notifications_payload(today)
 
     # Scheduled apps that run today
     apps_today = []
@@ -25,14 +31,6 @@ def today_notifications(request):
         elif app["frequency"] == "monthly_day_1" and today.day == 1:
             apps_today.append(app)
 
-    notifications_count = len(todos) + len(apps_today)
-
-    # History log count
-    try:
-        history_count = HistoryLog.objects.count()
-    except Exception:
-        history_count = 0
-
     # QA testing tools visibility
     show_testing_tools = (
         settings.IS_TESTING_ENV
@@ -41,10 +39,10 @@ def today_notifications(request):
     )
 
     return {
-        "notifications_today_todos": todos,
+        "notifications_today_todos": lazy(lambda: payload()["todos"], list)(),
         "notifications_today_apps": apps_today,
-        "notifications_count": notifications_count,
-        "history_count": history_count,
+        "notifications_count": lazy(lambda: len(payload()["todos"]) + len(apps_today), int)(),
+        "history_count": lazy(lambda: payload()["history_count"], int)(),
         "support_email": getattr(settings, "SUPPORT_EMAIL", ""),
         "show_testing_tools": show_testing_tools,
     }
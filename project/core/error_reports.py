@@ -0,0 +1,237 @@
+"""
+Error report pipeline for QAErrorEmailMiddleware.
+
+The failing request only builds a small report and puts it on an in-memory queue
+(no database query, no SMTP). A background thread then:
+
+- checks ``QAConfiguration.error_email_enabled`` and ``SUPPORT_EMAIL``,
+- groups reports by fingerprint (exception type + the frame that raised it),
+- sends at most one email per fingerprint per ``QA_ERROR_REPORT_WINDOW_SECONDS``,
+  with the number of occurrences since the previous email.
+
+Occurrences suppressed inside a window are reported in a summary email once the
+window closes, so an error storm (e.g. a database outage) produces one email per
+distinct error instead of one per failing request.
+
+Settings:
+    QA_ERROR_REPORT_WINDOW_SECONDS  Minimum time between emails for one fingerprint (default 600)
+    QA_ERROR_REPORT_QUEUE_SIZE      Reports buffered before new ones are dropped (default 1000)
+    QA_ERROR_REPORT_BACKGROUND      Start the sending thread (default True; tests call ``drain()``)
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ErrorReport:
+    """What the request knows about an unhandled exception.
+
+    Only strings are kept: a live exception holds its traceback, and with it
+    every frame and local variable of the failing request, for as long as the
+    report sits in the queue or in a fingerprint window.
+    """
+
+    exception_type: str
+    message: str
+    traceback: str
+    fingerprint: str
+    method: str
+    path: str
+    username: str
+    body_preview: str
+    occurred_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def from_exception(cls, exception: BaseException, method: str, path: str, username: str, body_preview: str):
+        """Report of `exception`, with its traceback formatted right away."""
+        return cls(
+            exception_type=type(exception).__name__,
+            message=str(exception),
+            traceback="".join(traceback.format_exception(type(exception), exception, exception.__traceback__)),
+            fingerprint=exception_fingerprint(exception),
+            method=method,
+            path=path,
+            username=username,
+            body_preview=body_preview,
+        )
+
+
+@dataclass
+class FingerprintState:
+    """Occurrences of one fingerprint since its last email."""
+
+    last_sent: float | None = None
+    suppressed: int = 0
+    last_report: ErrorReport | None = None
+
+
+def exception_fingerprint(exception: BaseException) -> str:
+    """Exception type plus the file, function and line of the frame that raised it."""
+    frames = traceback.extract_tb(exception.__traceback__)
+    frame = frames[-1] if frames else None
+    location = f"{frame.filename}:{frame.name}:{frame.lineno}" if frame else ""
+    key = f"{type(exception).__module__}.{type(exception).__qualname__}|{location}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def format_report(report: ErrorReport, occurrences: int) -> tuple[str, str]:
+    """Subject and body of the error email."""
+    repeated = f" (x{occurrences})" if occurrences > 1 else ""
+    subject = f"[ERROR] {report.exception_type} at {report.path}{repeated}"
+    body = (
+        f"AUTOMATED ERROR REPORT — Five a Day QA\n"
+        f"{'=' * 60}\n\n"
+        f"Exception:   {report.exception_type}: {report.message}\n"
+        f"Path:        {report.method} {report.path}\n"
+        f"User:        {report.username}\n"
+        f"Version:     {settings.APP_VERSION}\n"
+        f"Environment: {settings.ENVIRONMENT}\n"
+        f"Debug:       {settings.DEBUG}\n"
+        f"Server time: {report.occurred_at:%Y-%m-%d %H:%M:%S}\n"
+        f"Fingerprint: {report.fingerprint}\n"
+        f"Occurrences: {occurrences} since the last report\n\n"
+        f"REQUEST BODY (first 500 chars):\n"
+        f"{report.body_preview or '(empty)'}\n\n"
+        f"TRACEBACK (latest occurrence):\n"
+        f"{'-' * 60}\n"
+        f"{report.traceback}\n"
+        f"{'=' * 60}\n"
+    )
+    return subject, body
+
+
+class ErrorReporter:
+    """In-memory queue + background thread that deduplicates and emails error reports (one per process)."""
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._states: dict[str, FingerprintState] = {}
+        self.dropped = 0
+
+    @property
+    def window(self) -> float:
+        return getattr(settings, "QA_ERROR_REPORT_WINDOW_SECONDS", 600)
+
+    @property
+    def reports(self) -> queue.Queue:
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=getattr(settings, "QA_ERROR_REPORT_QUEUE_SIZE", 1000))
+            return self._queue
+
+    # -- Request side ------------------------------------------------------
+
+    def enqueue(self, report: ErrorReport) -> bool:
+        """Queue a report without blocking. Returns False (and counts it) if the queue is full."""
+        if getattr(settings, "QA_ERROR_REPORT_BACKGROUND", True):
+            self.start()
+        try:
+            self.reports.put_nowait(report)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="qa-error-reporter", daemon=True)
+            self._thread.start()
+
+    # -- Worker side -------------------------------------------------------
+
+    def drain(self) -> int:
+        """Process every queued report and due summaries in the calling thread. Returns emails sent."""
+        sent = 0
+        while True:
+            try:
+                report = self.reports.get_nowait()
+            except queue.Empty:
+                break
+            sent += self.process(report)
+        return sent + self.flush_due()
+
+    def process(self, report: ErrorReport, now: float | None = None) -> int:
+        """Count the occurrence; email it if its fingerprint is outside the window. Returns emails sent."""
+        now = time.monotonic() if now is None else now
+        state = self._states.setdefault(report.fingerprint, FingerprintState())
+        state.suppressed += 1
+        state.last_report = report
+        if state.last_sent is not None and now - state.last_sent < self.window:
+            return 0
+        return self._send(state, now)
+
+    def flush_due(self, now: float | None = None) -> int:
+        """Email the occurrences suppressed during windows that have now closed."""
+        now = time.monotonic() if now is None else now
+        sent = 0
+        for fingerprint, state in list(self._states.items()):
+            if now - state.last_sent < self.window:
+                continue
+            if state.suppressed:
+                sent += self._send(state, now)
+            else:
+                del self._states[fingerprint]
+        return sent
+
+    def reset(self):
+        """Forget queued reports and fingerprint windows."""
+        with self._lock:
+            self._queue = None
+        self._states.clear()
+        self.dropped = 0
+
+    def _send(self, state: FingerprintState, now: float) -> int:
+        report, occurrences = state.last_report, state.suppressed
+        state.last_sent = now
+        state.suppressed = 0
+
+        from core.models import QAConfiguration
+
+        support_email = getattr(settings, "SUPPORT_EMAIL", None)
+        if not support_email or not QAConfiguration.get_config().error_email_enabled:
+            return 0
+
+        subject, body = format_report(report, occurrences)
+        send_mail(
+            subject=subject,
+            message=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[support_email],
+            fail_silently=True,
+        )
+        return 1
+
+    def _run(self):
+        while True:
+            try:
+                report = self.reports.get(timeout=min(self.window, 60))
+            except queue.Empty:
+                report = None
+            try:
+                if report is not None:
+                    self.process(report)
+                self.flush_due()
+            except Exception:
+                logger.exception("QA error reporter failed to send error email")
+            finally:
+                close_old_connections()
+
+
+error_reporter = ErrorReporter()
@@ -0,0 +1,77 @@
+"""
+Request-scoped buffer for HistoryLog writes.
+
+Inside a request (``HistoryBufferMiddleware``), ``HistoryLog.log`` and
+``log_debounced`` do not touch the database. Each entry is kept in memory and
+registered with ``transaction.on_commit``; at the end of the request the
+committed entries are written with a single ``bulk_create``. Entries logged in
+an ``atomic()`` block that rolls back never get their on_commit callback, so
+they are dropped with the rest of that transaction's work.
+
+``log_debounced`` checks the database at most once per action and request; later
+calls in the same request reuse that decision (or skip, once the action was logged).
+
+Outside a request (Celery tasks, management commands, shell) there is no buffer
+and HistoryLog writes immediately, as before.
+
+Usage:
+    with history_buffer():
+        HistoryLog.log("payment_created", "...")
+        HistoryLog.log("email_sent", "...")
+    # one INSERT here
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+_current = ContextVar("history_buffer", default=None)
+
+
+class HistoryBuffer:
+    """Entries and debounce decisions of one request."""
+
+    def __init__(self):
+        self.committed = []
+        self.closed = False
+        self.recent_actions: dict[str, bool] = {}
+
+    def add(self, entry):
+        """Keep `entry` until its transaction commits (immediately in autocommit mode)."""
+        transaction.on_commit(lambda: self._on_commit(entry))
+
+    def flush(self) -> list:
+        """Write the committed entries with one bulk_create and close the buffer. Returns the created entries."""
+        entries, self.committed = self.committed, []
+        self.closed = True
+        return self._write(entries)
+
+    def _on_commit(self, entry):
+        if self.closed:
+            # Transaction committed after the request ended: write on its own
+            self._write([entry])
+        else:
+            self.committed.append(entry)
+
+    @staticmethod
+    def _write(entries) -> list:
+        from core.models import HistoryLog
+
+        return HistoryLog.bulk_write(entries) if entries else []
+
+
+def current_buffer() -> HistoryBuffer | None:
+    return _current.get()
+
+
+@contextmanager
+def history_buffer():
+    """Buffer HistoryLog writes until the block ends, then flush them in one INSERT."""
+    buffer = HistoryBuffer()
+    token = _current.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _current.reset(token)
+        buffer.flush()
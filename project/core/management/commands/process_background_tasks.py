@@ -0,0 +1,38 @@
+"""
+Run the tasks waiting in the in-process background queue (``background_tasks`` table).
+
+Web processes run these tasks on their own; this command drains the queue when
+no web process is up (e.g. after a crash, or from a cron job), recovering tasks
+that a dead process left running.
+
+Usage:
+    python manage.py process_background_tasks            # Run every due task
+    python manage.py process_background_tasks --limit 50
+    python manage.py process_background_tasks --list     # Show queued and failed tasks
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.background_queue import local_queue
+from core.models import BackgroundTask
+
+
+class Command(BaseCommand):
+    help = "Run due tasks from the in-process background queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Run at most N tasks")
+        parser.add_argument("--list", action="store_true", help="List queued and failed tasks without running them")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for task in BackgroundTask.objects.all():
+                error = f" — {task.last_error[:80]}" if task.last_error else ""
+                self.stdout.write(
+                    f"  {task} (attempts {task.attempts}, run after {task.run_after:%Y-%m-%d %H:%M}){error}"
+                )
+            return
+
+        ran = local_queue.run_pending(limit=options["limit"])
+        failed = BackgroundTask.objects.filter(status=BackgroundTask.FAILED).count()
+        self.stdout.write(self.style.SUCCESS(f"{ran} task(s) run, {failed} failed in the table"))
@@ -3,10 +3,7 @@ Middleware — authentication and QA error reporting.
 """
 
 import logging
-import traceback
 
-from django.conf import settings
-from django.core.mail import send_mail
 from django.shortcuts import redirect
 from django.urls import reverse
 
@@ -18,6 +15,9 @@ class QAErrorEmailMiddleware:
     When QAConfiguration.error_email_enabled is True, catches unhandled
     exceptions and sends a detailed report to SUPPORT_EMAIL.
     Must be placed AFTER SecurityMiddleware and BEFORE other app middleware.
+
+    The request only queues the report in memory; the configuration check,
+    deduplication and SMTP happen in a background thread (core/error_reports.py).
     """
 
     def __init__(self, get_response):
@@ -29,56 +29,26 @@ class QAErrorEmailMiddleware:
 
     def process_exception(self, request, exception):
         try:
-            from core.models import QAConfiguration
-
-            config = QAConfiguration.get_config()
-            if not config.error_email_enabled:
-                return None
-
-            support_email = getattr(settings, "SUPPORT_EMAIL", None)
-            if not support_email:
-                return None
-
-            tb = traceback.format_exception(type(exception), exception, exception.__traceback__)
-            tb_str = "".join(tb)
+            from core.error_reports import ErrorReport, error_reporter
 
             username = request.session.get("username", "anonymous") if hasattr(request, "session") else "—"
-            method = request.method
-            path = request.get_full_path()
             body_preview = ""
             try:
                 body_preview = request.body[:500].decode("utf-8", errors="replace")
             except Exception:
                 pass
 
-            subject = f"[ERROR] {type(exception).__name__} at {path}"
-            body = (
-                f"AUTOMATED ERROR REPORT — Five a Day QA\n"
-                f"{'=' * 60}\n\n"
-                f"Exception:   {type(exception).__name__}: {exception}\n"
-                f"Path:        {method} {path}\n"
-                f"User:        {username}\n"
-                f"Version:     {settings.APP_VERSION}\n"
-                f"Environment: {settings.ENVIRONMENT}\n"
-                f"Debug:       {settings.DEBUG}\n"
-                f"Server time: {__import__('datetime').datetime.now():%Y-%m-%d %H:%M:%S}\n\n"
-                f"REQUEST BODY (first 500 chars):\n"
-                f"{body_preview or '(empty)'}\n\n"
-                f"TRACEBACK:\n"
-                f"{'-' * 60}\n"
-                f"{tb_str}\n"
-                f"{'=' * 60}\n"
-            )
-
-            send_mail(
-                subject=subject,
-                message=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[support_email],
-                fail_silently=True,
+            error_reporter.enqueue(
+                ErrorReport.from_exception(
+                    exception,
+                    method=request.method,
+                    path=request.get_full_path(),
+                    username=username,
+                    body_preview=body_preview,
+                )
             )
         except Exception:
-            logger.exception("QAErrorEmailMiddleware failed to send error email")
+            logger.exception("QAErrorEmailMiddleware failed to queue error report")
 
         return None  # Let Django's default error handling continue
 
@@ -112,3 +82,19 @@ class SimpleAuthMiddleware:
 
         response = self.get_response(request)
         return response
+
+
+class HistoryBufferMiddleware:
+    """
+    Buffers HistoryLog writes during the request and flushes the committed ones
+    in a single INSERT when the response is ready (core/history_buffer.py).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from core.history_buffer import history_buffer
+
+        with history_buffer():
+            return self.get_response(request)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_background_tasks"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="historylog",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="historylog",
+            name="history_log_created_bc72c4_idx",
+        ),
+        migrations.AddIndex(
+            model_name="historylog",
+            index=models.Index(fields=["-created_at", "-id"], name="history_log_created_id_idx"),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_scheduleslot_updated_at"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="backgroundtask",
+            name="background__status_762b23_idx",
+        ),
+        migrations.RenameField(
+            model_name="backgroundtask",
+            old_name="eta",
+            new_name="run_after",
+        ),
+        migrations.AlterModelOptions(
+            name="backgroundtask",
+            options={"ordering": ["run_after", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="backgroundtask",
+            index=models.Index(fields=["status", "run_after"], name="background__status_bd6976_idx"),
+        ),
+    ]
@@ -3,11 +3,13 @@ Core models — lightweight cross-cutting models that don't belong to a specific
 Domain models live in students/ and billing/.
 """
 
-from datetime import date, timedelta
+from datetime import UTC, date, datetime, timedelta
 
 from django.db import models
 from django.utils import timezone
 
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
 
 class ScheduleSlot(models.Model):
     """Persists which group is assigned to each schedule slot (row, day, col)."""
@@ -18,6 +20,8 @@ class ScheduleSlot(models.Model):
     group = models.ForeignKey(
         "students.Group", null=True, blank=True, on_delete=models.SET_NULL, related_name="schedule_slots"
     )
+    # Part of the schedule page version (core/schedule_cache.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "schedule_slots"
@@ -66,7 +70,15 @@ class TodoItem(models.Model):
 
 
 class HistoryLog(models.Model):
-    """Stores up to 1000 history log entries for user actions."""
+    """Stores up to 1000 history log entries for user actions.
+
+    Writes are append-only inserts. The cap is enforced by ``prune()``, which runs
+    each time the ids pass a multiple of ``PRUNE_EVERY`` (amortized), so the log
+    can briefly hold up to ``MAX_ENTRIES + PRUNE_EVERY`` rows.
+
+    Inside a request, writes are buffered and flushed in one INSERT after commit
+    (see core/history_buffer.py).
+    """
 
     ACTION_CHOICES = [
         ("todo_completed", "Tarea completada"),
@@ -88,31 +100,128 @@ class HistoryLog(models.Model):
 
     class Meta:
         db_table = "history_logs"
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
         indexes = [
-            models.Index(fields=["-created_at"]),
+            # Keyset pagination: (created_at, id) cursors are a range scan on this index
+            models.Index(fields=["-created_at", "-id"], name="history_log_created_id_idx"),
         ]
 
     def __str__(self):
         return f"[{self.get_action_display()}] {self.message}"
 
     MAX_ENTRIES = 1000
+    PRUNE_EVERY = 50
 
     @classmethod
     def log(cls, action, message, icon="history"):
-        """Create a history entry, enforcing the 1000-record cap."""
-        entry = cls.objects.create(action=action, message=message, icon=icon)
-        if cls.objects.count() > cls.MAX_ENTRIES:
-            keep_ids = cls.objects.order_by("-created_at").values_list("id", flat=True)[: cls.MAX_ENTRIES]
-            cls.objects.exclude(id__in=keep_ids).delete()
-        return entry
+        """Create a history entry (buffered until commit inside a request, else one INSERT)."""
+        from core.history_buffer import current_buffer
+
+        entry = cls(action=action, message=message, icon=icon)
+        buffer = current_buffer()
+        if buffer is not None:
+            buffer.add(entry)
+            return entry
+        return cls.bulk_write([entry])[0]
+
+    @classmethod
+    def log_many(cls, entries, icon="history"):
+        """Create several entries with a single bulk_create, e.g. one per item of a bulk action.
+
+        Args:
+            entries: Iterable of (action, message) pairs
+            icon: Icon shared by all entries
+        """
+        now = timezone.now()
+        return cls.bulk_write(
+            [cls(action=action, message=message, icon=icon, created_at=now) for action, message in entries]
+        )
+
+    @classmethod
+    def bulk_write(cls, entries):
+        """INSERT `entries` in one statement and prune if their ids pass a multiple of PRUNE_EVERY."""
+        created = cls.objects.bulk_create(entries)
+        ids = [entry.pk for entry in created]
+        if not ids:
+            return created
+        if None in ids or max(ids) // cls.PRUNE_EVERY != (min(ids) - 1) // cls.PRUNE_EVERY:
+            cls.prune()
+
+        from core.signals import history_written
+
+        history_written.send(sender=cls, entries=created)
+        return created
+
+    @classmethod
+    def prune(cls):
+        """Keep the newest MAX_ENTRIES rows: find the id threshold on the primary key, delete below it.
+
+        Returns the number of deleted entries.
+        """
+        threshold = cls.objects.order_by("-id").values_list("id", flat=True)[cls.MAX_ENTRIES : cls.MAX_ENTRIES + 1]
+        threshold = next(iter(threshold), None)
+        if threshold is None:
+            return 0
+        deleted, _ = cls.objects.filter(id__lte=threshold).delete()
+        return deleted
+
+    # -- Keyset pagination -------------------------------------------------
+
+    @property
+    def cursor(self):
+        """Opaque position of this entry for ``page_before`` / ``since``."""
+        micros = (self.created_at - EPOCH) // timedelta(microseconds=1)
+        return f"{micros}-{self.id}"
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """(created_at, id) from a cursor string. Raises ValueError if malformed."""
+        micros, entry_id = cursor.split("-")
+        created_at = EPOCH + timedelta(microseconds=int(micros))
+        return created_at, int(entry_id)
+
+    @classmethod
+    def page_before(cls, cursor=None, limit=20):
+        """Up to `limit` entries older than `cursor` (newest first) and whether there are more.
+
+        One range scan on (created_at, id): cost does not grow with depth.
+        """
+        entries = cls.objects.all()
+        if cursor:
+            created_at, entry_id = cls.parse_cursor(cursor)
+            entries = entries.filter(
+                models.Q(created_at__lt=created_at) | models.Q(created_at=created_at, id__lt=entry_id)
+            )
+        entries = list(entries[: limit + 1])
+        return entries[:limit], len(entries) > limit
+
+    @classmethod
+    def since(cls, cursor, limit=100):
+        """Up to `limit` entries newer than `cursor` (oldest first, for polling) and whether there are more.
+
+        Oldest first so that a poll resuming from the last entry returned never skips any.
+        """
+        created_at, entry_id = cls.parse_cursor(cursor)
+        entries = cls.objects.filter(
+            models.Q(created_at__gt=created_at) | models.Q(created_at=created_at, id__gt=entry_id)
+        ).order_by("created_at", "id")
+        entries = list(entries[: limit + 1])
+        return entries[:limit], len(entries) > limit
 
     @classmethod
     def log_debounced(cls, action, message, icon="history", minutes=5):
         """Create a history entry only if no entry with the same action
-        exists within the last `minutes` minutes."""
-        cutoff = timezone.now() - timedelta(minutes=minutes)
-        if cls.objects.filter(action=action, created_at__gte=cutoff).exists():
+        exists within the last `minutes` minutes (checked once per action and request)."""
+        from core.history_buffer import current_buffer
+
+        buffer = current_buffer()
+        recent = buffer.recent_actions.get(action) if buffer is not None else None
+        if recent is None:
+            cutoff = timezone.now() - timedelta(minutes=minutes)
+            recent = cls.objects.filter(action=action, created_at__gte=cutoff).exists()
+        if buffer is not None:
+            buffer.recent_actions[action] = True
+        if recent:
             return None
         return cls.log(action, message, icon=icon)
 
@@ -170,3 +279,42 @@ class QAConfiguration(models.Model):
     def get_config(cls):
         config, _ = cls.objects.get_or_create(pk=1)
         return config
+
+
+class BackgroundTask(models.Model):
+    """Celery task queued in-process when no broker is configured (see core/background_queue.py).
+
+    Rows are the durable copy of the in-memory queue: a task is deleted once it
+    succeeds, so pending/running rows left behind by a crashed process are picked
+    up again by the next one. ``run_after`` is the ``countdown``/``eta`` of the
+    call, then the retry time (exponential backoff) after a failure or a crash.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "background_tasks"
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"[{self.status}] {self.task_name} #{self.pk}"
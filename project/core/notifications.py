@@ -0,0 +1,86 @@
+"""
+Shared-cache payload of the navbar notifications (``today_notifications``).
+
+The context processor runs on every template render, AJAX partials included.
+The database part of its output (todos due today, history entry count) is kept
+in the default cache under a key that includes a version number:
+
+- ``TodoItem`` saves/deletes bump the version through signals (core/signals.py).
+- ``HistoryLog`` writes bump it through ``history_written``, which
+  ``HistoryLog.bulk_write`` sends after each batch (bulk_create sends no
+  ``post_save``).
+
+A bump makes every process read a new key, so the next render queries the
+database once and refills the cache. Old keys expire after
+``NOTIFICATIONS_CACHE_SECONDS``, which also bounds staleness for writes that
+send no signal (queryset ``update()``, admin deletes of history entries).
+
+This needs a cache shared by every worker (Redis): with a per-process cache
+(LocMem, the default without ``REDIS_URL``) a bump only reaches the worker that
+made the write. Without one (``core.pagination.cache_is_shared``) nothing is
+cached and every render reads the database, like ``schedule_view``'s ETag that
+hashes this payload.
+
+Settings:
+    NOTIFICATIONS_CACHE_SECONDS  Lifetime of a cached payload (default 300)
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "notifications:version"
+
+
+def notifications_version() -> int:
+    # Start from the clock, not 1, so a version evicted from the cache never reuses old payload keys
+    return cache.get_or_set(VERSION_KEY, time.time_ns, timeout=None)
+
+
+def bump_notifications_version():
+    """Invalidate every cached payload."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def notifications_payload(today) -> dict:
+    """
+    ``{"todos": [{"id", "text"}, ...], "history_count": int}`` for `today`.
+
+    Served from the shared cache while the version is unchanged. On database
+    errors the result is empty and is not cached.
+    """
+    from core.pagination import cache_is_shared
+
+    if not cache_is_shared():
+        return _load_payload(today) or {"todos": [], "history_count": 0}
+
+    key = f"notifications:{notifications_version()}:{today.isoformat()}"
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = _load_payload(today)
+    if payload is not None:
+        cache.set(key, payload, getattr(settings, "NOTIFICATIONS_CACHE_SECONDS", 300))
+    return payload or {"todos": [], "history_count": 0}
+
+
+def _load_payload(today) -> dict | None:
+    """The payload straight from the database, or None on database errors."""
+    from core.models import HistoryLog, TodoItem
+
+    try:
+        return {
+            "todos": list(TodoItem.objects.filter(due_date=today).values("id", "text")),
+            "history_count": HistoryLog.objects.count(),
+        }
+    except Exception:
+        logger.exception("Could not load notifications")
+        return None
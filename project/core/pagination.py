@@ -0,0 +1,131 @@
+"""
+Paginator with cheap row counts for the large list views.
+
+``Paginator.count`` runs a ``COUNT(*)`` with every join and filter of the
+queryset on each request, only to print "N total". ``estimated_count`` avoids
+it where it can:
+
+- Unfiltered queryset on PostgreSQL: the planner estimate
+  ``pg_class.reltuples`` (kept up to date by autovacuum/ANALYZE), once the
+  table has at least ``EXACT_COUNT_THRESHOLD`` rows.
+- Filtered queryset on a small table (below ``EXACT_COUNT_THRESHOLD``): exact
+  ``COUNT(*)``, which is cheap there and keeps filtered totals right.
+- Anything else: the exact count, stored in the default cache under the SQL
+  of the query and a per-table version. Saves and deletes of the counted
+  models bump the version through signals (core/signals.py), so the next
+  request counts again.
+
+Cached counts need a cache shared by every worker (Redis, see ``CACHES`` in
+settings): a bump only reaches the cache of the process that made the write.
+With a per-process cache (LocMem, the default without ``REDIS_URL``) or the
+dummy cache nothing is cached and every count that is not a PostgreSQL
+estimate is an exact ``COUNT(*)``.
+
+With a shared cache, writes that send no signal (queryset
+``update()``/``delete()``, writes to the joined tables a filter looks at) are
+picked up when the cached count expires after ``COUNT_CACHE_SECONDS``. Counts
+are therefore approximate; the paginator clamps out-of-range pages as
+``get_page`` always did.
+
+Settings:
+    COUNT_CACHE_SECONDS    Lifetime of a cached count (default 300)
+    EXACT_COUNT_THRESHOLD  Table size up to which filtered counts are exact (default 10000)
+"""
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def cache_is_shared() -> bool:
+    """Whether the default cache is seen by every worker (not per-process LocMem nor the dummy cache)."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def _version_key(model):
+    return f"counts:{model._meta.db_table}:version"
+
+
+def count_version(model) -> int:
+    return cache.get_or_set(_version_key(model), time.time_ns, timeout=None)
+
+
+def bump_count_version(model):
+    """Invalidate every cached count of `model`'s table."""
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.set(_version_key(model), time.time_ns(), timeout=None)
+
+
+def postgres_estimate(model, using="default"):
+    """``pg_class.reltuples`` of `model`'s table, or None off PostgreSQL / before the first ANALYZE."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+    except DatabaseError:
+        logger.exception("Could not read the row estimate of %s", model._meta.db_table)
+        return None
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def cached_count(queryset) -> int:
+    """Exact count of `queryset`, cached until its table's version changes."""
+    query = queryset.order_by().query
+    sql, params = query.sql_with_params()
+    digest = hashlib.md5(f"{sql}{params!r}".encode(), usedforsecurity=False).hexdigest()
+    key = f"counts:{queryset.model._meta.db_table}:{count_version(queryset.model)}:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, "COUNT_CACHE_SECONDS", 300))
+    return count
+
+
+def estimated_count(queryset) -> int:
+    """Row count of `queryset`, from the cheapest source that is good enough (see module docstring)."""
+    model = queryset.model
+    threshold = getattr(settings, "EXACT_COUNT_THRESHOLD", 10000)
+    estimate = postgres_estimate(model, queryset.db)
+    if not queryset.query.where:
+        if estimate is not None and estimate >= threshold:
+            return estimate
+        if not cache_is_shared():
+            return queryset.count()
+        return cached_count(queryset)
+    if not cache_is_shared():
+        return queryset.count()
+
+    table_size = estimate if estimate is not None else cached_count(model._default_manager.using(queryset.db))
+    if table_size < threshold:
+        return queryset.count()
+    return cached_count(queryset)
+
+
+class EstimatedCountPaginator(Paginator):
+    """``Paginator`` whose ``count`` comes from ``estimated_count``."""
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        return estimated_count(self.object_list)
@@ -0,0 +1,136 @@
+"""
+Versioned payload of the schedule page (``schedule_view``).
+
+The page embeds three JSON blobs (groups with their students, saved slots,
+every active student) that only change when a group, teacher, student or slot
+changes. ``schedule_state()`` reads a version of those tables from the
+database itself: row count and newest ``updated_at`` of each one, in one
+``UNION ALL`` query. Any save, bulk upsert or delete changes it, and every
+worker sees the same value, whether the cache is shared (Redis) or per
+process (LocMem). So:
+
+- the blobs are serialized once per version and kept in the default cache
+  (with LocMem, once per worker);
+- the version is part of the page's ETag, so browsers get a 304 while nothing
+  changed;
+- the payload also carries ``slots_version``, a hash of the slot grid the
+  page shows; the editor sends it back with its batch save, which is refused
+  when the grid changed since it was loaded.
+
+Queryset ``update()`` calls do not touch ``updated_at`` and are only picked up
+by the next change to the same table.
+
+Settings:
+    SCHEDULE_CACHE_SECONDS  Lifetime of a cached payload (default 3600)
+"""
+
+import hashlib
+import json
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+ROW_STARTS = ["16:10", "17:40", "19:10"]
+ROW_ENDS = ["17:30", "19:00", "20:30"]
+FRI_START = "16:00"
+FRI_END = "17:20"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _timeout():
+    return getattr(settings, "SCHEDULE_CACHE_SECONDS", 3600)
+
+
+def schedule_state():
+    """``(version, last_modified)`` of the tables the schedule page shows, from one query."""
+    from core.models import ScheduleSlot
+    from students.models import Group, Student, Teacher
+
+    def table_stats(model):
+        return (
+            model.objects.order_by()
+            .annotate(table=models.Value(model._meta.db_table))
+            .values("table")
+            .annotate(rows=models.Count("pk"), newest=models.Max("updated_at"))
+            .values_list("table", "rows", "newest")
+        )
+
+    stats = sorted(
+        table_stats(Group).union(table_stats(Teacher), table_stats(Student), table_stats(ScheduleSlot), all=True)
+    )
+    version = hashlib.md5(repr(stats).encode(), usedforsecurity=False).hexdigest()
+    last_modified = max((newest for _, _, newest in stats if newest), default=EPOCH)
+    return version, last_modified
+
+
+def schedule_version() -> str:
+    return schedule_state()[0]
+
+
+def slots_version(slots) -> str:
+    """Version of a slot grid: `slots` are ``(row, day, col, group_id)`` tuples, in any order."""
+    return hashlib.md5(repr(sorted(slots)).encode(), usedforsecurity=False).hexdigest()
+
+
+def _build_payload():
+    from core.models import ScheduleSlot
+    from students.models import Group, Student
+
+    groups = (
+        Group.objects.filter(active=True)
+        .select_related("teacher")
+        .prefetch_related(
+            models.Prefetch(
+                "students",
+                queryset=Student.objects.filter(active=True)
+                .only("id", "group_id", "first_name")
+                .order_by("first_name"),
+            )
+        )
+        .order_by("group_name")
+    )
+    groups_data = [
+        {
+            "id": g.id,
+            "name": g.group_name,
+            "color": g.color,
+            "teacher": g.teacher.first_name,
+            "students": [s.first_name for s in g.students.all()],
+        }
+        for g in groups
+    ]
+
+    slots = list(ScheduleSlot.objects.values_list("row", "day", "col", "group_id"))
+    slots_data = []
+    for row, day, col, group_id in slots:
+        if day == 4:
+            start, end = FRI_START, FRI_END
+        else:
+            start, end = ROW_STARTS[row], ROW_ENDS[row]
+        slots_data.append({"row": row, "day": day, "col": col, "group_id": group_id, "start": start, "end": end})
+
+    students_data = list(
+        Student.objects.filter(active=True).order_by("first_name", "last_name").values("first_name", "last_name")
+    )
+
+    return {
+        "groups_json": json.dumps(groups_data),
+        "slots_json": json.dumps(slots_data),
+        "students_json": json.dumps(students_data),
+        # Precondition of the batch save (save_schedule_grid)
+        "slots_version": slots_version(slots),
+    }
+
+
+def schedule_payload(version=None) -> dict:
+    """``{"groups_json", "slots_json", "students_json", "slots_version"}`` of `version` (read from the database by default)."""
+    version = version or schedule_version()
+    key = f"schedule:{version}:payload"
+    payload = cache.get(key)
+    if payload is None:
+        payload = _build_payload()
+        cache.set(key, payload, _timeout())
+    return payload
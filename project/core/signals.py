@@ -0,0 +1,35 @@
+"""
+Signals of core: invalidate the cached navbar notifications (core/notifications.py)
+and the cached row counts of the paginated list views (core/pagination.py).
+
+``HistoryLog`` has no ``post_delete`` receiver on purpose: it would turn the
+id-threshold DELETE of ``HistoryLog.prune()`` into one query per pruned row.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from billing.models import Payment
+from core.models import HistoryLog, TodoItem
+from core.notifications import bump_notifications_version
+from core.pagination import bump_count_version
+from students.models import Student
+
+# Sent by HistoryLog.bulk_write after inserting (and pruning) a batch
+history_written = Signal()
+
+
+@receiver(post_save, sender=TodoItem)
+@receiver(post_delete, sender=TodoItem)
+@receiver(post_save, sender=HistoryLog)
+@receiver(history_written, sender=HistoryLog)
+def invalidate_notifications(sender, **kwargs):
+    bump_notifications_version()
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_counts(sender, **kwargs):
+    bump_count_version(sender)
@@ -126,6 +126,28 @@
         });
     }
 
+    /* Form-specific: recipient count for the age range (Fun Friday) */
+    var recipientCount = document.getElementById('recipientCount');
+    if (recipientCount) {
+        var countForm = recipientCount.closest('form') || document.querySelector('form');
+        ['min_age', 'max_age', 'event_date'].forEach(function (id) {
+            var input = document.getElementById(id);
+            if (!input) return;
+            input.addEventListener('change', function () {
+                var data = new FormData(countForm);
+                data.set('action', 'count');
+                fetch(window.location.pathname, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': data.get('csrfmiddlewaretoken') },
+                    body: data,
+                })
+                .then(function (r) { return r.json(); })
+                .then(function (d) { if (typeof d.count === 'number') recipientCount.textContent = d.count; })
+                .catch(function () {});
+            });
+        });
+    }
+
     /* Form-specific: enrollment email type toggle */
     var emailTypeSelect = document.getElementById('emailTypeSelect');
     if (emailTypeSelect) {
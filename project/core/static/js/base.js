@@ -1,6 +1,6 @@
 /**
  * base.js — Global scripts loaded on every authenticated page.
- * Handles: notification dropdown, history dropdown with lazy-load pagination.
+ * Handles: notification dropdown, history dropdown with cursor pagination and polling for new entries.
  *
  * Requires data attributes on the page:
  *   <body data-history-url="{% url 'history_list' %}">
@@ -51,7 +51,8 @@
     const historyUrl = document.body.dataset.historyUrl || '/api/history/';
 
     if (historyBtn && historyDropdown) {
-        let offset = 0;
+        let nextCursor = null;
+        let latestCursor = null;
         let loaded = false;
 
         function formatTimeAgo(isoStr) {
@@ -68,6 +69,18 @@
             return then.toLocaleDateString('es-ES', { day: '2-digit', month: 'short' });
         }
 
+        function entryElement(e) {
+            const div = document.createElement('div');
+            div.className = 'px-4 py-3 border-b border-neutral-50 flex items-start gap-3 hover:bg-neutral-50';
+            div.innerHTML =
+                '<span class="material-symbols-outlined text-primary-400 shrink-0 text-xl mt-0.5">' + e.icon + '</span>' +
+                '<div class="flex-1 min-w-0">' +
+                '<p class="text-neutral-700 text-sm leading-snug break-words">' + e.message + '</p>' +
+                '<p class="text-xs text-neutral-400 mt-0.5">' + formatTimeAgo(e.created_at) + '</p>' +
+                '</div>';
+            return div;
+        }
+
         function renderEntries(entries, append) {
             if (!append) entriesContainer.innerHTML = '';
             if (entries.length === 0 && !append) {
@@ -78,24 +91,37 @@
                 return;
             }
             entries.forEach(function (e) {
-                const div = document.createElement('div');
-                div.className = 'px-4 py-3 border-b border-neutral-50 flex items-start gap-3 hover:bg-neutral-50';
-                div.innerHTML =
-                    '<span class="material-symbols-outlined text-primary-400 shrink-0 text-xl mt-0.5">' + e.icon + '</span>' +
-                    '<div class="flex-1 min-w-0">' +
-                    '<p class="text-neutral-700 text-sm leading-snug break-words">' + e.message + '</p>' +
-                    '<p class="text-xs text-neutral-400 mt-0.5">' + formatTimeAgo(e.created_at) + '</p>' +
-                    '</div>';
-                entriesContainer.appendChild(div);
+                entriesContainer.appendChild(entryElement(e));
             });
         }
 
+        // Re-opening the dropdown only asks for entries newer than the newest one shown
+        // (oldest first, in pages; keeps asking while has_more)
+        function fetchNewEntries() {
+            if (!latestCursor) {
+                fetchHistory(false);
+                return;
+            }
+            fetch(historyUrl + '?since=' + encodeURIComponent(latestCursor))
+                .then(function (r) { return r.json(); })
+                .then(function (data) {
+                    latestCursor = data.latest_cursor;
+                    data.entries.forEach(function (e) {
+                        entriesContainer.insertBefore(entryElement(e), entriesContainer.firstChild);
+                    });
+                    if (data.has_more) fetchNewEntries();
+                })
+                .catch(function () {});
+        }
+
         function fetchHistory(append) {
-            fetch(historyUrl + '?offset=' + offset)
+            const query = append && nextCursor ? '?cursor=' + encodeURIComponent(nextCursor) : '';
+            fetch(historyUrl + query)
                 .then(function (r) { return r.json(); })
                 .then(function (data) {
                     renderEntries(data.entries, append);
-                    offset += data.entries.length;
+                    nextCursor = data.next_cursor;
+                    if (!append) latestCursor = data.latest_cursor;
                     if (data.has_more) {
                         loadMoreContainer.classList.remove('hidden');
                     } else {
@@ -117,8 +143,9 @@
             if (nd) nd.classList.add('hidden');
             if (!loaded) {
                 loaded = true;
-                offset = 0;
                 fetchHistory(false);
+            } else if (!historyDropdown.classList.contains('hidden')) {
+                fetchNewEntries();
             }
         });
 
@@ -17,6 +17,7 @@ document.addEventListener('DOMContentLoaded', function () {
     const groups = window.SCHEDULE_CONFIG.groups;
     const allStudents = window.SCHEDULE_CONFIG.students;
     const slotsRaw = window.SCHEDULE_CONFIG.slots;
+    let slotsVersion = window.SCHEDULE_CONFIG.slotsVersion;
 
     const FF_CLR = { bg: '#ede9fe', text: '#6d28d9', dot: '#a78bfa' };
 
@@ -85,13 +86,50 @@ document.addEventListener('DOMContentLoaded', function () {
         return document.cookie.split(';').map(c=>c.trim()).find(c=>c.startsWith('csrftoken='))?.split('=')[1] || '';
     }
 
-    // ── Save slot via API ───────────────────────────────────────
-    function saveSlot(row, day, col, groupId) {
-        fetch('/api/schedule/slot/save/', {
+    // ── Save the whole grid via API ─────────────────────────────
+    // Debounced (one request per burst of edits) and one request at a time, so each
+    // save sends the version returned by the previous one.
+    let saveTimer = null;
+    let saving = false;
+    let saveAgain = false;
+    function saveGrid() {
+        clearTimeout(saveTimer);
+        saveTimer = setTimeout(sendGrid, 600);
+    }
+    function sendGrid() {
+        if (saving) { saveAgain = true; return; }
+        saving = true;
+        const slots = [];
+        schedule.forEach(rowCells => rowCells.forEach(cell => {
+            if (cell && !cell.isFunFriday && cell.groupId) {
+                slots.push({ row: cell.row, day: cell.day, col: cell.col, group_id: cell.groupId });
+            }
+        }));
+        fetch('/api/schedule/slots/save/', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrf() },
-            body: JSON.stringify({ row, day, col, group_id: groupId }),
-        });
+            body: JSON.stringify({ version: slotsVersion, slots }),
+        })
+            .then(r => r.json().catch(() => ({})).then(data => ({ ok: r.ok, status: r.status, data })))
+            .then(({ ok, status, data }) => {
+                saving = false;
+                if (ok) {
+                    slotsVersion = data.version;
+                    if (saveAgain) { saveAgain = false; sendGrid(); }
+                } else if (status === 409) {
+                    // Someone else saved the schedule since this page was loaded
+                    alert(data.error || 'El horario ha cambiado. Recarga la página.');
+                    window.location.reload();
+                } else {
+                    saveAgain = false;
+                    alert('No se pudo guardar el horario: ' + (data.error || status));
+                }
+            })
+            .catch(() => {
+                saving = false;
+                saveAgain = false;
+                alert('No se pudo guardar el horario. Comprueba la conexión e inténtalo de nuevo.');
+            });
     }
 
     // ── Render a single cell ────────────────────────────────────
@@ -118,7 +156,7 @@ document.addEventListener('DOMContentLoaded', function () {
             sel.addEventListener('change', function() {
                 const gid = this.value ? parseInt(this.value) : null;
                 cell.groupId = gid;
-                saveSlot(row, dayIdx, colIdx, gid);
+                saveGrid();
                 renderDropdowns();
             });
             td.appendChild(sel);
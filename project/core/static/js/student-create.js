@@ -1,6 +1,6 @@
 /**
  * student-create.js — Student creation form: success countdown, price calculator,
- * sibling search, parent search with pagination.
+ * sibling search, parent search (lazy, via typeahead.js).
  *
  * Requires window.STUDENT_CREATE_CONFIG to be set by an inline script:
  *   window.STUDENT_CREATE_CONFIG = {
@@ -128,69 +128,55 @@ document.addEventListener('DOMContentLoaded', function () {
     updateCalculatedPrice();
 
     // ==================== SIBLING SEARCH ====================
+    // Options come from /api/typeahead/students/, loaded the first time the search is shown
     const siblingSearch = document.getElementById('siblingSearch');
     if (siblingSearch) {
-        siblingSearch.addEventListener('input', function() {
-            const q = this.value.toLowerCase().trim();
-            document.querySelectorAll('.sibling-option').forEach(opt => {
-                opt.style.display = (q === '' || opt.dataset.search.includes(q)) ? '' : 'none';
-            });
+        const siblingResults = document.getElementById('siblingResults');
+        const siblingPicker = Typeahead.attach({
+            input: siblingSearch,
+            results: siblingResults,
+            endpoint: siblingResults.dataset.endpoint,
+            loadOnInit: false,
+            render: s => `
+                <label class="flex items-center gap-2 p-2 border border-neutral-200 rounded-md hover:bg-neutral-50 cursor-pointer sibling-option text-sm">
+                    <input type="radio" name="sibling_id" value="${s.id}" class="form-radio h-4 w-4 text-primary-600">
+                    <span class="text-neutral-700">${Typeahead.esc(s.label)}</span>
+                    <span class="text-neutral-400 text-xs">— ${Typeahead.esc(s.secondary)}</span>
+                </label>`,
         });
-        document.querySelectorAll('input[name="sibling_id"]').forEach(radio => {
-            radio.addEventListener('change', function() {
-                document.getElementById('id_sibling_id').value = this.value;
-            });
+        let siblingsLoaded = false;
+        function loadSiblings() {
+            if (siblingsLoaded || !siblingCheckbox || !siblingCheckbox.checked) return;
+            siblingsLoaded = true;
+            siblingPicker.reload();
+        }
+        if (siblingCheckbox) siblingCheckbox.addEventListener('change', loadSiblings);
+        loadSiblings();
+        siblingResults.addEventListener('change', function(e) {
+            if (e.target.name === 'sibling_id') document.getElementById('id_sibling_id').value = e.target.value;
         });
     }
 
-    // ==================== PARENT SEARCH + PAGINATION ====================
+    // ==================== PARENT SEARCH ====================
+    // Options come from /api/typeahead/parents/ one page at a time ("Ver más")
     const parentSearchInput = document.getElementById('parentSearch');
     if (parentSearchInput) {
-        const PAGE_SIZE = 6;
-        const allOptions = Array.from(document.querySelectorAll('.parent-option'));
-        let filteredOptions = allOptions;
-        let parentPage = 1;
-
-        function renderParentPage() {
-            const isFiltered = parentSearchInput.value.trim() !== '';
-            const toShow = filteredOptions;
-            const totalPages = isFiltered ? 1 : Math.max(1, Math.ceil(toShow.length / PAGE_SIZE));
-            if (parentPage > totalPages) parentPage = totalPages;
-            const start = isFiltered ? 0 : (parentPage - 1) * PAGE_SIZE;
-            const end = isFiltered ? toShow.length : start + PAGE_SIZE;
-
-            allOptions.forEach(o => o.style.display = 'none');
-            toShow.forEach((o, i) => { o.style.display = (i >= start && i < end) ? '' : 'none'; });
-
-            const nav = document.getElementById('parentPagination');
-            if (isFiltered || totalPages <= 1) { nav.innerHTML = ''; return; }
-            let html = '';
-            for (let i = 1; i <= totalPages; i++) {
-                if (i === parentPage) {
-                    html += `<span style="width:2rem;height:2rem;border-radius:9999px;display:inline-flex;align-items:center;justify-content:center;background:#8b5cf6;color:#fff;font-size:0.75rem;font-weight:700;">${i}</span>`;
-                } else {
-                    html += `<button type="button" class="parent-pg-btn" data-page="${i}" style="width:2rem;height:2rem;border-radius:9999px;display:inline-flex;align-items:center;justify-content:center;border:1px solid #e5e7eb;background:#fff;color:#525252;font-size:0.75rem;cursor:pointer;">${i}</button>`;
-                }
-            }
-            nav.innerHTML = html;
-            nav.querySelectorAll('.parent-pg-btn').forEach(btn => {
-                btn.addEventListener('click', () => { parentPage = parseInt(btn.dataset.page); renderParentPage(); });
-            });
-        }
-
-        parentSearchInput.addEventListener('input', function() {
-            const q = this.value.toLowerCase().trim();
-            parentPage = 1;
-            filteredOptions = q === '' ? allOptions : allOptions.filter(o => o.dataset.search.includes(q));
-            renderParentPage();
+        const parentResults = document.getElementById('parentResults');
+        Typeahead.attach({
+            input: parentSearchInput,
+            results: parentResults,
+            endpoint: parentResults.dataset.endpoint,
+            render: p => `
+                <label class="flex items-center gap-3 p-3 border border-neutral-200 rounded-md hover:bg-neutral-50 cursor-pointer parent-option">
+                    <input type="radio" name="parent_id" value="${p.id}" class="form-radio h-5 w-5 text-primary-600" required>
+                    <div class="flex-1">
+                        <div class="font-medium text-neutral-800">${Typeahead.esc(p.label)}</div>
+                        <div class="text-sm text-neutral-600">${Typeahead.esc(p.secondary)}</div>
+                    </div>
+                </label>`,
         });
-
-        document.querySelectorAll('input[name="parent_id"]').forEach(radio => {
-            radio.addEventListener('change', function() {
-                document.getElementById('hidden_parent_id').value = this.value;
-            });
+        parentResults.addEventListener('change', function(e) {
+            if (e.target.name === 'parent_id') document.getElementById('hidden_parent_id').value = e.target.value;
         });
-
-        renderParentPage();
     }
 });
@@ -29,11 +29,56 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     });
 
+    // Parent picker: checked parents live in parentPickerSelected, search results are loaded lazily
+    const parentSelected = document.getElementById('parentPickerSelected');
+    const parentResults = document.getElementById('parentPickerResults');
+
+    function parentOption(p, checked) {
+        return `
+            <label class="flex items-center space-x-3 p-3 border border-neutral-200 rounded-md hover:bg-neutral-50 cursor-pointer">
+                <input type="checkbox" name="parents" value="${p.id}" ${checked ? 'checked' : ''} class="form-checkbox h-5 w-5 text-primary-600">
+                <div class="flex-1">
+                    <div class="font-medium text-neutral-800">${Typeahead.esc(p.label)}</div>
+                    <div class="text-sm text-neutral-600">${Typeahead.esc(p.secondary)}</div>
+                </div>
+            </label>`;
+    }
+
+    function selectedParentIds() {
+        return Array.from(parentSelected.querySelectorAll('input[name="parents"]')).map(cb => cb.value);
+    }
+
+    const parentPicker = Typeahead.attach({
+        input: document.getElementById('parentPickerSearch'),
+        results: parentResults,
+        endpoint: parentResults.dataset.endpoint,
+        exclude: selectedParentIds,
+        loadOnInit: false,
+        render: p => parentOption(p, false),
+    });
+
+    // Checking a result moves it to the selected list; unchecking a selected parent drops it
+    parentResults.addEventListener('change', (e) => {
+        if (e.target.name !== 'parents' || !e.target.checked) return;
+        parentSelected.appendChild(e.target.closest('label'));
+    });
+    parentSelected.addEventListener('change', (e) => {
+        if (e.target.name === 'parents' && !e.target.checked) e.target.closest('label').remove();
+    });
+
+    function setSelectedParents(ids) {
+        parentSelected.innerHTML = '';
+        if (!ids.length) return Promise.resolve();
+        return Typeahead.fetch(parentResults.dataset.endpoint, { ids: ids.join(',') })
+            .then(data => { parentSelected.innerHTML = data.results.map(p => parentOption(p, true)).join(''); });
+    }
+
     // Reset form
     function resetForm() {
         form.reset();
-        // Reset checkboxes
-        document.querySelectorAll('input[name="parents"]').forEach(cb => cb.checked = false);
+        // Reset parent picker
+        parentSelected.innerHTML = '';
+        parentResults.innerHTML = '';
         document.getElementById('active').checked = true;
     }
 
@@ -53,10 +98,8 @@ document.addEventListener('DOMContentLoaded', function () {
                 document.getElementById('gdpr_signed').checked = data.gdpr_signed;
                 document.getElementById('active').checked = data.active;
 
-                // Set parent checkboxes
-                document.querySelectorAll('input[name="parents"]').forEach(cb => {
-                    cb.checked = data.parents.includes(parseInt(cb.value));
-                });
+                // Selected parents (labels from the typeahead endpoint), then the first page of results
+                setSelectedParents(data.parents).then(() => parentPicker.reload());
 
                 // Update modal
                 modalTitle.textContent = 'Editar Estudiante';
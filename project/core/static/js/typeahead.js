@@ -0,0 +1,81 @@
+/**
+ * typeahead.js — Lazy pickers backed by /api/typeahead/<parents|students|groups>/.
+ * Pages render an empty results container; options are fetched as the user types.
+ *
+ * Typeahead.attach({ input, results, endpoint, render, exclude, loadOnInit })
+ *   render(item)  -> HTML of one option ({id, label, secondary})
+ *   exclude()     -> ids to leave out (e.g. already selected)
+ *   returns { reload() }
+ * Typeahead.fetch(endpoint, params, init) -> Promise of the JSON response (init: fetch options, e.g. signal)
+ * Typeahead.esc(str)                -> HTML-escaped string
+ */
+(function () {
+    function esc(s) {
+        return String(s == null ? '' : s)
+            .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+    }
+
+    function fetchPage(endpoint, params, init) {
+        return fetch(`${endpoint}?${new URLSearchParams(params)}`, init).then(r => r.json());
+    }
+
+    function attach(opts) {
+        let page = 1;
+        let query = '';
+        let timer;
+        let controller = null;    // request in flight; a newer load aborts it
+        let pendingReset = false; // an aborted load was a reset, so the next one must clear the list too
+
+        const more = document.createElement('button');
+        more.type = 'button';
+        more.className = 'hidden w-full mt-2 px-3 py-1 text-sm text-primary-600 hover:bg-neutral-50 rounded-md';
+        more.textContent = 'Ver más';
+        opts.results.insertAdjacentElement('afterend', more);
+
+        function load(reset) {
+            reset = reset || pendingReset;
+            pendingReset = reset;
+            if (reset) page = 1;
+            if (controller) controller.abort();
+            controller = new AbortController();
+            const signal = controller.signal;
+            more.disabled = true;
+            fetchPage(opts.endpoint, { q: query, page: page }, { signal: signal })
+                .then(data => {
+                    // A response that arrives after a newer request started is stale
+                    if (signal.aborted) return;
+                    pendingReset = false;
+                    const skip = new Set((opts.exclude ? opts.exclude() : []).map(String));
+                    const html = data.results.filter(item => !skip.has(String(item.id))).map(opts.render).join('');
+                    if (reset) opts.results.innerHTML = '';
+                    opts.results.insertAdjacentHTML('beforeend', html);
+                    more.classList.toggle('hidden', !data.has_more);
+                })
+                .catch(e => {
+                    if (signal.aborted) return;
+                    if (!reset) page -= 1;
+                    console.error(e);
+                })
+                .finally(() => {
+                    if (!signal.aborted) more.disabled = false;
+                });
+        }
+
+        opts.input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                query = opts.input.value.trim();
+                load(true);
+            }, 250);
+        });
+        more.addEventListener('click', () => {
+            page += 1;
+            load(false);
+        });
+
+        if (opts.loadOnInit !== false) load(true);
+        return { reload: () => load(true) };
+    }
+
+    window.Typeahead = { attach: attach, fetch: fetchPage, esc: esc };
+}());
@@ -0,0 +1,28 @@
+"""
+Celery tasks for core maintenance.
+
+Usage:
+    clear_expired_sessions_task.delay()
+"""
+
+from importlib import import_module
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(name="core.tasks.clear_expired_sessions_task", bind=True)
+def clear_expired_sessions_task(self):
+    """
+    Daily task: delete expired sessions (same as ``manage.py clearsessions``).
+
+    With ``db`` / ``cached_db`` this removes the expired ``django_session`` rows;
+    cache-only sessions expire on their own and the call is a no-op.
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    engine.SessionStore.clear_expired()
+    logger.info(f"Sesiones caducadas eliminadas ({settings.SESSION_ENGINE})")
+    return {"engine": settings.SESSION_ENGINE}
@@ -1,74 +1,151 @@
+"""
+Queryset helpers for the list views.
+
+Each list view has its own projection: ``only()`` with the columns its template
+renders, ``select_related`` for the to-one relations it shows and slim
+``Prefetch`` querysets for the to-many ones. A page of 20 rows therefore costs a
+fixed number of queries, independent of the page size, and no unused columns.
+"""
+
 from datetime import date
 
-from django.db.models import Prefetch, Q
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
 
 from billing.models import Enrollment, Payment
-from students.models import Student
+from core.models import FunFridayAttendance
+from students.models import Parent, Student
+
+
+def school_years_range(years=2, today=None):
+    """(1 September, 31 August) covering the current school year and the `years - 1` before it."""
+    today = today or date.today()
+    current_start_year = today.year if today.month >= 9 else today.year - 1
+    return date(current_start_year - (years - 1), 9, 1), date(current_start_year + 1, 8, 31)
+
 
+# -- Projections for list views ------------------------------------------------
 
-def get_active_students():
-    """Return a queryset of active students with related data pre-fetched."""
+
+def all_info_students():
+    """Active students with the columns of the ``all_info`` students table."""
     return (
         Student.objects.filter(active=True)
-        .select_related("group", "group__teacher")
+        .select_related("group__teacher")
+        .only(
+            "id",
+            "first_name",
+            "last_name",
+            "birth_date",
+            "school",
+            "allergies",
+            "gdpr_signed",
+            "created_at",
+            "group__group_name",
+            "group__color",
+            "group__teacher__first_name",
+            "group__teacher__last_name",
+        )
         .prefetch_related(
-            "parents",
+            Prefetch("parents", queryset=Parent.objects.only("id", "phone", "email", "iban")),
             Prefetch(
                 "enrollments",
-                queryset=Enrollment.objects.select_related("enrollment_type"),
+                queryset=Enrollment.objects.select_related("enrollment_type").only(
+                    "id", "student_id", "schedule_type", "enrollment_type__display_name"
+                ),
             ),
         )
     )
 
 
-def get_payments_for_last_two_school_years():
-    """Return payments from the last two school years with related data."""
-    today = date.today()
-    if today.month >= 9:
-        current_school_start_year = today.year
-    else:
-        current_school_start_year = today.year - 1
-    start_year = current_school_start_year - 1
-    end_year = current_school_start_year + 1
-    start_date = date(start_year, 9, 1)
-    end_date = date(end_year, 8, 31)
-
-    date_filter = (
-        Q(payment_date__range=(start_date, end_date))
-        | Q(due_date__range=(start_date, end_date))
-        | Q(created_at__date__range=(start_date, end_date))
+def all_info_payments():
+    """All payments with the columns of the ``all_info`` payments table."""
+    return (
+        Payment.objects.select_related("student", "parent", "enrollment__enrollment_type")
+        .only(
+            "id",
+            "payment_type",
+            "payment_method",
+            "amount",
+            "payment_status",
+            "due_date",
+            "payment_date",
+            "concept",
+            "reference_number",
+            "observations",
+            "created_at",
+            "student__first_name",
+            "student__last_name",
+            "parent__phone",
+            "enrollment__schedule_type",
+            "enrollment__enrollment_type__display_name",
+        )
+        .order_by("-created_at")
     )
 
+
+def payments_list_payments():
+    """Payments with the columns of the ``payments_list`` rows."""
     return (
-        Payment.objects.filter(date_filter)
-        .select_related(
-            "student",
-            "parent",
-            "enrollment",
-            "enrollment__enrollment_type",
-        )
-        .prefetch_related(
-            "student__parents",
-            "student__enrollments",
-            Prefetch("student__group__teacher"),
+        Payment.objects.select_related("student", "parent", "enrollment")
+        .only(
+            "id",
+            "payment_type",
+            "payment_method",
+            "amount",
+            "payment_status",
+            "due_date",
+            "payment_date",
+            "created_at",
+            "student__first_name",
+            "student__last_name",
+            "student__is_adult",
+            "student__email",
+            "parent__first_name",
+            "parent__last_name",
+            "parent__email",
+            "enrollment__schedule_type",
         )
-        .order_by("-created_at")
+        .order_by("-due_date", "-created_at")
     )
 
 
-def get_all_payments_unrestricted():
-    """Return all payments without date restrictions, with related data."""
+def student_list_students(academic_year, this_friday, last_friday):
+    """
+    Active students enrolled in `academic_year`, with the ``StudentListView`` row flags.
+
+    Everything shown per row comes from the main query through ``Exists``/``Subquery``
+    (no join on ``enrollments``, so no ``DISTINCT``):
+
+    - ``has_language_cheque``: an enrollment of the year has the language cheque
+    - ``ff_this_week`` / ``ff_last_week``: Fun Friday attendance on those dates
+    - ``enrollment_type_name``: type of the newest enrollment of the year
+
+    Parents (to-many) are the only prefetch.
+    """
+    year_enrollments = Enrollment.objects.filter(student=OuterRef("pk"), academic_year=academic_year)
+    attendance = FunFridayAttendance.objects.filter(student=OuterRef("pk"))
     return (
-        Payment.objects.select_related(
-            "student",
-            "parent",
-            "enrollment",
-            "enrollment__enrollment_type",
+        Student.objects.filter(Exists(year_enrollments), active=True)
+        .select_related("group")
+        .only(
+            "id",
+            "first_name",
+            "last_name",
+            "birth_date",
+            "school",
+            "is_adult",
+            "gdpr_signed",
+            "created_at",
+            "group__group_name",
+            "group__color",
         )
-        .prefetch_related(
-            "student__parents",
-            "student__enrollments",
-            Prefetch("student__group__teacher"),
+        .annotate(
+            has_language_cheque=Exists(year_enrollments.filter(has_language_cheque=True)),
+            ff_this_week=Exists(attendance.filter(date=this_friday)),
+            ff_last_week=Exists(attendance.filter(date=last_friday)),
+            enrollment_type_name=Subquery(
+                year_enrollments.order_by("-created_at", "-id").values("enrollment_type__display_name")[:1]
+            ),
         )
-        .order_by("-created_at")
+        .prefetch_related(Prefetch("parents", queryset=Parent.objects.only("id", "first_name", "last_name")))
     )
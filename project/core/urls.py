@@ -19,6 +19,7 @@ from core.views import (
     # Auth
     login_view,
     logout_view,
+    save_schedule_grid,
     save_schedule_slot,
     # Schedule
     schedule_view,
@@ -46,6 +47,7 @@ urlpatterns = [
     # Schedule
     path("schedule/", schedule_view, name="schedule_view"),
     path("api/schedule/slot/save/", save_schedule_slot, name="save_schedule_slot"),
+    path("api/schedule/slots/save/", save_schedule_grid, name="save_schedule_grid"),
     path("fun-friday/", fun_friday_view, name="fun_friday_view"),
     # Todos
     path("api/todos/create/", create_todo, name="create_todo"),
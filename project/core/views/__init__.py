@@ -7,6 +7,8 @@ Core views package — re-exports all views for URL routing compatibility.
 from core.views.app_forms import (
     apps_view,
     birthday_form,
+    download_quarterly_receipt,
+    download_tax_certificate,
     enrollment_form,
     fun_friday_form,
     monthly_report_form,
@@ -45,6 +47,8 @@ from core.views.errors import (
 # Fun Friday attendance
 from core.views.fun_friday_attendance import (
     add_fun_friday_attendance,
+    fun_friday_season_matrix,
+    register_fun_friday_attendance,
     remove_fun_friday_attendance,
     toggle_fun_friday_this_week,
 )
@@ -84,7 +88,7 @@ from core.views.payments import (
 )
 
 # Schedule
-from core.views.schedule import fun_friday_view, save_schedule_slot, schedule_view
+from core.views.schedule import fun_friday_view, save_schedule_grid, save_schedule_slot, schedule_view
 
 # Students
 from core.views.students import (
@@ -115,3 +119,6 @@ from core.views.testing_tools import (
 
 # Todos & history
 from core.views.todos import complete_todo, create_todo, history_list
+
+# Typeahead pickers
+from core.views.typeahead import typeahead_groups, typeahead_parents, typeahead_students
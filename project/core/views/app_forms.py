@@ -7,21 +7,39 @@ import os
 from datetime import date, timedelta
 
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from django.views.decorators.http import require_http_methods
 
+from comms.services.certificate_store import ensure_stored
 from comms.services.email_functions import (
     send_all_tax_certificates,
     send_fun_friday_email,
     send_monthly_report,
     send_payment_reminder_email,
-    send_quarterly_receipt_email,
     send_vacation_closure_email,
     send_welcome_email,
 )
 from comms.services.email_service import email_service
+from comms.services.pdf_service import EXTENSIONS
+from comms.services.receipt_service import (
+    load_quarterly_receipts,
+    render_quarterly_receipt_batch,
+    run_quarterly_receipt_pipeline,
+)
+from comms.services.recipient_service import (
+    AUDIENCE_AGE_RANGE,
+    AUDIENCE_ALL,
+    AUDIENCE_BIRTHDAY_TODAY,
+    AUDIENCE_GROUP,
+    count_recipients,
+    recipient_emails,
+    resolve_recipients,
+)
+from comms.services.tax_certificate_service import load_tax_certificates, render_tax_certificate_batch
 from core.constants import DIAS_ES, MESES_ES
 from core.models import HistoryLog
 from students.models import Group, Parent, Student
@@ -41,7 +59,8 @@ def fun_friday_form(request):
     """
     Vista para el formulario de Fun Friday.
     GET: Muestra el formulario con valores por defecto
-    POST: Valida HTML y envía emails a todos los padres con estudiantes activos
+    POST: Valida HTML y envía emails a las familias con estudiantes activos en el rango de edades
+          (edad en la fecha del evento, resuelta como rango de birth_date en la base de datos)
     """
     import html.parser
 
@@ -51,7 +70,8 @@ def fun_friday_form(request):
         days_until_friday = 7
     next_friday = today + timedelta(days=days_until_friday)
 
-    parent_count = Parent.objects.filter(children__active=True, children__is_adult=False).distinct().count()
+    # Valores por defecto del formulario: 5 a 12 años el próximo viernes
+    parent_count = count_recipients(AUDIENCE_AGE_RANGE, min_age=5, max_age=12, on=next_friday)
 
     default_html = """<strong>🎉 ¡SESIÓN DE MANUALIDADES!</strong>
 <br><br>
@@ -67,7 +87,7 @@ Esta semana haremos manualidades creativas con materiales reciclados.
 
     if request.method == "POST":
         action = request.POST.get("action", "")
-        if action in ("preview", "test_send"):
+        if action in ("preview", "test_send", "count"):
             _event_date_str = request.POST.get("event_date", next_friday.isoformat())
             _start_time = request.POST.get("start_time", "17:00")
             _end_time = request.POST.get("end_time", "18:30")
@@ -82,6 +102,9 @@ Esta semana haremos manualidades creativas con materiales reciclados.
                 _max_age = int(request.POST.get("max_age", 12))
             except (ValueError, TypeError):
                 _min_age, _max_age = 5, 12
+            if action == "count":
+                _count = count_recipients(AUDIENCE_AGE_RANGE, min_age=_min_age, max_age=_max_age, on=_ed)
+                return JsonResponse({"count": _count})
             _ctx = {
                 "day_name": DIAS_ES[_ed.weekday()],
                 "day_number": _ed.day,
@@ -181,11 +204,10 @@ Esta semana haremos manualidades creativas con materiales reciclados.
         day_name = DIAS_ES[event_date.weekday()]
         month_name = MESES_ES[event_date.month - 1]
 
-        parents = Parent.objects.filter(children__active=True).distinct()
-        parent_emails = [p.email for p in parents if p.email]
+        parent_emails = recipient_emails(AUDIENCE_AGE_RANGE, min_age=min_age_int, max_age=max_age_int, on=event_date)
 
         if not parent_emails:
-            messages.warning(request, "⚠️ No hay padres con email para enviar")
+            messages.warning(request, "⚠️ No hay padres con email con hijos en ese rango de edades")
             return redirect("home")
 
         success_count = 0
@@ -259,7 +281,7 @@ def payment_reminder_form(request):
     POST: Envía recordatorio a todos los padres con estudiantes activos
     """
     today = date.today()
-    parent_count = Parent.objects.filter(children__active=True).distinct().count()
+    parent_count = count_recipients(AUDIENCE_ALL)
 
     default_start = today.replace(day=1)
     try:
@@ -343,8 +365,7 @@ def payment_reminder_form(request):
                 messages.error(request, "❌ Fecha inválida")
                 return redirect("payment_reminder_form")
 
-            parents = Parent.objects.filter(children__active=True).distinct()
-            parent_emails = [p.email for p in parents if p.email]
+            parent_emails = [r.email for r in resolve_recipients(AUDIENCE_ALL)]
 
             if not parent_emails:
                 messages.warning(request, "⚠️ No hay padres con email para enviar")
@@ -436,7 +457,7 @@ def vacation_closure_form(request):
     GET: Muestra formulario
     POST: Envía aviso a todos los padres con estudiantes activos
     """
-    parent_count = Parent.objects.filter(children__active=True).distinct().count()
+    parent_count = count_recipients(AUDIENCE_ALL)
 
     if request.method == "POST":
         action = request.POST.get("action", "")
@@ -498,8 +519,7 @@ def vacation_closure_form(request):
                 messages.error(request, "❌ Fecha inválida")
                 return redirect("vacation_closure_form")
 
-            parents = Parent.objects.filter(children__active=True).distinct()
-            parent_emails = [p.email for p in parents if p.email]
+            parent_emails = [r.email for r in resolve_recipients(AUDIENCE_ALL)]
 
             if not parent_emails:
                 messages.warning(request, "⚠️ No hay padres con email para enviar")
@@ -633,6 +653,30 @@ def tax_certificate_form(request):
     )
 
 
+@require_http_methods(["GET"])
+def download_tax_certificate(request, parent_id, year):
+    """
+    Descarga el certificado fiscal de un padre directamente del certificate_store.
+    Solo se genera el PDF si no existe o si sus pagos cambiaron desde la ultima vez.
+    """
+    certificates = load_tax_certificates(year, parent_ids=[parent_id])
+    if not certificates:
+        raise Http404(f"No hay pagos completados del padre {parent_id} en {year}")
+
+    certificate = certificates[0]
+    stored = ensure_stored(certificate, render_tax_certificate_batch)
+    if stored is None:
+        return JsonResponse({"success": False, "message": "Error generando el certificado"}, status=500)
+
+    path, mimetype = stored
+    return FileResponse(
+        default_storage.open(path, "rb"),
+        as_attachment=True,
+        filename=f"{certificate.filename_stem}.{EXTENSIONS[mimetype]}",
+        content_type=mimetype,
+    )
+
+
 # ============================================================================
 # INFORME MENSUAL - Formulario de envío
 # ============================================================================
@@ -646,7 +690,7 @@ def monthly_report_form(request):
     """
     today = date.today()
     current_month = MESES_ES[today.month - 1]
-    parent_count = Parent.objects.filter(children__active=True).distinct().count()
+    parent_count = count_recipients(AUDIENCE_ALL)
     total_students = Student.objects.filter(active=True).count()
     total_groups = Group.objects.filter(active=True).count()
 
@@ -686,24 +730,17 @@ def monthly_report_form(request):
         month = request.POST.get("month", current_month)
         year = int(request.POST.get("year", today.year))
 
-        parents = Parent.objects.filter(children__active=True).distinct().prefetch_related("children__group")
-
         success_count = 0
         error_count = 0
-        for parent in parents:
-            if not parent.email:
-                continue
-            students_data = [
-                {"name": s.full_name, "group": s.group.group_name if s.group else "Sin grupo"}
-                for s in parent.children.filter(active=True)
-            ]
+        for recipient in resolve_recipients(AUDIENCE_ALL):
+            students_data = [{"name": s.full_name, "group": s.group_name or "Sin grupo"} for s in recipient.students]
             try:
                 result = send_monthly_report(
-                    recipient=parent.email,
+                    recipient=recipient.email,
                     report_data={
                         "month": month,
                         "year": year,
-                        "parent_name": parent.full_name,
+                        "parent_name": recipient.name,
                         "students": students_data,
                         "total_students": len(students_data),
                     },
@@ -769,15 +806,9 @@ def birthday_form(request):
     POST: Envía manualmente los emails de cumpleaños de hoy
     """
     today = date.today()
-    birthday_students = Student.objects.filter(
-        birth_date__month=today.month, birth_date__day=today.day, active=True
-    ).select_related("group")
-
-    month_birthdays = (
-        Student.objects.filter(birth_date__month=today.month, active=True)
-        .select_related("group")
-        .order_by("birth_date__day")
-    )
+    birthday_students = Student.objects.filter(active=True).birthdays_on(today).select_related("group")
+
+    month_birthdays = Student.objects.filter(active=True).birthdays_in_month(today.month).select_related("group")
 
     if request.method == "POST":
         action = request.POST.get("action", "")
@@ -808,23 +839,22 @@ def birthday_form(request):
 
         success_count = 0
         error_count = 0
-        for student in birthday_students:
-            parent = student.parents.exclude(email="").exclude(email__isnull=True).first()
-            if not parent:
-                continue
-            try:
-                result = email_service.send_email(
-                    template_name="happy_birthday",
-                    recipients=parent.email,
-                    subject=f"🎉 ¡Feliz Cumpleaños {student.first_name}!",
-                    context={"name": student.first_name},
-                )
-                if result:
-                    success_count += 1
-                else:
+        # Children (email to the parents) and adults (own email), as send_birthday_emails_task
+        for recipient in resolve_recipients(AUDIENCE_BIRTHDAY_TODAY, on=today, is_adult=None):
+            for student in recipient.students:
+                try:
+                    result = email_service.send_email(
+                        template_name="happy_birthday",
+                        recipients=recipient.email,
+                        subject=f"🎉 ¡Feliz Cumpleaños {student.first_name}!",
+                        context={"name": student.first_name},
+                    )
+                    if result:
+                        success_count += 1
+                    else:
+                        error_count += 1
+                except Exception:
                     error_count += 1
-            except Exception:
-                error_count += 1
 
         if success_count > 0:
             HistoryLog.log("email_sent", f"Cumpleaños: {success_count} email(s) enviados", icon="mail")
@@ -864,7 +894,7 @@ def receipts_form(request):
     """
     today = date.today()
     current_month = MESES_ES[today.month - 1]
-    parent_count = Parent.objects.filter(children__active=True).distinct().count()
+    parent_count = count_recipients(AUDIENCE_ALL)
 
     quarter_idx = (today.month - 1) // 3
     quarter_start = quarter_idx * 3
@@ -914,48 +944,30 @@ def receipts_form(request):
         receipt_type = request.POST.get("receipt_type", "quarterly_child")
 
         if receipt_type == "quarterly_child":
-            month_1 = request.POST.get("month_1", quarter_months[0])
-            month_2 = request.POST.get("month_2", quarter_months[1])
-            month_3 = request.POST.get("month_3", quarter_months[2])
-
-            parents = Parent.objects.filter(children__active=True).distinct().prefetch_related("children")
-
-            success_count = 0
-            error_count = 0
-            for parent in parents:
-                if not parent.email:
-                    continue
-                for student in parent.children.filter(active=True):
-                    try:
-                        result = send_quarterly_receipt_email(
-                            parent_email=parent.email,
-                            student_name=student.full_name,
-                            month_1=month_1,
-                            month_2=month_2,
-                            month_3=month_3,
-                        )
-                        if result:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    except Exception:
-                        error_count += 1
+            months = [
+                request.POST.get(f"month_{i + 1}", default).strip().lower() for i, default in enumerate(quarter_months)
+            ]
+            invalid = [month for month in months if month not in MESES_ES]
+            if invalid:
+                messages.error(request, f"❌ Mes no válido: {', '.join(invalid)}")
+                return redirect("receipts_form")
+
+            # Un email por familia con el recibo PDF de sus pagos completados del trimestre
+            results = run_quarterly_receipt_pipeline(months)
+            success_count = results["sent"]
+            error_count = results["failed"]
         elif receipt_type == "enrollment":
             from billing.models import current_academic_year
 
             academic_year = current_academic_year()
-            parents = Parent.objects.filter(children__active=True).distinct().prefetch_related("children")
-
             success_count = 0
             error_count = 0
-            for parent in parents:
-                if not parent.email:
-                    continue
-                for student in parent.children.filter(active=True):
+            for recipient in resolve_recipients(AUDIENCE_ALL):
+                for student in recipient.students:
                     try:
                         result = email_service.send_email(
                             template_name="receipt_enrollment",
-                            recipients=parent.email,
+                            recipients=recipient.email,
                             subject=f"🧾 Recibo Matrícula {academic_year} — {student.full_name}",
                             context={"student_name": student.full_name, "academic_year": academic_year},
                         )
@@ -967,17 +979,13 @@ def receipts_form(request):
                         error_count += 1
         else:
             adult_month = request.POST.get("adult_month", current_month)
-            parents = Parent.objects.filter(children__active=True).distinct()
-
             success_count = 0
             error_count = 0
-            for parent in parents:
-                if not parent.email:
-                    continue
+            for recipient in resolve_recipients(AUDIENCE_ALL, is_adult=True):
                 try:
                     result = email_service.send_email(
                         template_name="receipt_adult",
-                        recipients=parent.email,
+                        recipients=recipient.email,
                         subject=f"🧾 Recibo Mensual - {adult_month.title()}",
                         context={"month": adult_month},
                     )
@@ -1017,6 +1025,33 @@ def receipts_form(request):
     )
 
 
+@require_http_methods(["GET"])
+def download_quarterly_receipt(request, parent_id, year, month):
+    """
+    Descarga el recibo trimestral de una familia (trimestre que empieza en year/month)
+    directamente del certificate_store; solo se genera si no existe o sus pagos cambiaron.
+    """
+    if not 1 <= month <= 12:
+        raise Http404("Mes no valido")
+    months = [MESES_ES[(month - 1 + i) % 12] for i in range(3)]
+    receipts = load_quarterly_receipts(months, on=date(year, month, 1), parent_ids=[parent_id])
+    if not receipts:
+        raise Http404(f"No hay pagos completados del padre {parent_id} en el trimestre")
+
+    receipt = receipts[0]
+    stored = ensure_stored(receipt, render_quarterly_receipt_batch)
+    if stored is None:
+        return JsonResponse({"success": False, "message": "Error generando el recibo"}, status=500)
+
+    path, mimetype = stored
+    return FileResponse(
+        default_storage.open(path, "rb"),
+        as_attachment=True,
+        filename=f"{receipt.filename_stem}.{EXTENSIONS[mimetype]}",
+        content_type=mimetype,
+    )
+
+
 # ============================================================================
 # NEWSLETTER - Boletín informativo por grupo
 # ============================================================================
@@ -1028,7 +1063,7 @@ def newsletter_form(request):
     GET: Muestra formulario con selector de grupo
     POST: Envía newsletter a todos los padres con estudiantes activos
     """
-    parent_count = Parent.objects.filter(children__active=True).distinct().count()
+    parent_count = count_recipients(AUDIENCE_ALL)
     groups = Group.objects.filter(active=True).order_by("group_name")
 
     if request.method == "POST":
@@ -1068,11 +1103,11 @@ def newsletter_form(request):
         # Send to parents with students in the selected group
         group_obj = Group.objects.filter(group_name=group_name, active=True).first()
         if group_obj:
-            parents = Parent.objects.filter(children__group=group_obj, children__active=True).distinct()
+            recipients = resolve_recipients(AUDIENCE_GROUP, group_ids=[group_obj.id])
         else:
-            parents = Parent.objects.filter(children__active=True).distinct()
+            recipients = resolve_recipients(AUDIENCE_ALL)
 
-        parent_emails = [p.email for p in parents if p.email]
+        parent_emails = [r.email for r in recipients]
 
         if not parent_emails:
             messages.warning(request, "⚠️ No hay padres con email en este grupo")
@@ -4,7 +4,6 @@ from datetime import date
 from decimal import Decimal
 
 import httpx
-from django.core.paginator import Paginator
 from django.db.models import Case, DecimalField, Sum, Value, When
 from django.shortcuts import render
 
@@ -96,22 +95,11 @@ def home(request):
         key=lambda x: x["display_name"],
     )
 
-    birthday_students = list(
-        Student.objects.filter(active=True, birth_date__month=current_month).order_by("birth_date__day")
-    )
+    birthday_students = list(Student.objects.filter(active=True).birthdays_in_month(current_month).with_age(today))
 
     birthday_count = len(birthday_students)
 
-    birthdays_display = [
-        {
-            "name": s.first_name,
-            "day": s.birth_date.day,
-            "age": today.year
-            - s.birth_date.year
-            - (1 if (today.month, today.day) < (s.birth_date.month, s.birth_date.day) else 0),
-        }
-        for s in birthday_students[:5]
-    ]
+    birthdays_display = [{"name": s.first_name, "day": s.birth_date.day, "age": s.age} for s in birthday_students[:5]]
     has_more_birthdays = birthday_count > 5
 
     days_in_month = cal_module.monthrange(current_year, current_month)[1]
@@ -180,12 +168,8 @@ def home(request):
     todos = list(TodoItem.objects.order_by("due_date", "created_at"))
     overdue_todos_count = sum(1 for t in todos if t.is_overdue)
 
-    today_birthday_students = Student.objects.filter(
-        active=True,
-        birth_date__month=today.month,
-        birth_date__day=today.day,
-    ).order_by("first_name")[:5]
-    today_birthday_names = [s.first_name for s in today_birthday_students]
+    # Today's birthdays are a subset of this month's, already loaded
+    today_birthday_names = sorted(s.first_name for s in birthday_students if s.birth_date.day == today.day)[:5]
 
     quote_text, quote_author, new_cookie = _get_quote(request)
 
@@ -226,7 +210,8 @@ def home(request):
 
 
 def all_info(request):
-    from core.transactions import get_active_students, get_all_payments_unrestricted
+    from core.pagination import EstimatedCountPaginator
+    from core.transactions import all_info_payments, all_info_students
 
     DB_PAGE_SIZE = 20
 
@@ -238,8 +223,8 @@ def all_info(request):
         "last_name_asc": "last_name",
         "date_desc": "-created_at",
     }.get(students_sort, "-created_at")
-    students_qs = get_active_students().order_by(students_order)
-    students_paginator = Paginator(students_qs, DB_PAGE_SIZE)
+    students_qs = all_info_students().order_by(students_order)
+    students_paginator = EstimatedCountPaginator(students_qs, DB_PAGE_SIZE)
     students_page = students_paginator.get_page(request.GET.get("students_page", 1))
 
     # ── Payments sorting ──
@@ -249,10 +234,10 @@ def all_info(request):
         "student_asc": ("student__first_name", "student__last_name"),
     }.get(payments_sort, "-created_at")
     if isinstance(payments_order, tuple):
-        payments_qs = get_all_payments_unrestricted().order_by(*payments_order)
+        payments_qs = all_info_payments().order_by(*payments_order)
     else:
-        payments_qs = get_all_payments_unrestricted().order_by(payments_order)
-    payments_paginator = Paginator(payments_qs, DB_PAGE_SIZE)
+        payments_qs = all_info_payments().order_by(payments_order)
+    payments_paginator = EstimatedCountPaginator(payments_qs, DB_PAGE_SIZE)
     payments_page = payments_paginator.get_page(request.GET.get("payments_page", 1))
 
     return render(
@@ -1,11 +1,13 @@
 import json
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
+from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_GET, require_http_methods
 
 from core.models import FunFridayAttendance
+from core.transactions import school_years_range
 from core.views.students import get_last_friday, get_next_friday
 from students.models import Student
 
@@ -52,3 +54,128 @@ def remove_fun_friday_attendance(request, student_id):
         return JsonResponse({"success": True, "deleted": deleted > 0})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+
+def _fun_friday_students(group_id=None):
+    """Students who can attend Fun Friday, optionally limited to one group."""
+    students = Student.objects.filter(active=True, is_adult=False)
+    if group_id:
+        students = students.filter(group_id=group_id)
+    return students
+
+
+@require_http_methods(["POST"])
+def register_fun_friday_attendance(request):
+    """
+    Replace the attendance of a Friday with the given set of students.
+
+    Body: ``{"date": "YYYY-MM-DD", "student_ids": [...], "group_id": 3}``.
+    Students of the group missing from ``student_ids`` lose their attendance
+    for that date. A register of every child needs ``"full_school": true``
+    instead of ``group_id``, so a client that forgets the group cannot clear the
+    other groups' attendance. One transaction: one ``bulk_create`` for the new
+    rows and one ``delete()`` for the removed ones.
+    """
+    try:
+        data = json.loads(request.body)
+        friday = datetime.strptime(data.get("date") or "", "%Y-%m-%d").date()
+        wanted = {int(i) for i in data.get("student_ids", [])}
+        group_id = int(data["group_id"]) if data.get("group_id") else None
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    if group_id is None and data.get("full_school") is not True:
+        return JsonResponse(
+            {"success": False, "error": "Indica group_id, o full_school para el registro de todo el centro"},
+            status=400,
+        )
+    if friday.weekday() != 4:
+        return JsonResponse({"success": False, "error": "La fecha debe ser un viernes"}, status=400)
+
+    register_ids = set(_fun_friday_students(group_id).values_list("id", flat=True))
+    unknown = wanted - register_ids
+    if unknown:
+        return JsonResponse(
+            {"success": False, "error": "Estudiantes fuera del registro", "student_ids": sorted(unknown)}, status=400
+        )
+
+    with transaction.atomic():
+        existing = set(
+            FunFridayAttendance.objects.select_for_update()
+            .filter(date=friday, student_id__in=register_ids)
+            .values_list("student_id", flat=True)
+        )
+        to_add = wanted - existing
+        to_remove = existing - wanted
+        FunFridayAttendance.objects.bulk_create(
+            [FunFridayAttendance(student_id=sid, date=friday) for sid in to_add], ignore_conflicts=True
+        )
+        if to_remove:
+            FunFridayAttendance.objects.filter(date=friday, student_id__in=to_remove).delete()
+
+    return JsonResponse(
+        {
+            "success": True,
+            "date": str(friday),
+            "added": len(to_add),
+            "removed": len(to_remove),
+            "attending": len(wanted),
+        }
+    )
+
+
+# Seasons before this one have no attendance data; bounds ?season= so date() cannot overflow
+FIRST_SEASON = 2000
+
+
+def season_fridays(start_year):
+    """Every Friday of the school year starting in September of `start_year`."""
+    start, end = school_years_range(1, today=date(start_year, 9, 1))
+    friday = start + timedelta(days=(4 - start.weekday()) % 7)
+    fridays = []
+    while friday <= end:
+        fridays.append(friday)
+        friday += timedelta(days=7)
+    return fridays
+
+
+@require_GET
+def fun_friday_season_matrix(request):
+    """
+    Attendance of a whole season as one bitset per student.
+
+    ``?season=2025`` (first year of the school year, current one by default;
+    from ``FIRST_SEASON`` to next year), ``?group_id=`` optional. Bit ``i`` of a student's bitset (hex string) is set
+    when they attended ``fridays[i]``. Students without attendance are left
+    out. One ``values_list`` query.
+
+        {"season": "2025-2026", "fridays": ["2025-09-05", ...],
+         "students": {"12": "1d", ...}}
+    """
+    current_year = school_years_range(1)[0].year
+    try:
+        start_year = int(request.GET.get("season") or current_year)
+        group_id = int(request.GET.get("group_id") or 0)
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Parámetros inválidos"}, status=400)
+    if not FIRST_SEASON <= start_year <= current_year + 1:
+        return JsonResponse({"success": False, "error": "Parámetros inválidos"}, status=400)
+
+    fridays = season_fridays(start_year)
+    first = fridays[0]
+    attendance = FunFridayAttendance.objects.filter(
+        date__range=(first, fridays[-1]), student__in=_fun_friday_students(group_id)
+    ).values_list("student_id", "date")
+
+    bits = {}
+    for student_id, attended in attendance.order_by():
+        offset, weekday = divmod((attended - first).days, 7)
+        if weekday == 0:
+            bits[student_id] = bits.get(student_id, 0) | (1 << offset)
+
+    return JsonResponse(
+        {
+            "season": f"{start_year}-{start_year + 1}",
+            "fridays": [str(f) for f in fridays],
+            "students": {str(sid): format(mask, "x") for sid, mask in bits.items()},
+        }
+    )
@@ -14,6 +14,8 @@ from django.views.decorators.http import require_http_methods
 from billing import constants
 from billing.models import Payment
 from core.models import HistoryLog
+from core.pagination import estimated_count
+from core.transactions import payments_list_payments
 from students.models import Parent, Student
 
 logger = logging.getLogger(__name__)
@@ -44,10 +46,8 @@ def payments_list(request):
     Main payments list view with pagination
     Shows active payments only (not deactivated ones)
     """
-    # Get all active payments ordered by most recent first
-    payments_queryset = Payment.objects.select_related(
-        "student", "parent", "enrollment", "enrollment__enrollment_type"
-    ).order_by("-due_date", "-created_at")
+    # Only the columns the rows render, ordered by most recent due date first
+    payments_queryset = payments_list_payments()
 
     # Add search functionality
     search_query = request.GET.get("search", "")
@@ -136,7 +136,7 @@ def payments_list(request):
 
     context = {
         "payments_list": all_payments_list,
-        "total_count": payments_queryset.count(),
+        "total_count": estimated_count(payments_queryset),
         "search_query": search_query,
         "expected_payments_total": stats["expected_total"] or _zero,
         "expected_payments_count": stats["expected_count"] or 0,
@@ -611,20 +611,23 @@ def search_parents(request):
     if len(query) < 2:
         return JsonResponse({"results": []})
 
-    parents = Parent.objects.filter(
-        Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query)
-    )[:10]
-
-    results = []
-    for parent in parents:
-        results.append(
-            {
-                "id": parent.id,
-                "full_name": parent.full_name,
-                "email": parent.email,
-                "phone": parent.phone or "",
-            }
+    parents = (
+        Parent.objects.filter(
+            Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query)
         )
+        .order_by("last_name", "first_name")
+        .values("id", "first_name", "last_name", "email", "phone")[:10]
+    )
+
+    results = [
+        {
+            "id": p["id"],
+            "full_name": f"{p['first_name']} {p['last_name']}",
+            "email": p["email"],
+            "phone": p["phone"] or "",
+        }
+        for p in parents
+    ]
 
     return JsonResponse({"results": results})
 
@@ -1,66 +1,59 @@
+import hashlib
 import json
+from datetime import date
 
-from django.db import models
+from django.db import transaction
 from django.http import JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, render
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 
 from core.models import FunFridayAttendance, HistoryLog, ScheduleSlot
+from core.notifications import notifications_payload
+from core.schedule_cache import ROW_STARTS, schedule_payload, schedule_state, slots_version
 from core.views.students import get_last_friday, get_next_friday
 from students.models import Group, Student
 
 
-def schedule_view(request):
-    """Vista del horario semanal estilo Google Calendar."""
-    groups = (
-        Group.objects.filter(active=True)
-        .select_related("teacher")
-        .prefetch_related(
-            models.Prefetch("students", queryset=Student.objects.filter(active=True).order_by("first_name"))
-        )
-        .order_by("group_name")
-    )
+def _schedule_state(request):
+    # Read once per request: the ETag, Last-Modified and payload all need it
+    if not hasattr(request, "_schedule_state"):
+        request._schedule_state = schedule_state()
+    return request._schedule_state
 
-    groups_list = list(groups)
-    groups_data = []
-    for g in groups_list:
-        groups_data.append(
-            {
-                "id": g.id,
-                "name": g.group_name,
-                "color": g.color,
-                "teacher": g.teacher.first_name,
-                "students": [s.first_name for s in g.students.all()],
-            }
-        )
 
-    saved = ScheduleSlot.objects.select_related("group").all()
-    ROW_STARTS = ["16:10", "17:40", "19:10"]
-    ROW_ENDS = ["17:30", "19:00", "20:30"]
-    FRI_START = "16:00"
-    FRI_END = "17:20"
-    slots_data = []
-    for s in saved:
-        if s.day == 4:
-            start, end = FRI_START, FRI_END
-        else:
-            start, end = ROW_STARTS[s.row], ROW_ENDS[s.row]
-        slots_data.append(
-            {"row": s.row, "day": s.day, "col": s.col, "group_id": s.group_id, "start": start, "end": end}
-        )
+def _csrf_secret(request):
+    # get_token() sets the secret the page's token is derived from (and the cookie, on a first visit)
+    get_token(request)
+    return request.META.get("CSRF_COOKIE", "")
 
-    all_students_qs = Student.objects.filter(active=True).order_by("first_name", "last_name")
-    students_data = [{"first_name": s.first_name, "last_name": s.last_name} for s in all_students_qs]
 
-    return render(
-        request,
-        "schedule.html",
-        {
-            "groups_json": json.dumps(groups_data),
-            "slots_json": json.dumps(slots_data),
-            "students_json": json.dumps(students_data),
-        },
-    )
+def _schedule_etag(request):
+    """Schedule version plus what else the page renders: navbar notifications, username and CSRF secret."""
+    version, _ = _schedule_state(request)
+    navbar = notifications_payload(date.today())
+    parts = [
+        version,
+        repr(sorted(t["id"] for t in navbar["todos"])),
+        str(navbar["history_count"]),
+        str(request.session.get("username", "")),
+        _csrf_secret(request),
+    ]
+    return hashlib.md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _schedule_last_modified(request):
+    # Informative only: deletions do not move it, so clients that send If-None-Match rely on the ETag
+    return _schedule_state(request)[1]
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_schedule_etag, last_modified_func=_schedule_last_modified)
+def schedule_view(request):
+    """Vista del horario semanal estilo Google Calendar."""
+    version, _ = _schedule_state(request)
+    return render(request, "schedule.html", schedule_payload(version))
 
 
 @require_http_methods(["POST"])
@@ -91,6 +84,99 @@ def save_schedule_slot(request):
         return JsonResponse({"success": False, "error": str(e)}, status=400)
 
 
+def _parse_grid(slots):
+    """``{(row, day, col): group_id}`` of the assigned slots; raises ValueError on invalid input."""
+    grid = {}
+    seen = set()
+    for slot in slots:
+        position = (int(slot["row"]), int(slot["day"]), int(slot["col"]))
+        row, day, col = position
+        if not (0 <= row < len(ROW_STARTS) and 0 <= day <= 4 and 0 <= col <= 1):
+            raise ValueError(f"Posición fuera del horario: {position}")
+        if position in seen:
+            raise ValueError(f"Posición repetida: {position}")
+        seen.add(position)
+        if slot.get("group_id"):
+            grid[position] = int(slot["group_id"])
+    return grid
+
+
+@require_http_methods(["POST"])
+def save_schedule_grid(request):
+    """
+    Replace the whole weekly schedule with the given grid.
+
+    Body: ``{"version": "...", "slots": [{"row", "day", "col", "group_id"}, ...]}``
+    with every assigned slot; saved slots missing from it (or sent with a null
+    ``group_id``) are cleared. ``version`` is the ``slots_version`` the page
+    was loaded with: when the saved grid no longer matches it (another tab or
+    user saved since), nothing is written and the response is 409 with the
+    current version. Otherwise the grid is diffed against ``ScheduleSlot`` in
+    memory and the changes are applied in one transaction: one bulk upsert,
+    one bulk delete and a single history entry. The response carries the new
+    version for the next save.
+    """
+    try:
+        data = json.loads(request.body)
+        grid = _parse_grid(data["slots"])
+        loaded_version = str(data["version"])
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    unknown = set(grid.values()) - set(Group.objects.filter(id__in=set(grid.values())).values_list("id", flat=True))
+    if unknown:
+        return JsonResponse({"success": False, "error": f"Grupos inexistentes: {sorted(unknown)}"}, status=400)
+
+    with transaction.atomic():
+        existing = {
+            (row, day, col): (slot_id, group_id)
+            for slot_id, row, day, col, group_id in ScheduleSlot.objects.select_for_update().values_list(
+                "id", "row", "day", "col", "group_id"
+            )
+        }
+        current_version = slots_version((*position, group_id) for position, (_, group_id) in existing.items())
+        if current_version != loaded_version:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": "El horario ha cambiado desde que se cargó. Recarga la página.",
+                    "version": current_version,
+                },
+                status=409,
+            )
+        to_upsert = [
+            ScheduleSlot(row=row, day=day, col=col, group_id=group_id)
+            for (row, day, col), group_id in grid.items()
+            if existing.get((row, day, col), (None, None))[1] != group_id
+        ]
+        to_delete = [slot_id for position, (slot_id, _) in existing.items() if position not in grid]
+
+        if to_upsert:
+            ScheduleSlot.objects.bulk_create(
+                to_upsert,
+                update_conflicts=True,
+                unique_fields=["row", "day", "col"],
+                update_fields=["group", "updated_at"],
+            )
+        if to_delete:
+            ScheduleSlot.objects.filter(id__in=to_delete).delete()
+        if to_upsert or to_delete:
+            HistoryLog.log(
+                "schedule_updated",
+                f"Horario semanal actualizado ({len(to_upsert) + len(to_delete)} cambios)",
+                icon="calendar_month",
+            )
+
+    return JsonResponse(
+        {
+            "success": True,
+            "updated": len(to_upsert),
+            "deleted": len(to_delete),
+            "version": slots_version((*position, group_id) for position, group_id in grid.items()),
+        }
+    )
+
+
 def fun_friday_view(request):
     """Vista de Fun Friday con lista de estudiantes."""
     students = (
@@ -3,15 +3,16 @@ from datetime import date
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.http import HttpResponseRedirect, JsonResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
 from billing.forms import EnrollmentForm
 from billing.models import Enrollment, Payment, SiteConfiguration, current_academic_year
 from core.models import FunFridayAttendance, HistoryLog
+from core.transactions import student_list_students
 from students.forms import StudentForm
 from students.models import Group, Parent, Student
 
@@ -55,9 +56,7 @@ class StudentCreateView(CreateView):
             except Parent.DoesNotExist:
                 messages.error(self.request, "El padre especificado no existe")
 
-        if mode == "existing_parent":
-            context["all_parents"] = Parent.objects.all().order_by("last_name", "first_name")
-
+        # Existing-parent and sibling pickers load their options from the typeahead endpoints
         if "enrollment_form" not in context:
             context["enrollment_form"] = EnrollmentForm(self.request.POST or None)
 
@@ -77,11 +76,6 @@ class StudentCreateView(CreateView):
         context["language_cheque_discount"] = str(config.language_cheque_discount)
         context["sibling_discount"] = str(config.sibling_discount)
 
-        # Students for sibling search (active, current year)
-        context["all_students_for_sibling"] = (
-            Student.objects.filter(active=True).select_related("group").order_by("first_name", "last_name")[:200]
-        )
-
         return context
 
     def form_valid(self, form):
@@ -200,44 +194,36 @@ class StudentListView(ListView):
     context_object_name = "students"
 
     def get_queryset(self):
-        academic_year = current_academic_year()
-        queryset = (
-            Student.objects.filter(
-                active=True,
-                enrollments__academic_year=academic_year,
-            )
-            .distinct()
-            .select_related("group")
-            .prefetch_related("parents", "enrollments__enrollment_type")
-        )
+        queryset = student_list_students(current_academic_year(), get_next_friday(), get_last_friday())
 
         search_query = self.request.GET.get("search", "").strip()
         if search_query:
             queryset = queryset.filter(Q(first_name__icontains=search_query) | Q(last_name__icontains=search_query))
 
+        # ?min_age= / ?max_age= (inclusive, today) and ?sort=age|-age, resolved in SQL
+        try:
+            min_age = int(self.request.GET["min_age"]) if self.request.GET.get("min_age") else None
+            max_age = int(self.request.GET["max_age"]) if self.request.GET.get("max_age") else None
+        except ValueError:
+            min_age = max_age = None
+        if min_age is not None or max_age is not None:
+            queryset = queryset.age_between(min_age, max_age)
+
+        sort = self.request.GET.get("sort")
+        if sort in ("age", "-age"):
+            return queryset.order_by_age(descending=sort == "-age")
         return queryset.order_by("-created_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["search_query"] = self.request.GET.get("search", "")
-        context["groups"] = Group.objects.filter(active=True)
-        context["parents"] = Parent.objects.all()
-
-        context["this_week_ids"] = get_ff_student_ids(get_next_friday())
-        context["last_week_ids"] = get_ff_student_ids(get_last_friday())
-
-        # Language cheque info for current academic year
-        academic_year = current_academic_year()
-        lc_student_ids = set(
-            Enrollment.objects.filter(
-                academic_year=academic_year,
-                has_language_cheque=True,
-                student__active=True,
-            ).values_list("student_id", flat=True)
-        )
-        context["language_cheque_ids"] = lc_student_ids
-        context["language_cheque_count"] = len(lc_student_ids)
-
+        context["groups"] = Group.objects.filter(active=True).select_related("teacher")
+        # School-wide for the academic year, whatever ?search/?min_age/?max_age narrow the list to
+        context["language_cheque_count"] = Enrollment.objects.filter(
+            academic_year=current_academic_year(),
+            has_language_cheque=True,
+            student__active=True,
+        ).aggregate(students=Count("student", distinct=True))["students"]
         return context
 
 
@@ -366,20 +352,24 @@ def get_ff_student_ids(friday_date):
 
 
 def search_students(request):
-    # Get all students with related data
-    students = Student.objects.select_related("group", "group__teacher").prefetch_related("parents").filter(active=True)
+    """AJAX endpoint to search active students (payment form autocomplete)"""
+    query = request.GET.get("q", "").strip()
+
+    if len(query) < 2:
+        return JsonResponse({"results": []})
 
-    # Get all groups and parents for the form
-    groups = Group.objects.filter(active=True).select_related("teacher")
-    parents = Parent.objects.all()
+    students = (
+        Student.objects.filter(active=True)
+        .filter(Q(first_name__icontains=query) | Q(last_name__icontains=query))
+        .order_by("last_name", "first_name")
+        .values("id", "first_name", "last_name", "school")[:10]
+    )
 
-    context = {
-        "students": students,
-        "groups": groups,
-        "parents": parents,
-    }
+    results = [
+        {"id": s["id"], "full_name": f"{s['first_name']} {s['last_name']}", "school": s["school"]} for s in students
+    ]
 
-    return render(request, "students.html", context)
+    return JsonResponse({"results": results})
 
 
 def handle_student_form(request):
@@ -7,6 +7,8 @@ from django.views.decorators.http import require_http_methods
 
 from core.models import HistoryLog, TodoItem
 
+HISTORY_PAGE_SIZE = 20
+
 
 @require_http_methods(["POST"])
 def create_todo(request):
@@ -49,32 +51,50 @@ def complete_todo(request, todo_id):
 
 
 def history_list(request):
-    from django.utils.timesince import timesince
+    """
+    History entries with keyset pagination.
+
+    - ``?cursor=<next_cursor>``: the next page of older entries (no cursor: newest page).
+    - ``?since=<cursor>``: entries newer than `cursor`, oldest first, for polling; returns
+      ``latest_cursor`` (the last entry returned) to pass on the next poll and ``has_more``
+      when more new entries are waiting.
 
+    Every call is one range scan on the (created_at, id) index, whatever the depth.
+    """
+    since = request.GET.get("since")
     try:
-        offset = int(request.GET.get("offset", 0))
-    except (ValueError, TypeError):
-        offset = 0
-    limit = 20
-    entries = HistoryLog.objects.all()[offset : offset + limit]
-
-    data = []
-    for entry in entries:
-        data.append(
-            {
-                "id": entry.id,
-                "action": entry.action,
-                "action_display": entry.get_action_display(),
-                "message": entry.message,
-                "icon": entry.icon,
-                "created_at": entry.created_at.isoformat(),
-                "time_ago": timesince(entry.created_at) + " ago",
-            }
-        )
+        if since:
+            entries, has_more = HistoryLog.since(since)
+        else:
+            entries, has_more = HistoryLog.page_before(request.GET.get("cursor"), limit=HISTORY_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "Cursor no válido"}, status=400)
 
+    data = [_history_entry(entry) for entry in entries]
+    if since:
+        return JsonResponse(
+            {"entries": data, "has_more": has_more, "latest_cursor": entries[-1].cursor if entries else since}
+        )
     return JsonResponse(
         {
             "entries": data,
-            "has_more": HistoryLog.objects.count() > offset + limit,
+            "has_more": has_more,
+            "next_cursor": entries[-1].cursor if has_more else None,
+            "latest_cursor": entries[0].cursor if entries else None,
         }
     )
+
+
+def _history_entry(entry):
+    from django.utils.timesince import timesince
+
+    return {
+        "id": entry.id,
+        "cursor": entry.cursor,
+        "action": entry.action,
+        "action_display": entry.get_action_display(),
+        "message": entry.message,
+        "icon": entry.icon,
+        "created_at": entry.created_at.isoformat(),
+        "time_ago": timesince(entry.created_at) + " ago",
+    }
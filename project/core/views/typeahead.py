@@ -0,0 +1,113 @@
+"""
+Typeahead JSON endpoints for the parent, student and group pickers.
+
+The pages no longer render every row as an ``<option>``; they ask these
+endpoints as the user types. Each call is one ``values()`` query (only the
+columns shown in the picker), ordered by an indexed column and cut at one page.
+
+    GET /api/typeahead/parents/?q=lopez&page=2
+    GET /api/typeahead/parents/?ids=3,7        # labels of preselected rows
+
+    {"results": [{"id": 3, "label": "María López", "secondary": "maria@..."}],
+     "page": 2, "has_more": false}
+"""
+
+from functools import reduce
+from operator import and_, or_
+
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from students.models import Group, Parent, Student
+
+TYPEAHEAD_PAGE_SIZE = 20
+TYPEAHEAD_MAX_IDS = 100
+
+
+def _search(queryset, query, fields):
+    """Every word of `query` must appear in one of `fields`."""
+    terms = query.split()
+    if not terms:
+        return queryset
+    return queryset.filter(
+        reduce(and_, (reduce(or_, (Q(**{f"{field}__icontains": term}) for field in fields)) for term in terms))
+    )
+
+
+def _typeahead_response(request, queryset, search_fields, columns, to_result):
+    ids = request.GET.get("ids", "").strip()
+    if ids:
+        try:
+            id_list = [int(i) for i in ids.split(",") if i.strip()][:TYPEAHEAD_MAX_IDS]
+        except ValueError:
+            return JsonResponse({"error": "ids inválidos"}, status=400)
+        rows = queryset.filter(id__in=id_list).values(*columns)
+        return JsonResponse({"results": [to_result(row) for row in rows], "page": 1, "has_more": False})
+
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    start = (page - 1) * TYPEAHEAD_PAGE_SIZE
+    rows = list(
+        _search(queryset, request.GET.get("q", "").strip(), search_fields).values(*columns)[
+            start : start + TYPEAHEAD_PAGE_SIZE + 1
+        ]
+    )
+    return JsonResponse(
+        {
+            "results": [to_result(row) for row in rows[:TYPEAHEAD_PAGE_SIZE]],
+            "page": page,
+            "has_more": len(rows) > TYPEAHEAD_PAGE_SIZE,
+        }
+    )
+
+
+@require_GET
+def typeahead_parents(request):
+    return _typeahead_response(
+        request,
+        Parent.objects.order_by("last_name", "first_name", "id"),
+        ("first_name", "last_name", "email"),
+        ("id", "first_name", "last_name", "email", "phone"),
+        lambda row: {
+            "id": row["id"],
+            "label": f"{row['first_name']} {row['last_name']}",
+            "secondary": " • ".join(v for v in (row["email"], row["phone"]) if v),
+        },
+    )
+
+
+@require_GET
+def typeahead_students(request):
+    """Active students by default; ``?active=0`` includes withdrawn ones."""
+    students = Student.objects.order_by("last_name", "first_name", "id")
+    if request.GET.get("active", "1") != "0":
+        students = students.filter(active=True)
+    return _typeahead_response(
+        request,
+        students,
+        ("first_name", "last_name"),
+        ("id", "first_name", "last_name", "group__group_name"),
+        lambda row: {
+            "id": row["id"],
+            "label": f"{row['first_name']} {row['last_name']}",
+            "secondary": row["group__group_name"],
+        },
+    )
+
+
+@require_GET
+def typeahead_groups(request):
+    return _typeahead_response(
+        request,
+        Group.objects.filter(active=True).order_by("group_name", "id"),
+        ("group_name",),
+        ("id", "group_name", "teacher__first_name", "teacher__last_name"),
+        lambda row: {
+            "id": row["id"],
+            "label": row["group_name"],
+            "secondary": f"{row['teacher__first_name']} {row['teacher__last_name']}",
+        },
+    )
@@ -5,3 +5,14 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
 application = get_asgi_application()
+
+# Precompilar las plantillas de email antes de servir la primera peticion
+from comms.services.email_service import warm_up_email_templates  # noqa: E402
+
+warm_up_email_templates()
+
+# Sin broker: arrancar el pool local y recuperar tareas pendientes de un proceso anterior
+from core.background_queue import local_queue, local_queue_enabled  # noqa: E402
+
+if local_queue_enabled():
+    local_queue.start()
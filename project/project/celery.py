@@ -7,11 +7,13 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 # Establecer el módulo de configuración de Django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
-app = Celery("fiveaday")
+# Sin broker, .delay() encola en el proceso (core.background_queue) en vez de ejecutar en linea
+app = Celery("fiveaday", task_cls="core.background_queue:FallbackTask")
 
 # Usar configuración de Django con prefijo CELERY_
 app.config_from_object("django.conf:settings", namespace="CELERY")
@@ -36,11 +38,24 @@ app.conf.beat_schedule = {
         "schedule": crontab(hour=9, minute=0, day_of_week=1),
         "options": {"queue": "emails"},
     },
+    # Expired sessions — daily at 3:30 AM
+    "clear-expired-sessions-daily": {
+        "task": "core.tasks.clear_expired_sessions_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
 
 app.conf.timezone = "Europe/Madrid"
 
 
+@worker_process_init.connect
+def warm_up_templates(**kwargs):
+    """Precompila las plantillas de email en cada proceso del pool del worker."""
+    from comms.services.email_service import warm_up_email_templates
+
+    warm_up_email_templates()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """Tarea de debug para verificar que Celery funciona"""
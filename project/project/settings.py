@@ -75,6 +75,51 @@ ENVIRONMENT = os.getenv("DJANGO_ENV", "development")
 IS_TESTING_ENV = ENVIRONMENT == "testing" and not DEBUG
 QA_TESTING_USERNAME = os.getenv("QA_TESTING_USERNAME", "")
 
+# ============================================================================
+# CACHE CONFIGURATION
+# ============================================================================
+# Redis compartido entre procesos si hay REDIS_URL (o el broker de Celery es Redis);
+# si no, cache en memoria por proceso (las entradas caducan, asi que lo cacheado
+# nunca queda obsoleto mas de su TTL entre procesos)
+_broker_url = os.getenv("CELERY_BROKER_URL", "")
+REDIS_URL = os.getenv("REDIS_URL") or (_broker_url if _broker_url.startswith("redis") else None)
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "fiveaday",
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        },
+        # Alias propio para que un cache.clear() de "default" no cierre las sesiones
+        "sessions": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "fiveaday-sessions",
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        },
+    }
+    # Si Redis cae, la cache se comporta como vacia en lugar de romper las paginas
+    DJANGO_REDIS_IGNORE_EXCEPTIONS = True
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "fiveaday",
+        }
+    }
+
+# Payload de notificaciones del navbar (core.notifications)
+NOTIFICATIONS_CACHE_SECONDS = int(os.getenv("NOTIFICATIONS_CACHE_SECONDS", "300"))
+
+# Conteos de las tablas paginadas (core.pagination): cache y tamano hasta el que se cuenta exacto
+COUNT_CACHE_SECONDS = int(os.getenv("COUNT_CACHE_SECONDS", "300"))
+EXACT_COUNT_THRESHOLD = int(os.getenv("EXACT_COUNT_THRESHOLD", "10000"))
+
+# Payload serializado de la pagina de horario (core.schedule_cache); la version sale de la base de datos
+SCHEDULE_CACHE_SECONDS = int(os.getenv("SCHEDULE_CACHE_SECONDS", "3600"))
+
 # ============================================================================
 # SESSION CONFIGURATION
 # ============================================================================
@@ -82,11 +127,25 @@ SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", "86400"))  # 24 horas p
 SESSION_COOKIE_HTTPONLY = os.getenv("SESSION_COOKIE_HTTPONLY", "True").lower() == "true"
 SESSION_COOKIE_SAMESITE = os.getenv("SESSION_COOKIE_SAMESITE", "Strict" if not DEBUG else "Lax")
 
+# SimpleAuthMiddleware lee la sesion en cada peticion. Con Redis, cached_db la sirve
+# desde la cache (sin SELECT a django_session) y la sigue guardando en BD. Sin Redis
+# se queda en BD: una cache por proceso no veria los logouts hechos en otros procesos.
+# SESSION_ENGINE=django.contrib.sessions.backends.cache guarda la sesion solo en Redis.
+SESSION_ENGINE = os.getenv(
+    "SESSION_ENGINE",
+    "django.contrib.sessions.backends.cached_db" if REDIS_URL else "django.contrib.sessions.backends.db",
+)
+SESSION_CACHE_ALIAS = "sessions" if REDIS_URL else "default"
+
 # ============================================================================
 # SUPPORT / TICKETING
 # ============================================================================
 SUPPORT_EMAIL = os.getenv("SUPPORT_EMAIL", None)
 
+# Emails de error de QA (core/error_reports.py): como mucho uno por error distinto en cada ventana
+QA_ERROR_REPORT_WINDOW_SECONDS = int(os.getenv("QA_ERROR_REPORT_WINDOW_SECONDS", "600"))
+QA_ERROR_REPORT_QUEUE_SIZE = 1000
+
 # ============================================================================
 # CSRF CONFIGURATION
 # ============================================================================
@@ -126,16 +185,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.QAErrorEmailMiddleware",  # QA: email errors to support
     "core.middleware.SimpleAuthMiddleware",  # Middleware de autenticación simple
+    "core.middleware.HistoryBufferMiddleware",  # Historial: un INSERT por petición, tras el commit
 ]
 
 ROOT_URLCONF = "project.urls"
 
+# Plantillas compiladas una vez por proceso (cached loader explicito, tambien en DEBUG:
+# Django recarga la cache al editar una plantilla con el autoreloader). Los procesos web
+# (wsgi/asgi) y los workers de Celery precompilan los emails al arrancar
+# (comms.services.email_service.warm_up_email_templates).
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
+        "APP_DIRS": False,
         "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
@@ -303,6 +376,9 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_SECRET", "")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Cache por proceso de imagenes inline y adjuntos leidos de disco (comms.services.mime_cache)
+EMAIL_MIME_CACHE_MAX_BYTES = int(os.getenv("EMAIL_MIME_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
 # ============================================================================
 # CELERY CONFIGURATION
 # ============================================================================
@@ -337,3 +413,14 @@ CELERY_TASK_ROUTES = {
 if not CELERY_BROKER_URL:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
+
+# Sin broker, .delay() no ejecuta en la peticion: la tarea se guarda en la tabla
+# background_tasks y la ejecuta un pool de hilos del propio proceso (core.background_queue)
+BACKGROUND_TASKS_LOCAL = not CELERY_BROKER_URL
+BACKGROUND_TASKS_WORKERS = int(os.getenv("BACKGROUND_TASKS_WORKERS", "2"))
+BACKGROUND_TASKS_MAX_QUEUED = int(os.getenv("BACKGROUND_TASKS_MAX_QUEUED", "100"))
+BACKGROUND_TASKS_POLL_SECONDS = int(os.getenv("BACKGROUND_TASKS_POLL_SECONDS", "5"))
+BACKGROUND_TASKS_MAX_ATTEMPTS = 3
+# Reintentos con backoff exponencial: 60s, 120s, 240s... hasta una hora
+BACKGROUND_TASKS_RETRY_SECONDS = 60
+BACKGROUND_TASKS_RETRY_MAX_SECONDS = 3600
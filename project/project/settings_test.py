@@ -8,6 +8,7 @@ If PostgreSQL is not available, falls back to SQLite for CI or quick local runs.
 """
 
 import os
+import tempfile
 
 from project.settings import *  # noqa: F401, F403
 
@@ -43,6 +44,9 @@ STORAGES = {
     },
 }
 
+# Uploaded/generated files (e.g. the tax certificate store) go to a throwaway directory
+MEDIA_ROOT = tempfile.mkdtemp(prefix="fiveaday_test_media_")
+
 # Disable password validators for faster tests
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -54,6 +58,15 @@ PASSWORD_HASHERS = [
 # Disable Celery in tests
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
+BACKGROUND_TASKS_LOCAL = False  # tasks run inline; test_background_queue.py enables the queue
+
+# QA error reports stay queued; tests drain them explicitly (core.error_reports)
+QA_ERROR_REPORT_BACKGROUND = False
+
+# Per-process cache even when REDIS_URL is set; cleared before each test (conftest.py)
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SESSION_ENGINE = "django.contrib.sessions.backends.db"  # test_middleware.py measures cached_db
+SESSION_CACHE_ALIAS = "default"
 
 # Use in-memory email backend (enables django.core.mail.outbox for assertions)
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
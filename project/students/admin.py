@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html_join
 
 from students.models import Group, Parent, Student, StudentParent, Teacher
 
@@ -39,12 +41,25 @@ class ParentAdmin(admin.ModelAdmin):
     list_display = ["first_name", "last_name", "dni", "phone", "email"]
     search_fields = ["first_name", "last_name", "dni", "email"]
     inlines = [ParentStudentInline]
+    readonly_fields = ["tax_certificates"]
 
     fieldsets = (
         ("Personal Information", {"fields": ("first_name", "last_name", "dni")}),
         ("Contact Information", {"fields": ("phone", "email", "iban")}),
+        ("Tax Certificates", {"fields": ("tax_certificates",)}),
     )
 
+    @admin.display(description="Certificados fiscales")
+    def tax_certificates(self, obj):
+        """Download links (served from the certificate store) for every year with completed payments."""
+        if not obj.pk:
+            return "-"
+        years = obj.payments.filter(payment_status="completed", payment_date__isnull=False).dates(
+            "payment_date", "year", order="DESC"
+        )
+        links = [(reverse("download_tax_certificate", args=[obj.pk, year.year]), year.year) for year in years]
+        return format_html_join(" | ", '<a href="{}">{}</a>', links) or "-"
+
 
 @admin.register(StudentParent)
 class StudentParentAdmin(admin.ModelAdmin):
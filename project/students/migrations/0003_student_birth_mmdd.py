@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:32
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def fill_birth_mmdd(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    Student.objects.update(birth_mmdd=ExtractMonth("birth_date") * 100 + ExtractDay("birth_date"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("students", "0002_alter_studentparent_unique_together_student_gender_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="student",
+            name="birth_mmdd",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_birth_mmdd, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["active", "birth_mmdd"], name="student_active_birthday_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("students", "0003_student_birth_mmdd"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="parent",
+            index=models.Index(fields=["last_name", "first_name"], name="parent_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["active", "last_name", "first_name"], name="student_active_name_idx"),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.core.validators import EmailValidator
 from django.db import models
+from django.db.models.functions import ExtractYear
 
 
 class Teacher(models.Model):
@@ -61,6 +62,8 @@ class Parent(models.Model):
         indexes = [
             models.Index(fields=["dni"]),
             models.Index(fields=["email"]),
+            # Typeahead and search results are ordered by name
+            models.Index(fields=["last_name", "first_name"], name="parent_name_idx"),
         ]
 
     def __str__(self):
@@ -71,10 +74,98 @@ class Parent(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+def birth_mmdd(day) -> int:
+    """Month-day key of a date: 14 March -> 314."""
+    return day.month * 100 + day.day
+
+
+def years_before(day, years):
+    """Same date `years` years earlier (29 February -> 28 February)."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+class StudentQuerySet(models.QuerySet):
+    """Birthday lookups as range scans on ``birth_mmdd`` (index ``(active, birth_mmdd)``).
+
+    Filtering ``birth_date__month`` / ``__day`` extracts from every row and cannot use an index.
+    Age is computed in SQL from ``birth_date`` and ``birth_mmdd`` (portable: PostgreSQL and SQLite).
+    """
+
+    def with_age(self, on=None):
+        """Annotate ``age``: whole years on `on` (default today), same as ``Student.age``."""
+        from datetime import date
+
+        on = on or date.today()
+        birthday_ahead = models.Case(
+            models.When(birth_mmdd__gt=birth_mmdd(on), then=1),
+            default=0,
+            output_field=models.IntegerField(),
+        )
+        return self.annotate(age=models.Value(on.year) - ExtractYear("birth_date") - birthday_ahead)
+
+    def age_between(self, min_age=None, max_age=None, on=None):
+        """
+        Students aged `min_age` to `max_age` (inclusive, either may be None) on `on` (default today).
+
+        Filters a ``birth_date`` range, so it can use the ``birth_date`` index and needs no annotation.
+        """
+        from datetime import date
+
+        on = on or date.today()
+        students = self
+        if min_age is not None:
+            students = students.filter(birth_date__lte=years_before(on, min_age))
+        if max_age is not None:
+            students = students.filter(birth_date__gt=years_before(on, max_age + 1))
+        return students
+
+    def order_by_age(self, descending=False):
+        """Youngest first (oldest first with `descending`); age order is ``birth_date`` order reversed."""
+        return self.order_by("birth_date" if descending else "-birth_date", "id")
+
+    def birthdays_on(self, day):
+        """Students whose birthday is `day` (any year)."""
+        return self.filter(birth_mmdd=birth_mmdd(day))
+
+    def birthdays_in_month(self, month):
+        """Students born in `month`, ordered by day."""
+        return self.filter(birth_mmdd__range=(month * 100 + 1, month * 100 + 31)).order_by("birth_mmdd")
+
+    def upcoming_birthdays(self, days, start=None):
+        """
+        Students with a birthday from `start` (default today) to `days` days later, inclusive,
+        in calendar order. A range that crosses 31 December becomes two ranges (end of year, start of year).
+        """
+        from datetime import date, timedelta
+
+        start = start or date.today()
+        end = start + timedelta(days=days)
+        if days >= 365:
+            students = self.all()
+        elif end.year == start.year:
+            students = self.filter(birth_mmdd__range=(birth_mmdd(start), birth_mmdd(end)))
+        else:
+            students = self.filter(
+                models.Q(birth_mmdd__gte=birth_mmdd(start)) | models.Q(birth_mmdd__lte=birth_mmdd(end))
+            )
+        # Birthdays still ahead this year come before those of next year
+        next_year = models.Case(
+            models.When(birth_mmdd__lt=birth_mmdd(start), then=1),
+            default=0,
+            output_field=models.IntegerField(),
+        )
+        return students.annotate(birthday_next_year=next_year).order_by("birthday_next_year", "birth_mmdd")
+
+
 class Student(models.Model):
     last_name = models.CharField(max_length=100)
     first_name = models.CharField(max_length=100)
     birth_date = models.DateField()
+    # month * 100 + day of birth_date, kept by save(); see StudentQuerySet
+    birth_mmdd = models.PositiveSmallIntegerField(editable=False, default=0)
     GENDER_CHOICES = [
         ("m", "Masculino"),
         ("f", "Femenino"),
@@ -100,17 +191,34 @@ class Student(models.Model):
             models.Index(fields=["group"]),
             models.Index(fields=["active"]),
             models.Index(fields=["birth_date"]),
+            models.Index(fields=["active", "birth_mmdd"], name="student_active_birthday_idx"),
+            models.Index(fields=["active", "last_name", "first_name"], name="student_active_name_idx"),
         ]
 
+    objects = StudentQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        # Views may assign birth_date straight from request.POST ("YYYY-MM-DD")
+        self.birth_date = self._meta.get_field("birth_date").to_python(self.birth_date)
+        if self.birth_date:
+            self.birth_mmdd = birth_mmdd(self.birth_date)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "birth_date" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "birth_mmdd"}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
     @property
     def age(self):
+        """Whole years today; rows loaded with ``with_age()`` carry the SQL value for its date instead."""
+        if "_age" in self.__dict__:
+            return self._age
         from datetime import date
 
         today = date.today()
@@ -120,6 +228,11 @@ class Student(models.Model):
             - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
         )
 
+    @age.setter
+    def age(self, value):
+        # Set by the ``age`` annotation of StudentQuerySet.with_age()
+        self._age = value
+
 
 class StudentParent(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
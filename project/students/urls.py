@@ -9,12 +9,18 @@ from core.views import (
     StudentListView,
     StudentUpdateView,
     add_fun_friday_attendance,
+    fun_friday_season_matrix,
+    register_fun_friday_attendance,
     remove_fun_friday_attendance,
     search_parents,
     # Search/validation API
     search_students,
     # Fun Friday attendance
     toggle_fun_friday_this_week,
+    # Typeahead pickers
+    typeahead_groups,
+    typeahead_parents,
+    typeahead_students,
     validate_student_parent,
 )
 
@@ -45,11 +51,16 @@ urlpatterns = [
         remove_fun_friday_attendance,
         name="remove_fun_friday_attendance",
     ),
+    path("api/fun-friday/register/", register_fun_friday_attendance, name="register_fun_friday_attendance"),
+    path("api/fun-friday/matrix/", fun_friday_season_matrix, name="fun_friday_season_matrix"),
     # ============================================================================
     # API ENDPOINTS - Search and Validation
     # ============================================================================
     path("api/search/students/", search_students, name="search_students"),
     path("api/search/parents/", search_parents, name="search_parents"),
+    path("api/typeahead/parents/", typeahead_parents, name="typeahead_parents"),
+    path("api/typeahead/students/", typeahead_students, name="typeahead_students"),
+    path("api/typeahead/groups/", typeahead_groups, name="typeahead_groups"),
     path(
         "api/validate/student-parent/",
         validate_student_parent,
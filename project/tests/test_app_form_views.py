@@ -56,6 +56,27 @@ class TestFunFridayForm:
         )
         assert response.status_code == 302  # redirects to home
 
+    def test_send_only_to_families_in_age_range(self, authenticated_client, student_with_parent, mailoutbox):
+        # Lucas (2018-05-15) is 7 or 8 on the next Friday
+        next_friday = date.today() + timedelta(days=(4 - date.today().weekday()) % 7 or 7)
+        data = {
+            "event_date": next_friday.isoformat(),
+            "start_time": "17:00",
+            "end_time": "18:30",
+            "activity_description": "<b>Crafts</b>",
+            "max_age": "18",
+        }
+        authenticated_client.post(reverse("fun_friday_form"), {**data, "min_age": "12"})
+        assert len(mailoutbox) == 0
+        authenticated_client.post(reverse("fun_friday_form"), {**data, "min_age": "5"})
+        assert [m.to for m in mailoutbox] == [[student_with_parent.parents.get().email]]
+
+    def test_count_action(self, authenticated_client, student_with_parent):
+        next_friday = date.today() + timedelta(days=(4 - date.today().weekday()) % 7 or 7)
+        post = {"action": "count", "event_date": next_friday.isoformat(), "max_age": "18"}
+        assert authenticated_client.post(reverse("fun_friday_form"), {**post, "min_age": "5"}).json() == {"count": 1}
+        assert authenticated_client.post(reverse("fun_friday_form"), {**post, "min_age": "12"}).json() == {"count": 0}
+
 
 class TestPaymentReminderForm:
     def test_get_renders_form(self, authenticated_client):
@@ -190,6 +211,18 @@ class TestBirthdayForm:
         response = authenticated_client.get(reverse("birthday_form"))
         assert response.status_code == 200
 
+    def test_send_reaches_adult_students(self, authenticated_client, adult_student):
+        from django.core import mail
+
+        from students.models import years_before
+
+        adult_student.birth_date = years_before(date.today(), 36)
+        adult_student.save()
+        mail.outbox.clear()
+        response = authenticated_client.post(reverse("birthday_form"), {"action": "send"})
+        assert response.status_code == 302
+        assert [m.to for m in mail.outbox] == [["carlos@test.com"]]
+
 
 class TestEnrollmentForm:
     def test_get_renders_form(self, authenticated_client):
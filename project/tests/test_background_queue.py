@@ -0,0 +1,147 @@
+"""Tests for core.background_queue — in-process task queue used when no Celery broker is configured."""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from comms.tasks import send_generic_email_task, send_welcome_email_task
+from core.background_queue import local_queue
+from core.models import BackgroundTask
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_mode(settings):
+    settings.BACKGROUND_TASKS_LOCAL = True
+    mail.outbox.clear()
+
+
+def queue_birthday_email():
+    return send_generic_email_task.delay(
+        template_name="happy_birthday", recipient_email="a@example.com", subject="Hola", context={"name": "Ana"}
+    )
+
+
+class TestEnqueue:
+    def test_delay_stores_task_without_running_it(self):
+        result = queue_birthday_email()
+        task = BackgroundTask.objects.get()
+        assert result.id == f"local-{task.pk}"
+        assert task.task_name == "comms.tasks.send_generic_email_task"
+        assert task.kwargs["recipient_email"] == "a@example.com"
+        assert task.status == BackgroundTask.PENDING
+        assert len(mail.outbox) == 0
+
+    def test_submitted_to_pool_on_commit(self, django_capture_on_commit_callbacks):
+        with patch.object(local_queue, "submit") as submit:
+            with django_capture_on_commit_callbacks(execute=True):
+                queue_birthday_email()
+        submit.assert_called_once_with(BackgroundTask.objects.get().pk)
+
+    def test_rolled_back_transaction_discards_task(self):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            queue_birthday_email()
+            raise RuntimeError
+        assert not BackgroundTask.objects.exists()
+
+    def test_countdown_sets_run_after(self):
+        send_generic_email_task.apply_async(
+            kwargs={"template_name": "happy_birthday", "recipient_email": "a@example.com", "subject": "Hola"},
+            countdown=600,
+        )
+        assert BackgroundTask.objects.get().run_after > timezone.now() + timedelta(minutes=9)
+        assert local_queue.run_pending() == 0
+
+    def test_welcome_email_not_run_in_request(self):
+        with patch.object(send_welcome_email_task, "run") as run:
+            send_welcome_email_task.delay(parent_id=1, student_id=2, enrollment_id=3)
+        run.assert_not_called()
+        assert BackgroundTask.objects.get().task_name == "comms.tasks.send_welcome_email_task"
+
+    def test_inline_when_disabled(self, settings):
+        settings.BACKGROUND_TASKS_LOCAL = False
+        queue_birthday_email()
+        assert len(mail.outbox) == 1
+        assert not BackgroundTask.objects.exists()
+
+
+class TestRunPending:
+    def test_runs_task_and_deletes_row(self):
+        queue_birthday_email()
+        assert local_queue.run_pending() == 1
+        assert len(mail.outbox) == 1
+        assert not BackgroundTask.objects.exists()
+
+    def test_failure_rescheduled_with_backoff_then_marked_failed(self, settings):
+        settings.BACKGROUND_TASKS_MAX_ATTEMPTS = 3
+        settings.BACKGROUND_TASKS_RETRY_SECONDS = 60
+        queue_birthday_email()
+        task = BackgroundTask.objects.get()
+        with patch.object(send_generic_email_task, "run", side_effect=RuntimeError("SMTP down")):
+            for attempts, delay in ((1, 60), (2, 120)):
+                before = timezone.now()
+                local_queue.run_pending()
+                task.refresh_from_db()
+                assert (task.status, task.attempts) == (BackgroundTask.PENDING, attempts)
+                assert before + timedelta(seconds=delay) <= task.run_after <= timezone.now() + timedelta(seconds=delay)
+                assert local_queue.run_pending() == 0  # not due yet
+                BackgroundTask.objects.update(run_after=timezone.now())
+
+            local_queue.run_pending()
+        task.refresh_from_db()
+        assert task.status == BackgroundTask.FAILED
+        assert task.attempts == 3
+        assert "SMTP down" in task.last_error
+
+    def test_retry_delay_is_capped(self, settings):
+        settings.BACKGROUND_TASKS_RETRY_SECONDS = 60
+        settings.BACKGROUND_TASKS_RETRY_MAX_SECONDS = 300
+        assert [local_queue.retry_delay(n).total_seconds() for n in range(1, 6)] == [60, 120, 240, 300, 300]
+
+    def test_unknown_task_fails_without_retry(self):
+        BackgroundTask.objects.create(task_name="comms.tasks.does_not_exist")
+        local_queue.run_pending()
+        task = BackgroundTask.objects.get()
+        assert task.status == BackgroundTask.FAILED
+        assert task.attempts == 1
+        assert task.last_error == "Unknown task: comms.tasks.does_not_exist"
+
+    def test_task_modules_loaded_before_running(self):
+        with patch("core.background_queue.load_task_modules") as load:
+            local_queue.run_pending()
+        load.assert_called_once_with()
+
+    def test_task_left_running_by_crash_is_recovered(self, settings):
+        settings.BACKGROUND_TASKS_STALE_SECONDS = 60
+        queue_birthday_email()
+        BackgroundTask.objects.update(
+            status=BackgroundTask.RUNNING, attempts=1, started_at=timezone.now() - timedelta(minutes=5)
+        )
+        assert local_queue.run_pending() == 0  # backoff before the retry
+        task = BackgroundTask.objects.get()
+        assert task.status == BackgroundTask.PENDING
+        assert task.run_after > timezone.now()
+
+        BackgroundTask.objects.update(run_after=timezone.now())
+        assert local_queue.run_pending() == 1
+        assert len(mail.outbox) == 1
+
+    def test_running_task_not_claimed_twice(self):
+        queue_birthday_email()
+        BackgroundTask.objects.update(status=BackgroundTask.RUNNING, started_at=timezone.now())
+        assert local_queue.execute(BackgroundTask.objects.get().pk) is False
+        assert len(mail.outbox) == 0
+
+    def test_command_drains_queue(self):
+        queue_birthday_email()
+        out = StringIO()
+        call_command("process_background_tasks", stdout=out)
+        assert "1 task(s) run, 0 failed" in out.getvalue()
+        assert len(mail.outbox) == 1
@@ -0,0 +1,141 @@
+"""Tests for comms.services.certificate_store — content-addressed tax certificate cache."""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from billing.models import Payment
+from comms.services.certificate_store import (
+    certificate_dir,
+    document_digest,
+    ensure_stored,
+    find_stored,
+    get_or_render,
+    render_with_store,
+)
+from comms.services.pdf_service import render_documents
+from comms.services.tax_certificate_service import (
+    load_tax_certificates,
+    render_tax_certificate_batch,
+    run_tax_certificate_pipeline,
+)
+
+pytestmark = pytest.mark.django_db
+
+RENDER = "comms.services.tax_certificate_service.render_documents"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def paid(student_with_parent, parent):
+    return Payment.objects.create(
+        student=student_with_parent,
+        parent=parent,
+        payment_type="monthly",
+        amount=Decimal("54.00"),
+        payment_status="completed",
+        due_date=date(2025, 9, 1),
+        payment_date=date(2025, 9, 5),
+        concept="Septiembre",
+    )
+
+
+def certificate():
+    return load_tax_certificates(2025)[0]
+
+
+class TestDigest:
+    def test_stable_for_same_rows(self, paid):
+        assert document_digest(certificate()) == document_digest(certificate())
+
+    def test_changes_with_payment_rows(self, paid):
+        before = document_digest(certificate())
+        Payment.objects.filter(id=paid.id).update(amount=Decimal("60.00"))
+        assert document_digest(certificate()) != before
+
+
+class TestGetOrRender:
+    def test_second_call_served_from_store(self, paid):
+        first = get_or_render(certificate(), render_tax_certificate_batch)
+        with patch(RENDER) as render:
+            second = get_or_render(certificate(), render_tax_certificate_batch)
+        render.assert_not_called()
+        assert second.content == first.content
+        assert second.mimetype == first.mimetype
+
+    def test_changed_payment_rerenders_and_replaces_entry(self, paid):
+        get_or_render(certificate(), render_tax_certificate_batch)
+        # .update() skips signals: the new digest alone must force a re-render
+        Payment.objects.filter(id=paid.id).update(amount=Decimal("60.00"))
+        with patch(RENDER, wraps=render_documents) as render:
+            get_or_render(certificate(), render_tax_certificate_batch)
+        render.assert_called_once()
+        assert find_stored(certificate()) is not None
+        _, files = default_storage.listdir(certificate_dir(paid.parent_id, 2025))
+        assert len(files) == 1
+
+    def test_payment_save_purges_entry(self, paid):
+        ensure_stored(certificate(), render_tax_certificate_batch)
+        paid.amount = Decimal("60.00")
+        paid.save()
+        _, files = default_storage.listdir(certificate_dir(paid.parent_id, 2025))
+        assert files == []
+
+    def test_unrelated_field_change_keeps_entry(self, paid):
+        ensure_stored(certificate(), render_tax_certificate_batch)
+        paid.observations = "Pagado en ventanilla"
+        paid.save()
+        paid.save(update_fields=["observations"])
+        _, files = default_storage.listdir(certificate_dir(paid.parent_id, 2025))
+        assert len(files) == 1
+
+    def test_moved_payment_purges_old_year(self, paid):
+        ensure_stored(certificate(), render_tax_certificate_batch)
+        paid.payment_date = date(2026, 1, 2)
+        paid.save()
+        _, files = default_storage.listdir(certificate_dir(paid.parent_id, 2025))
+        assert files == []
+
+    def test_entry_purged_after_lookup_is_rendered_again(self, paid):
+        certificates = [certificate()]
+        ensure_stored(certificates[0], render_tax_certificate_batch)
+        rendered = render_with_store(certificates, render_tax_certificate_batch)
+        with patch("comms.services.certificate_store.get_stored", return_value=None) as get_stored:
+            items = list(rendered)
+        get_stored.assert_called_once()
+        assert [item.document for item in items] == certificates
+        assert items[0].error == ""
+        assert items[0].content
+
+    def test_pipeline_reuses_store(self, paid):
+        ensure_stored(certificate(), render_tax_certificate_batch)
+        with patch(RENDER) as render:
+            results = run_tax_certificate_pipeline(2025, workers=1)
+        render.assert_not_called()
+        assert results["sent"] == 1
+
+
+class TestDownloadView:
+    def test_download_serves_from_store(self, authenticated_client, paid):
+        url = reverse("download_tax_certificate", args=[paid.parent_id, 2025])
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        assert "certificado_fiscal_2025_12345678A" in response["Content-Disposition"]
+        assert find_stored(certificate()) is not None
+
+        with patch(RENDER) as render:
+            response = authenticated_client.get(url)
+        render.assert_not_called()
+        assert response.status_code == 200
+
+    def test_no_payments_404(self, authenticated_client, parent):
+        response = authenticated_client.get(reverse("download_tax_certificate", args=[parent.id, 2025]))
+        assert response.status_code == 404
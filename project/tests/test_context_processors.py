@@ -98,3 +98,69 @@ class TestTodayNotifications:
         ctx = today_notifications(request_obj)
         assert ctx["notifications_today_todos"] == []
         assert ctx["history_count"] == 0
+
+
+@pytest.fixture
+def shared_cache():
+    """Treat the test LocMem cache as the shared (Redis) cache of production."""
+    with patch("core.pagination.cache_is_shared", return_value=True):
+        yield
+
+
+@pytest.mark.usefixtures("shared_cache")
+class TestNotificationsCache:
+    def test_values_are_lazy(self, request_obj, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            today_notifications(request_obj)
+
+    def test_cache_hit_runs_no_queries(self, request_obj, django_assert_num_queries):
+        TodoItem.objects.create(text="Cached", due_date=date.today())
+        assert today_notifications(request_obj)["history_count"] == 0
+
+        with django_assert_num_queries(0):
+            ctx = today_notifications(request_obj)
+            assert ctx["notifications_today_todos"][0]["text"] == "Cached"
+            assert ctx["history_count"] == 0
+
+    def test_payload_loaded_once_per_render(self, request_obj, django_assert_num_queries):
+        ctx = today_notifications(request_obj)
+        with django_assert_num_queries(2):
+            assert ctx["notifications_count"] >= 0
+            assert ctx["history_count"] == 0
+            assert list(ctx["notifications_today_todos"]) == []
+
+    def test_todo_changes_invalidate(self, request_obj):
+        assert today_notifications(request_obj)["notifications_today_todos"] == []
+        todo = TodoItem.objects.create(text="New", due_date=date.today())
+        assert len(today_notifications(request_obj)["notifications_today_todos"]) == 1
+        todo.delete()
+        assert today_notifications(request_obj)["notifications_today_todos"] == []
+
+    def test_history_writes_invalidate(self, request_obj):
+        assert today_notifications(request_obj)["history_count"] == 0
+        HistoryLog.log("config_updated", "One")
+        assert today_notifications(request_obj)["history_count"] == 1
+        HistoryLog.log_many([("payment_completed", "Two"), ("payment_completed", "Three")])
+        assert today_notifications(request_obj)["history_count"] == 3
+
+    def test_template_renders_lazy_values(self, request_obj):
+        from django.template import Context, Template
+
+        TodoItem.objects.create(text="Render me", due_date=date.today())
+        HistoryLog.log("config_updated", "Entry")
+        ctx = today_notifications(request_obj)
+        html = Template(
+            "{% if history_count > 0 %}badge{% endif %}|{{ history_count }}|"
+            "{% for todo in notifications_today_todos %}{{ todo.text }}{% endfor %}"
+        ).render(Context(ctx))
+        assert html == "badge|1|Render me"
+
+
+class TestPerProcessCache:
+    def test_reads_database_on_every_render(self, request_obj, django_assert_num_queries):
+        assert today_notifications(request_obj)["history_count"] == 0
+        HistoryLog.objects.create(action="config_updated", message="No signal")  # written by another worker
+        with django_assert_num_queries(2):
+            ctx = today_notifications(request_obj)
+            assert ctx["history_count"] == 1
+            assert list(ctx["notifications_today_todos"]) == []
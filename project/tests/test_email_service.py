@@ -1,10 +1,18 @@
 """Tests for comms.services.email_service — EmailService class."""
 
+from io import StringIO
+
 import pytest
 from django.core import mail
-from django.template import TemplateDoesNotExist
+from django.core.management import call_command
+from django.template import TemplateDoesNotExist, engines
 
-from comms.services.email_service import EmailService, email_service
+from comms.services.email_service import (
+    EmailService,
+    email_service,
+    email_template_names,
+    warm_up_email_templates,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -147,3 +155,31 @@ class TestSendBulkEmails:
         ]
         results = svc.send_bulk_emails("nonexistent_xyz", data, fail_silently=True)
         assert results["failed"] >= 1
+
+
+class TestTemplateWarmUp:
+    def test_all_email_templates_listed(self):
+        names = email_template_names()
+        assert len(names) == 14
+        assert "happy_birthday" in names
+        assert "base_email" in names
+
+    def test_warm_up_fills_cached_loader(self):
+        loader = engines["django"].engine.template_loaders[0]
+        assert loader.__class__.__name__ == "Loader" and hasattr(loader, "get_template_cache")
+        loader.reset()
+        assert warm_up_email_templates() == 14
+        assert "emails/happy_birthday.html" in loader.get_template_cache
+
+    def test_benchmark_reports_every_template(self):
+        out = StringIO()
+        call_command("benchmark_email_templates", "--iterations", "3", stdout=out)
+        output = out.getvalue()
+        for name in email_template_names():
+            assert f"  {name} " in output
+        assert "Total:" in output
+
+    def test_benchmark_only(self):
+        out = StringIO()
+        call_command("benchmark_email_templates", "--iterations", "2", "--only", "newsletter", stdout=out)
+        assert "1 plantillas x 2 renders" in out.getvalue()
@@ -1,7 +1,20 @@
-"""Tests for core.middleware — auth middleware edge cases."""
+"""Tests for core.middleware — auth middleware edge cases and QA error reports."""
+
+import time
+from datetime import timedelta
 
 import pytest
-from django.test import Client
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.error_reports import ErrorReport, error_reporter, exception_fingerprint
+from core.middleware import QAErrorEmailMiddleware
+from core.models import QAConfiguration
+from core.tasks import clear_expired_sessions_task
 
 pytestmark = pytest.mark.django_db
 
@@ -79,3 +92,143 @@ class TestAuthenticatedAccess:
         response = client.get("/")
         assert response.status_code == 302
         assert "/login/" in response["Location"]
+
+
+def session_queries(client, path="/api/history/"):
+    """Run an authenticated GET and return the SQL of its queries."""
+    session = client.session
+    session["is_authenticated"] = True
+    session["username"] = "testuser"
+    session.save()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    assert response.status_code == 200
+    return [q["sql"] for q in queries.captured_queries]
+
+
+class TestSessionEngine:
+    """SimpleAuthMiddleware reads the session on every request: measure what each engine costs."""
+
+    def test_db_sessions_query_django_session(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.db"
+        sql = session_queries(Client())
+        assert sum("django_session" in q for q in sql) == 1
+
+    def test_cached_db_saves_one_query_per_request(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.db"
+        db_sql = session_queries(Client())
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+        cached_sql = session_queries(Client())
+
+        assert not any("django_session" in q for q in cached_sql)
+        assert len(db_sql) - len(cached_sql) == 1
+
+    def test_cache_sessions_authenticate(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+        sql = session_queries(Client())
+        assert not any("django_session" in q for q in sql)
+
+    def test_cached_db_logout_ends_session(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+        client = Client()
+        session_queries(client)
+        client.get("/logout/")
+        response = client.get("/api/history/")
+        assert response.status_code == 302
+
+
+class TestClearExpiredSessionsTask:
+    def test_deletes_only_expired_rows(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+        now = timezone.now()
+        Session.objects.create(session_key="expired", session_data="", expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key="current", session_data="", expire_date=now + timedelta(days=1))
+
+        clear_expired_sessions_task.delay()
+
+        assert list(Session.objects.values_list("session_key", flat=True)) == ["current"]
+
+
+def raise_error(exc_type=ValueError, message="boom"):
+    """Raise from a fixed line so every call gets the same fingerprint."""
+    try:
+        raise exc_type(message)
+    except Exception as e:
+        return e
+
+
+class TestQAErrorEmailMiddleware:
+    """Error reports are queued in memory and emailed once per fingerprint per window."""
+
+    @pytest.fixture(autouse=True)
+    def reporter(self, settings):
+        settings.SUPPORT_EMAIL = "support@example.com"
+        settings.QA_ERROR_REPORT_WINDOW_SECONDS = 600
+        QAConfiguration.objects.create(error_email_enabled=True)
+        mail.outbox.clear()
+        error_reporter.reset()
+        yield error_reporter
+        error_reporter.reset()
+
+    def call_middleware(self, exception):
+        request = RequestFactory().post("/students/", data={"name": "x"})
+        return QAErrorEmailMiddleware(lambda r: None).process_exception(request, exception)
+
+    def test_request_only_enqueues(self, reporter, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert self.call_middleware(raise_error()) is None
+        assert len(mail.outbox) == 0
+        assert reporter.drain() == 1
+        message = mail.outbox[0]
+        assert message.to == ["support@example.com"]
+        assert message.subject == "[ERROR] ValueError at /students/"
+        assert "POST /students/" in message.body
+
+    def test_storm_sends_one_email_per_fingerprint(self, reporter):
+        for _ in range(20):
+            self.call_middleware(raise_error())
+        self.call_middleware(raise_error(KeyError))
+        assert reporter.drain() == 2
+        assert {m.subject for m in mail.outbox} == {
+            "[ERROR] ValueError at /students/",
+            "[ERROR] KeyError at /students/",
+        }
+
+    def test_suppressed_occurrences_summarised_after_window(self, reporter):
+        def report():
+            return ErrorReport.from_exception(raise_error(), "GET", "/", "anonymous", "")
+
+        now = time.monotonic()
+        assert reporter.process(report(), now=now) == 1
+        assert reporter.process(report(), now=now + 10) == 0
+        assert reporter.process(report(), now=now + 20) == 0
+        assert reporter.flush_due(now=now + 300) == 0
+        assert reporter.flush_due(now=now + 601) == 1
+        assert mail.outbox[-1].subject.endswith("(x2)")
+        assert "Occurrences: 2 since the last report" in mail.outbox[-1].body
+
+    def test_report_keeps_no_exception(self, reporter):
+        self.call_middleware(raise_error(message="boom"))
+        report = reporter.reports.get_nowait()
+        assert not any(isinstance(value, BaseException) for value in vars(report).values())
+        assert report.exception_type == "ValueError"
+        assert report.message == "boom"
+        assert "raise exc_type(message)" in report.traceback
+        assert report.fingerprint == exception_fingerprint(raise_error())
+        reporter.process(report)
+        assert "ValueError: boom" in mail.outbox[0].body
+        assert "raise exc_type(message)" in mail.outbox[0].body
+
+    def test_disabled_config_sends_nothing(self, reporter):
+        QAConfiguration.objects.update(error_email_enabled=False)
+        self.call_middleware(raise_error())
+        assert reporter.drain() == 0
+        assert len(mail.outbox) == 0
+
+    def test_fingerprint_depends_on_type_and_frame(self):
+        assert exception_fingerprint(raise_error()) == exception_fingerprint(raise_error(message="other"))
+        assert exception_fingerprint(raise_error()) != exception_fingerprint(raise_error(KeyError))
+        try:
+            raise ValueError("elsewhere")
+        except ValueError as e:
+            assert exception_fingerprint(e) != exception_fingerprint(raise_error())
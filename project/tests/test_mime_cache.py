@@ -0,0 +1,92 @@
+"""Tests for comms.services.mime_cache — per-process LRU of prepared MIME parts."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.core import mail
+
+from comms.services.email_service import EmailService
+from comms.services.mime_cache import MimeCache, mime_cache
+
+LOGO = os.path.join(settings.BASE_DIR, EmailService.LOGO_PATH)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    mime_cache.clear()
+    mail.outbox.clear()
+
+
+def write(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+class TestMimeCache:
+    def test_second_read_served_from_memory(self, tmp_path):
+        cache = MimeCache(max_bytes=1000)
+        path = write(tmp_path, "a.pdf", 10)
+        first = cache.attachment(path)
+        with patch("builtins.open") as opened:
+            second = cache.attachment(path)
+        opened.assert_not_called()
+        assert first == second == ("a.pdf", b"x" * 10, "application/pdf")
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_modified_file_reread(self, tmp_path):
+        cache = MimeCache(max_bytes=1000)
+        path = write(tmp_path, "a.pdf", 10)
+        cache.attachment(path)
+        with open(path, "wb") as f:
+            f.write(b"y" * 12)
+        assert cache.attachment(path)[1] == b"y" * 12
+        assert cache.stats()["misses"] == 2
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        cache = MimeCache(max_bytes=25)
+        a, b, c = (write(tmp_path, name, 10) for name in ("a.pdf", "b.pdf", "c.pdf"))
+        cache.attachment(a)
+        cache.attachment(b)
+        cache.attachment(a)  # b pasa a ser el menos usado
+        cache.attachment(c)
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 20
+        cache.attachment(a)
+        assert cache.stats()["hits"] == 2
+
+    def test_inline_image_copies_are_independent(self):
+        cache = MimeCache(max_bytes=10**7)
+        first = cache.inline_image("logo", LOGO)
+        second = cache.inline_image("logo", LOGO)
+        assert first is not second
+        assert first["Content-ID"] == "<logo>"
+        assert first.get_payload() == second.get_payload()
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            MimeCache().attachment(str(tmp_path / "missing.pdf"))
+
+
+@pytest.mark.django_db
+class TestSendEmailUsesCache:
+    def test_logo_read_once_per_process(self):
+        svc = EmailService()
+        for _ in range(3):
+            svc.send_email(
+                template_name="happy_birthday",
+                recipients="test@example.com",
+                subject="Test",
+                context={"name": "Ana"},
+                inline_images={"logo": LOGO},
+            )
+        assert len(mail.outbox) == 3
+        assert mime_cache.stats()["misses"] == 1
+        assert mime_cache.stats()["hits"] == 2
+        message = mail.outbox[2].message()
+        assert any(part["Content-ID"] == "<logo>" for part in message.walk())
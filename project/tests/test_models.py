@@ -4,7 +4,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 import pytest
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 
 from billing.models import (
     Enrollment,
@@ -14,6 +14,7 @@ from billing.models import (
     academic_year_start_date,
     current_academic_year,
 )
+from core.history_buffer import HistoryBuffer, history_buffer
 from core.models import (
     FunFridayAttendance,
     HistoryLog,
@@ -100,9 +101,111 @@ class TestStudent:
         assert student_with_parent in parent.children.all()
 
 
+class TestStudentBirthdays:
+    @pytest.fixture
+    def make_student(self, group):
+        def make(first_name, birth_date, active=True):
+            return Student.objects.create(
+                first_name=first_name, last_name="Test", birth_date=birth_date, group=group, active=active
+            )
+
+        return make
+
+    def test_birth_mmdd_kept_by_save(self, make_student):
+        student = make_student("Ana", date(2015, 3, 14))
+        assert student.birth_mmdd == 314
+        student.birth_date = "2015-12-01"  # as assigned from request.POST
+        student.save(update_fields=["birth_date"])
+        student.refresh_from_db()
+        assert student.birth_mmdd == 1201
+
+    def test_birthdays_on(self, make_student):
+        make_student("Today", date(2016, 6, 10))
+        make_student("Tomorrow", date(2016, 6, 11))
+        make_student("Inactive", date(2017, 6, 10), active=False)
+        names = Student.objects.filter(active=True).birthdays_on(date(2026, 6, 10)).values_list("first_name", flat=True)
+        assert list(names) == ["Today"]
+
+    def test_birthdays_in_month_ordered_by_day(self, make_student):
+        make_student("Late", date(2014, 2, 28))
+        make_student("Early", date(2016, 2, 1))
+        make_student("March", date(2016, 3, 1))
+        names = Student.objects.birthdays_in_month(2).values_list("first_name", flat=True)
+        assert list(names) == ["Early", "Late"]
+
+    def test_upcoming_birthdays_within_year(self, make_student):
+        make_student("In range", date(2015, 6, 20))
+        make_student("Start", date(2015, 6, 10))
+        make_student("Too late", date(2015, 7, 1))
+        names = Student.objects.upcoming_birthdays(14, start=date(2026, 6, 10)).values_list("first_name", flat=True)
+        assert list(names) == ["Start", "In range"]
+
+    def test_upcoming_birthdays_wrap_around_new_year(self, make_student):
+        make_student("January", date(2015, 1, 3))
+        make_student("December", date(2015, 12, 30))
+        make_student("Before", date(2015, 12, 20))
+        make_student("After", date(2015, 1, 10))
+        names = Student.objects.upcoming_birthdays(7, start=date(2026, 12, 28)).values_list("first_name", flat=True)
+        assert list(names) == ["December", "January"]
+
+    def test_upcoming_birthdays_full_year(self, make_student):
+        make_student("A", date(2015, 1, 3))
+        make_student("B", date(2015, 12, 30))
+        assert Student.objects.upcoming_birthdays(365, start=date(2026, 6, 1)).count() == 2
+
+
 # ── Parent ───────────────────────────────────────────────────────────────────
 
 
+class TestStudentAge:
+    @pytest.fixture
+    def make_student(self, group):
+        def make(first_name, birth_date):
+            return Student.objects.create(first_name=first_name, last_name="Test", birth_date=birth_date, group=group)
+
+        return make
+
+    @pytest.mark.parametrize(
+        "birth_date,on,age",
+        [
+            (date(2016, 6, 10), date(2026, 6, 9), 9),
+            (date(2016, 6, 10), date(2026, 6, 10), 10),
+            (date(2016, 2, 29), date(2025, 2, 28), 8),
+            (date(2016, 2, 29), date(2025, 3, 1), 9),
+            (date(2016, 12, 31), date(2027, 1, 1), 10),
+        ],
+    )
+    def test_with_age_in_sql(self, make_student, birth_date, on, age):
+        make_student("Kid", birth_date)
+        assert Student.objects.with_age(on).values_list("age", flat=True).get() == age
+
+    def test_annotation_overrides_property(self, make_student):
+        make_student("Kid", date(2016, 6, 10))
+        student = Student.objects.with_age(date(2030, 1, 1)).get()
+        assert student.age == 13
+        assert Student.objects.get().age == Student.objects.with_age().get().age
+
+    def test_age_between_matches_sql_age(self, make_student):
+        on = date(2026, 4, 10)
+        for i, birth_date in enumerate(
+            [date(2021, 4, 10), date(2021, 4, 11), date(2019, 1, 1), date(2016, 4, 11), date(2016, 4, 10)]
+        ):
+            make_student(f"S{i}", birth_date)
+        selected = set(Student.objects.age_between(5, 9, on).values_list("first_name", flat=True))
+        expected = set(Student.objects.with_age(on).filter(age__gte=5, age__lte=9).values_list("first_name", flat=True))
+        assert selected == expected == {"S0", "S2", "S3"}
+        assert set(Student.objects.age_between(min_age=10, on=on).values_list("first_name", flat=True)) == {"S4"}
+
+    def test_order_by_age(self, make_student):
+        make_student("Old", date(2012, 1, 1))
+        make_student("Young", date(2019, 1, 1))
+        assert list(Student.objects.order_by_age().values_list("first_name", flat=True)) == ["Young", "Old"]
+        assert list(Student.objects.with_age().order_by("-age").values_list("first_name", flat=True)) == [
+            "Old",
+            "Young",
+        ]
+
+
 class TestParent:
     def test_full_name(self, parent):
         assert parent.full_name == "María López"
@@ -250,10 +353,35 @@ class TestHistoryLog:
         assert entry.message == "Test message"
 
     def test_log_respects_max_entries(self, db):
-        for i in range(1005):
-            HistoryLog.objects.create(action="payment_completed", message=f"Entry {i}")
-        HistoryLog.log("payment_completed", "Trigger cleanup")
-        assert HistoryLog.objects.count() <= HistoryLog.MAX_ENTRIES
+        HistoryLog.objects.bulk_create(
+            HistoryLog(action="payment_completed", message=f"Entry {i}") for i in range(HistoryLog.MAX_ENTRIES)
+        )
+        for i in range(HistoryLog.PRUNE_EVERY):
+            HistoryLog.log("payment_completed", f"Extra {i}")
+        assert HistoryLog.objects.count() <= HistoryLog.MAX_ENTRIES + HistoryLog.PRUNE_EVERY
+        assert HistoryLog.objects.filter(message=f"Extra {HistoryLog.PRUNE_EVERY - 1}").exists()
+
+    def test_log_is_a_single_insert_between_prunes(self, db, django_assert_num_queries):
+        entry = HistoryLog.log("payment_completed", "First")
+        if (entry.pk + 1) % HistoryLog.PRUNE_EVERY == 0:
+            HistoryLog.log("payment_completed", "Skip the pruning id")
+        with django_assert_num_queries(1):
+            HistoryLog.log("payment_completed", "Second")
+
+    def test_prune_keeps_newest_entries(self, db):
+        HistoryLog.objects.bulk_create(
+            HistoryLog(action="payment_completed", message=f"Entry {i}") for i in range(HistoryLog.MAX_ENTRIES + 5)
+        )
+        assert HistoryLog.prune() == 5
+        assert HistoryLog.objects.count() == HistoryLog.MAX_ENTRIES
+        assert not HistoryLog.objects.filter(message="Entry 4").exists()
+        assert HistoryLog.objects.filter(message="Entry 5").exists()
+
+    def test_log_many_single_insert(self, db, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            entries = HistoryLog.log_many([("email_sent", "A"), ("email_sent", "B")], icon="mail")
+        assert len(entries) == 2
+        assert set(HistoryLog.objects.values_list("message", "icon")) == {("A", "mail"), ("B", "mail")}
 
     def test_log_debounced_skips_recent(self, db):
         first = HistoryLog.log_debounced("config_updated", "First", minutes=5)
@@ -262,6 +390,44 @@ class TestHistoryLog:
         assert second is None
 
 
+class TestHistoryBuffer:
+    def test_entries_written_in_one_insert_at_the_end(self, db, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with history_buffer():
+                HistoryLog.log("payment_created", "A")
+                HistoryLog.log("email_sent", "B", icon="mail")
+                assert not HistoryLog.objects.exists()
+        assert set(HistoryLog.objects.values_list("message", flat=True)) == {"A", "B"}
+
+    def test_flush_is_a_single_query(self, db, django_assert_num_queries):
+        buffer = HistoryBuffer()
+        buffer.committed = [HistoryLog(action="email_sent", message=str(i)) for i in range(3)]
+        with django_assert_num_queries(1):
+            buffer.flush()
+        assert HistoryLog.objects.count() == 3
+
+    def test_rolled_back_entries_discarded(self, db, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with history_buffer():
+                HistoryLog.log("payment_created", "Kept")
+                with pytest.raises(RuntimeError), transaction.atomic():
+                    HistoryLog.log("payment_created", "Rolled back")
+                    raise RuntimeError
+        assert list(HistoryLog.objects.values_list("message", flat=True)) == ["Kept"]
+
+    def test_debounce_checked_once_per_request(self, db, django_assert_num_queries):
+        with history_buffer():
+            with django_assert_num_queries(1):
+                first = HistoryLog.log_debounced("schedule_updated", "First")
+                second = HistoryLog.log_debounced("schedule_updated", "Second")
+        assert first is not None
+        assert second is None
+
+    def test_without_buffer_writes_immediately(self, db):
+        entry = HistoryLog.log("payment_created", "Direct")
+        assert entry.pk is not None
+
+
 # ── FunFridayAttendance ──────────────────────────────────────────────────────
 
 
@@ -0,0 +1,90 @@
+"""Tests for core.pagination: cached and estimated row counts."""
+
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from billing.models import Payment
+from core.pagination import EstimatedCountPaginator, count_version, estimated_count
+from students.models import Student
+
+
+@pytest.fixture
+def shared_cache():
+    """Treat the test LocMem cache as the shared (Redis) cache of production."""
+    with patch("core.pagination.cache_is_shared", return_value=True):
+        yield
+
+
+@pytest.mark.django_db
+class TestPerProcessCache:
+    def test_counts_are_exact_without_shared_cache(self, student, inactive_student):
+        assert estimated_count(Student.objects.all()) == 2
+        Student.objects.filter(id=inactive_student.id).delete()
+        assert estimated_count(Student.objects.all()) == 1
+        Student.objects.filter(id=student.id).update(active=False)  # no signal
+        assert estimated_count(Student.objects.filter(active=True)) == 0
+
+    def test_postgres_estimate_still_used(self, settings, student):
+        settings.EXACT_COUNT_THRESHOLD = 1000
+        with patch("core.pagination.postgres_estimate", return_value=250000):
+            assert estimated_count(Student.objects.all()) == 250000
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("shared_cache")
+class TestEstimatedCount:
+    def test_unfiltered_count_is_cached(self, pending_payment):
+        assert estimated_count(Payment.objects.all()) == 1
+        with CaptureQueriesContext(connection) as queries:
+            assert estimated_count(Payment.objects.order_by("-created_at")) == 1
+        assert len(queries) == 0
+
+    def test_save_and_delete_invalidate_cached_count(self, pending_payment, completed_payment):
+        assert estimated_count(Payment.objects.all()) == 2
+        version = count_version(Payment)
+        pending_payment.delete()
+        assert count_version(Payment) != version
+        assert estimated_count(Payment.objects.all()) == 1
+
+    def test_other_tables_keep_their_version(self, student, pending_payment):
+        version = count_version(Student)
+        pending_payment.save()
+        assert count_version(Student) == version
+
+    def test_filtered_small_table_counts_exactly(self, student, inactive_student):
+        assert estimated_count(Student.objects.filter(active=True)) == 1
+        Student.objects.filter(id=inactive_student.id).update(active=True)  # no signal
+        assert estimated_count(Student.objects.filter(active=True)) == 2
+
+    def test_filtered_large_table_uses_cached_count(self, settings, student, inactive_student):
+        settings.EXACT_COUNT_THRESHOLD = 1
+        assert estimated_count(Student.objects.filter(active=True)) == 1
+        Student.objects.filter(id=inactive_student.id).update(active=True)  # no signal
+        assert estimated_count(Student.objects.filter(active=True)) == 1
+        inactive_student.refresh_from_db()
+        inactive_student.save()
+        assert estimated_count(Student.objects.filter(active=True)) == 2
+
+    def test_postgres_estimate_for_large_unfiltered_table(self, settings, pending_payment):
+        settings.EXACT_COUNT_THRESHOLD = 1000
+        with patch("core.pagination.postgres_estimate", return_value=250000):
+            assert estimated_count(Payment.objects.all()) == 250000
+            assert estimated_count(Payment.objects.filter(payment_status="pending")) == 1
+        with patch("core.pagination.postgres_estimate", return_value=10):
+            assert estimated_count(Payment.objects.all()) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("shared_cache")
+class TestEstimatedCountPaginator:
+    def test_pages_from_cached_count(self, student, inactive_student):
+        paginator = EstimatedCountPaginator(Student.objects.order_by("id"), 1)
+        assert paginator.count == 2
+        assert paginator.num_pages == 2
+        assert list(paginator.get_page(2)) == [inactive_student]
+
+    def test_lists_count_normally(self):
+        assert EstimatedCountPaginator([1, 2, 3], 2).num_pages == 2
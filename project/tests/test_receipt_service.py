@@ -0,0 +1,230 @@
+"""Tests for comms.services.receipt_service — per-family quarterly receipt PDFs."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from billing.models import Payment
+from comms.services.receipt_service import (
+    load_quarterly_receipts,
+    quarter_period,
+    receipt_dir,
+    run_quarterly_receipt_pipeline,
+)
+from students.models import Student, StudentParent
+
+pytestmark = pytest.mark.django_db
+
+QUARTER = ["octubre", "noviembre", "diciembre"]
+ON = date(2025, 12, 15)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture(autouse=True)
+def clear_outbox():
+    mail.outbox.clear()
+
+
+def make_payment(student, parent, due_date, amount="54.00", status="completed"):
+    return Payment.objects.create(
+        student=student,
+        parent=parent,
+        payment_type="monthly",
+        amount=Decimal(amount),
+        payment_status=status,
+        due_date=due_date,
+        payment_date=due_date if status == "completed" else None,
+        concept=f"Mensualidad {due_date:%m/%Y}",
+    )
+
+
+@pytest.fixture
+def family(student_with_parent, parent, group):
+    sibling = Student.objects.create(
+        first_name="Sara", last_name="López García", birth_date=date(2016, 2, 20), group=group, active=True
+    )
+    StudentParent.objects.create(student=sibling, parent=parent)
+    make_payment(student_with_parent, parent, date(2025, 10, 1))
+    make_payment(student_with_parent, parent, date(2025, 11, 1))
+    make_payment(sibling, parent, date(2025, 10, 1), amount="36.00")
+    # Fuera del recibo: otro trimestre y pendiente
+    make_payment(student_with_parent, parent, date(2025, 9, 1))
+    make_payment(student_with_parent, parent, date(2025, 12, 1), status="pending")
+    return sibling
+
+
+class TestQuarterPeriod:
+    def test_current_year(self):
+        assert quarter_period(QUARTER, on=ON) == (date(2025, 10, 1), date(2025, 12, 31))
+
+    def test_quarter_started_last_year(self):
+        assert quarter_period(QUARTER, on=date(2026, 1, 10)) == (date(2025, 10, 1), date(2025, 12, 31))
+
+    def test_wraps_year(self):
+        assert quarter_period(["noviembre", "diciembre", "enero"], on=ON) == (date(2025, 11, 1), date(2026, 1, 31))
+
+
+class TestLoadQuarterlyReceipts:
+    def test_one_receipt_per_family_in_one_query(self, family, parent):
+        with CaptureQueriesContext(connection) as ctx:
+            receipts = load_quarterly_receipts(QUARTER, on=ON)
+        assert len(ctx.captured_queries) == 1
+        assert len(receipts) == 1
+        receipt = receipts[0]
+        assert receipt.parent_id == parent.id
+        assert [s.name for s in receipt.students] == ["Lucas López García", "Sara López García"]
+        assert receipt.total == Decimal("144.00")
+        assert receipt.student_names == "Lucas López García y Sara López García"
+
+    def test_adult_payments_excluded(self, adult_student, parent):
+        make_payment(adult_student, parent, date(2025, 10, 1))
+        assert load_quarterly_receipts(QUARTER, on=ON) == []
+
+
+class TestRunQuarterlyReceiptPipeline:
+    def test_one_email_per_family_with_pdf(self, family, parent):
+        results = run_quarterly_receipt_pipeline(QUARTER, on=ON)
+        assert results == {"sent": 1, "failed": 0, "skipped": 0}
+        assert len(mail.outbox) == 1
+        message = mail.outbox[0]
+        assert message.to == [parent.email]
+        assert "Lucas López García y Sara López García" in message.subject
+        filename, _, _ = message.attachments[0]
+        assert filename.startswith("recibo_202510_202512_12345678A.")
+
+    def test_resend_served_from_store(self, family):
+        run_quarterly_receipt_pipeline(QUARTER, on=ON)
+        with patch("comms.services.receipt_service.render_documents") as render:
+            results = run_quarterly_receipt_pipeline(QUARTER, on=ON)
+        render.assert_not_called()
+        assert results["sent"] == 1
+        assert len(mail.outbox) == 2
+
+    def test_parent_without_email_skipped(self, family, parent):
+        parent.email = ""
+        parent.save()
+        assert run_quarterly_receipt_pipeline(QUARTER, on=ON) == {"sent": 0, "failed": 0, "skipped": 1}
+
+
+class TestSendQuarterlyReceiptsCommand:
+    def test_renders_in_process_pool(self, family, parent):
+        out = StringIO()
+        call_command(
+            "send_quarterly_receipts",
+            *QUARTER,
+            "--on",
+            "2025-12-15",
+            "--workers",
+            "2",
+            "--progress-every",
+            "1",
+            stdout=out,
+        )
+        output = out.getvalue()
+        assert "con 2 proceso(s) de render" in output
+        assert "Renderizados 1/1" in output
+        assert "1 enviados, 0 omitidos, 0 fallidos" in output
+        assert mail.outbox[0].to == [parent.email]
+        assert mail.outbox[0].attachments[0][0].startswith("recibo_202510_202512_12345678A.")
+
+    def test_workers_default_to_one_per_core(self, family):
+        with patch("comms.management.commands.send_quarterly_receipts.default_workers", return_value=3):
+            with patch(
+                "comms.management.commands.send_quarterly_receipts.run_quarterly_receipt_pipeline",
+                return_value={"sent": 0, "failed": 0, "skipped": 0},
+            ) as run:
+                call_command("send_quarterly_receipts", *QUARTER, stdout=StringIO())
+        assert run.call_args.kwargs["workers"] == 3
+
+    def test_dry_run_sends_nothing(self, family):
+        out = StringIO()
+        call_command("send_quarterly_receipts", *QUARTER, "--on", "2025-12-15", "--dry-run", stdout=out)
+        assert "1 familia(s) con pagos, 1 con email" in out.getvalue()
+        assert len(mail.outbox) == 0
+
+    def test_rejects_invalid_arguments(self):
+        with pytest.raises(CommandError, match="Mes no válido"):
+            call_command("send_quarterly_receipts", "octubre", "brumario", "diciembre")
+        with pytest.raises(CommandError, match="--workers"):
+            call_command("send_quarterly_receipts", *QUARTER, "--workers", "0")
+
+
+class TestReceiptViews:
+    def test_receipts_form_sends_one_email_per_family(self, authenticated_client, family):
+        with patch("core.views.app_forms.run_quarterly_receipt_pipeline", wraps=run_quarterly_receipt_pipeline) as run:
+            response = authenticated_client.post(
+                reverse("receipts_form"),
+                {
+                    "receipt_type": "quarterly_child",
+                    "month_1": "octubre",
+                    "month_2": "noviembre",
+                    "month_3": "diciembre",
+                },
+            )
+        assert response.status_code == 302
+        run.assert_called_once_with(QUARTER)
+
+    def test_receipts_form_rejects_unknown_month(self, authenticated_client, family):
+        with patch("core.views.app_forms.run_quarterly_receipt_pipeline") as run:
+            response = authenticated_client.post(
+                reverse("receipts_form"),
+                {"receipt_type": "quarterly_child", "month_1": "octubre", "month_2": "noviembre", "month_3": "dic"},
+                follow=True,
+            )
+        assert response.status_code == 200
+        assert "Mes no válido: dic" in response.content.decode()
+        run.assert_not_called()
+
+    def test_receipts_form_normalizes_month_case(self, authenticated_client, family):
+        with patch("core.views.app_forms.run_quarterly_receipt_pipeline", return_value={"sent": 1, "failed": 0}) as run:
+            authenticated_client.post(
+                reverse("receipts_form"),
+                {
+                    "receipt_type": "quarterly_child",
+                    "month_1": "Octubre",
+                    "month_2": "NOVIEMBRE",
+                    "month_3": " diciembre",
+                },
+            )
+        run.assert_called_once_with(QUARTER)
+
+    def test_download_receipt(self, authenticated_client, family, parent):
+        url = reverse("download_quarterly_receipt", args=[parent.id, 2025, 10])
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        assert "recibo_202510_202512_12345678A" in response["Content-Disposition"]
+
+        with patch("comms.services.receipt_service.render_documents") as render:
+            assert authenticated_client.get(url).status_code == 200
+        render.assert_not_called()
+
+    def test_payment_change_purges_stored_receipt(self, authenticated_client, family, parent):
+        authenticated_client.get(reverse("download_quarterly_receipt", args=[parent.id, 2025, 10]))
+        directory = receipt_dir(parent.id, date(2025, 10, 1))
+        assert len(default_storage.listdir(directory)[1]) == 1
+
+        payment = Payment.objects.get(parent=parent, due_date=date(2025, 11, 1))
+        payment.observations = "Sin cambios en el recibo"
+        payment.save()
+        assert len(default_storage.listdir(directory)[1]) == 1
+
+        payment.amount = Decimal("60.00")
+        payment.save()
+        assert default_storage.listdir(directory)[1] == []
+
+    def test_download_without_payments_404(self, authenticated_client, parent):
+        url = reverse("download_quarterly_receipt", args=[parent.id, 2025, 10])
+        assert authenticated_client.get(url).status_code == 404
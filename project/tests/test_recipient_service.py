@@ -0,0 +1,145 @@
+"""Tests for comms.services.recipient_service — campaign audience resolution."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from billing.models import Payment
+from comms.services.recipient_service import (
+    AUDIENCE_AGE_RANGE,
+    AUDIENCE_ALL,
+    AUDIENCE_BIRTHDAY_TODAY,
+    AUDIENCE_GROUP,
+    AUDIENCE_PENDING_PAYMENTS,
+    count_recipients,
+    recipient_emails,
+    resolve_recipients,
+)
+from students.models import Group, Student, StudentParent
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sibling(db, group, parent):
+    sibling = Student.objects.create(
+        first_name="Sara",
+        last_name="López García",
+        birth_date=date(2016, 2, 20),
+        gdpr_signed=True,
+        group=group,
+        active=True,
+    )
+    StudentParent.objects.create(student=sibling, parent=parent)
+    return sibling
+
+
+@pytest.fixture
+def other_group(db, teacher):
+    return Group.objects.create(group_name="Group B", teacher=teacher, active=True)
+
+
+class TestResolveRecipients:
+    def test_family_grouped_into_one_recipient(self, student_with_parent, sibling, parent):
+        recipients = resolve_recipients(AUDIENCE_ALL)
+        assert len(recipients) == 1
+        recipient = recipients[0]
+        assert recipient.email == parent.email
+        assert recipient.name == parent.full_name
+        assert {s.id for s in recipient.students} == {student_with_parent.id, sibling.id}
+        assert recipient.group_ids == [student_with_parent.group_id]
+        assert recipient.is_adult is False
+
+    def test_single_query(self, student_with_parent, sibling, second_parent):
+        StudentParent.objects.create(student=sibling, parent=second_parent)
+        with CaptureQueriesContext(connection) as ctx:
+            recipients = resolve_recipients(AUDIENCE_ALL)
+        assert len(ctx.captured_queries) == 1
+        assert len(recipients) == 2
+
+    def test_skips_inactive_students_and_missing_emails(self, inactive_student, parent, second_parent, student):
+        StudentParent.objects.create(student=inactive_student, parent=parent)
+        second_parent.email = ""
+        second_parent.save()
+        StudentParent.objects.create(student=student, parent=second_parent)
+        assert resolve_recipients(AUDIENCE_ALL) == []
+
+    def test_adults_excluded_by_default(self, adult_student):
+        assert resolve_recipients(AUDIENCE_ALL) == []
+
+    def test_adults_use_own_email(self, adult_student):
+        recipients = resolve_recipients(AUDIENCE_ALL, is_adult=True)
+        assert len(recipients) == 1
+        assert recipients[0].email == adult_student.email
+        assert recipients[0].name == adult_student.full_name
+        assert recipients[0].is_adult is True
+
+    def test_group_audience(self, student_with_parent, other_group, second_parent):
+        other = Student.objects.create(
+            first_name="Otro", last_name="Grupo", birth_date=date(2017, 1, 1), group=other_group, active=True
+        )
+        StudentParent.objects.create(student=other, parent=second_parent)
+        recipients = resolve_recipients(AUDIENCE_GROUP, group_ids=[other_group.id])
+        assert [r.email for r in recipients] == [second_parent.email]
+
+    def test_age_range_audience(self, student_with_parent, sibling, parent):
+        # Lucas (2018-05-15) is 7, Sara (2016-02-20) is 10 on 2026-01-10
+        recipients = resolve_recipients(AUDIENCE_AGE_RANGE, min_age=6, max_age=8, on=date(2026, 1, 10))
+        assert [s.first_name for s in recipients[0].students] == ["Lucas"]
+
+    def test_birthday_today_audience(self, student_with_parent):
+        recipients = resolve_recipients(AUDIENCE_BIRTHDAY_TODAY, on=date(2026, 5, 15))
+        assert [s.id for s in recipients[0].students] == [student_with_parent.id]
+        assert resolve_recipients(AUDIENCE_BIRTHDAY_TODAY, on=date(2026, 5, 16)) == []
+
+    def test_pending_payments_audience(self, student_with_parent, sibling, parent, pending_payment):
+        recipients = resolve_recipients(AUDIENCE_PENDING_PAYMENTS)
+        assert [s.id for s in recipients[0].students] == [student_with_parent.id]
+
+    def test_pending_payments_due_window(self, student_with_parent, pending_payment):
+        assert resolve_recipients(AUDIENCE_PENDING_PAYMENTS, due_date_from=date(2025, 11, 1)) == []
+
+    def test_completed_payments_not_pending(self, student_with_parent, completed_payment):
+        Payment.objects.filter(id=completed_payment.id).update(amount=Decimal("10.00"))
+        assert resolve_recipients(AUDIENCE_PENDING_PAYMENTS) == []
+
+    def test_unknown_audience_raises(self):
+        with pytest.raises(ValueError):
+            resolve_recipients("everyone")
+
+
+class TestCountRecipients:
+    def test_counts_distinct_emails(self, student_with_parent, sibling, second_parent):
+        StudentParent.objects.create(student=sibling, parent=second_parent)
+        assert count_recipients(AUDIENCE_ALL) == 2
+
+    def test_same_email_counted_once(self, student_with_parent, sibling, second_parent, parent):
+        second_parent.email = parent.email.upper()
+        second_parent.save()
+        StudentParent.objects.create(student=sibling, parent=second_parent)
+        assert count_recipients(AUDIENCE_ALL) == 1
+        assert len(resolve_recipients(AUDIENCE_ALL)) == 1
+
+
+class TestRecipientEmails:
+    def test_distinct_emails_in_one_query(self, student_with_parent, sibling, second_parent, parent):
+        second_parent.email = parent.email.upper()
+        second_parent.save()
+        StudentParent.objects.create(student=sibling, parent=second_parent)
+        with CaptureQueriesContext(connection) as queries:
+            emails = recipient_emails(AUDIENCE_ALL)
+        assert emails == [parent.email.lower()]
+        assert len(queries) == 1
+        assert "DISTINCT" in queries[0]["sql"]
+
+    def test_age_range_filters_on_birth_date(self, student_with_parent, sibling, parent, second_parent):
+        StudentParent.objects.create(student=sibling, parent=second_parent)
+        # Lucas (2018-05-15) is 7 and Sara (2016-02-20) is 10 on 2026-01-10
+        with CaptureQueriesContext(connection) as queries:
+            emails = recipient_emails(AUDIENCE_AGE_RANGE, min_age=9, max_age=11, on=date(2026, 1, 10))
+        assert emails == sorted([parent.email.lower(), second_parent.email.lower()])
+        assert '"birth_date" >' in queries[0]["sql"] or "birth_date` >" in queries[0]["sql"]
+        assert recipient_emails(AUDIENCE_AGE_RANGE, min_age=3, max_age=4, on=date(2026, 1, 10)) == []
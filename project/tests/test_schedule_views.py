@@ -3,9 +3,12 @@
 import json
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from core.models import ScheduleSlot
+from core.schedule_cache import schedule_version
 
 pytestmark = pytest.mark.django_db
 
@@ -28,6 +31,68 @@ class TestScheduleView:
         slots = json.loads(response.context["slots_json"])
         assert len(slots) == 1
         assert slots[0]["group_id"] == group.id
+        assert (slots[0]["start"], slots[0]["end"]) == ("16:10", "17:30")
+
+
+class TestScheduleConditionalGet:
+    def test_etag_and_304_when_unchanged(self, authenticated_client, group):
+        response = authenticated_client.get(reverse("schedule_view"))
+        etag = response["ETag"]
+        assert response["Last-Modified"]
+        assert "no-cache" in response["Cache-Control"]
+
+        response = authenticated_client.get(reverse("schedule_view"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_slot_change_invalidates_etag(self, authenticated_client, group):
+        etag = authenticated_client.get(reverse("schedule_view"))["ETag"]
+        ScheduleSlot.objects.create(row=1, day=4, col=0, group=group)
+
+        response = authenticated_client.get(reverse("schedule_view"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        slots = json.loads(response.context["slots_json"])
+        assert (slots[0]["start"], slots[0]["end"]) == ("16:00", "17:20")
+
+    def test_group_teacher_and_student_changes_bump_version(self, group, student):
+        for obj in (group, group.teacher, student):
+            version = schedule_version()
+            obj.save()
+            assert schedule_version() != version
+        version = schedule_version()
+        student.delete()
+        assert schedule_version() != version
+
+    def test_payload_cached_under_version(self, authenticated_client, group, student):
+        authenticated_client.get(reverse("schedule_view"))
+        with CaptureQueriesContext(connection) as cached:
+            response = authenticated_client.get(reverse("schedule_view"))
+        assert json.loads(response.context["groups_json"])[0]["students"] == [student.first_name]
+        # Only the version query touches the schedule tables
+        assert not any('"group_name"' in q["sql"] or '"col"' in q["sql"] for q in cached.captured_queries)
+
+    def test_version_is_read_from_database(self, group):
+        from django.core.cache import cache
+
+        version = schedule_version()
+        cache.clear()  # another worker's cache knows nothing about this one
+        assert schedule_version() == version
+        ScheduleSlot.objects.bulk_create([ScheduleSlot(row=0, day=0, col=0, group=group)])  # no signals
+        assert schedule_version() != version
+
+    def test_navbar_and_csrf_change_etag(self, authenticated_client, group):
+        from datetime import date
+
+        from core.models import TodoItem
+
+        etag = authenticated_client.get(reverse("schedule_view"))["ETag"]
+        TodoItem.objects.create(text="Llamar", due_date=date.today())
+        response = authenticated_client.get(reverse("schedule_view"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response["ETag"]
+        authenticated_client.cookies["csrftoken"] = "rotated"
+        assert authenticated_client.get(reverse("schedule_view"), HTTP_IF_NONE_MATCH=etag).status_code == 200
 
 
 class TestSaveScheduleSlot:
@@ -57,6 +122,100 @@ class TestSaveScheduleSlot:
         assert response.status_code == 405
 
 
+class TestSaveScheduleGrid:
+    def _save(self, client, slots, version=None):
+        if version is None:  # the version the editor page was loaded with
+            version = client.get(reverse("schedule_view")).context["slots_version"]
+        return client.post(
+            reverse("save_schedule_grid"),
+            data=json.dumps({"version": version, "slots": slots}),
+            content_type="application/json",
+        )
+
+    def test_diffs_and_applies_grid(self, authenticated_client, group, teacher, django_capture_on_commit_callbacks):
+        from core.models import HistoryLog
+        from students.models import Group
+
+        other = Group.objects.create(group_name="Group B", teacher=teacher)
+        ScheduleSlot.objects.create(row=0, day=0, col=0, group=group)  # unchanged
+        ScheduleSlot.objects.create(row=0, day=1, col=0, group=group)  # reassigned
+        ScheduleSlot.objects.create(row=2, day=3, col=1, group=group)  # cleared
+        HistoryLog.objects.all().delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self._save(
+                authenticated_client,
+                [
+                    {"row": 0, "day": 0, "col": 0, "group_id": group.id},
+                    {"row": 0, "day": 1, "col": 0, "group_id": other.id},
+                    {"row": 1, "day": 2, "col": 1, "group_id": other.id},
+                    {"row": 1, "day": 3, "col": 0, "group_id": None},
+                ],
+            )
+        data = response.json()
+        assert (data["success"], data["updated"], data["deleted"]) == (True, 2, 1)
+        assert set(ScheduleSlot.objects.values_list("row", "day", "col", "group_id")) == {
+            (0, 0, 0, group.id),
+            (0, 1, 0, other.id),
+            (1, 2, 1, other.id),
+        }
+        assert HistoryLog.objects.filter(action="schedule_updated").count() == 1
+
+    def test_unchanged_grid_writes_nothing(self, authenticated_client, group):
+        from core.models import HistoryLog
+
+        ScheduleSlot.objects.create(row=0, day=0, col=0, group=group)
+        HistoryLog.objects.all().delete()
+        response = self._save(authenticated_client, [{"row": 0, "day": 0, "col": 0, "group_id": group.id}])
+        data = response.json()
+        assert (data["success"], data["updated"], data["deleted"]) == (True, 0, 0)
+        assert not HistoryLog.objects.exists()
+
+    def test_stale_version_is_rejected(self, authenticated_client, group):
+        version = authenticated_client.get(reverse("schedule_view")).context["slots_version"]
+        ScheduleSlot.objects.create(row=2, day=0, col=0, group=group)  # saved from another tab
+
+        response = self._save(authenticated_client, [{"row": 0, "day": 0, "col": 0, "group_id": group.id}], version)
+        assert response.status_code == 409
+        assert ScheduleSlot.objects.filter(row=2, day=0, col=0).exists()
+        assert not ScheduleSlot.objects.filter(row=0, day=0, col=0).exists()
+
+        # The returned version lets the next save go through
+        retry = self._save(
+            authenticated_client, [{"row": 0, "day": 0, "col": 0, "group_id": group.id}], response.json()["version"]
+        )
+        assert retry.status_code == 200
+
+    def test_returned_version_matches_next_page_load(self, authenticated_client, group):
+        response = self._save(authenticated_client, [{"row": 1, "day": 1, "col": 1, "group_id": group.id}])
+        assert response.json()["version"] == authenticated_client.get(reverse("schedule_view")).context["slots_version"]
+
+    def test_version_required(self, authenticated_client, group):
+        response = authenticated_client.post(
+            reverse("save_schedule_grid"), data=json.dumps({"slots": []}), content_type="application/json"
+        )
+        assert response.status_code == 400
+
+    def test_changes_schedule_version(self, authenticated_client, group):
+        version = schedule_version()
+        self._save(authenticated_client, [{"row": 0, "day": 0, "col": 0, "group_id": group.id}])
+        assert schedule_version() != version
+
+    @pytest.mark.parametrize(
+        "slots",
+        [
+            [{"row": 3, "day": 0, "col": 0, "group_id": None}],
+            [{"row": 0, "day": 0, "col": 0, "group_id": None}, {"row": 0, "day": 0, "col": 0, "group_id": None}],
+            [{"row": 0, "day": 0, "col": 0, "group_id": 999999}],
+            [{"row": "x", "day": 0, "col": 0}],
+        ],
+    )
+    def test_rejects_invalid_grid(self, authenticated_client, group, slots):
+        ScheduleSlot.objects.create(row=0, day=0, col=0, group=group)
+        assert self._save(authenticated_client, slots).status_code == 400
+        assert ScheduleSlot.objects.count() == 1
+
+
 class TestFunFridayView:
     def test_loads_ok(self, authenticated_client, student):
         response = authenticated_client.get(reverse("fun_friday_view"))
@@ -1,9 +1,11 @@
 """Tests for core.views.students — list, detail, create, update, search."""
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from students.models import Student
+from students.models import Parent, Student
 
 pytestmark = pytest.mark.django_db
 
@@ -29,10 +31,105 @@ class TestStudentListView:
         assert response.status_code == 200
         assert len(response.context["students"]) == 0
 
-    def test_context_has_groups_and_parents(self, authenticated_client, student, active_enrollment):
+    def test_context_has_groups_but_no_parent_list(self, authenticated_client, student, active_enrollment):
         response = authenticated_client.get(reverse("students_list"))
         assert "groups" in response.context
-        assert "parents" in response.context
+        # The parent picker loads from the typeahead endpoint
+        assert "parents" not in response.context
+        assert reverse("typeahead_parents").encode() in response.content
+
+
+class TestStudentListAnnotations:
+    @pytest.fixture
+    def enroll(self, group, parent, enrollment_type_monthly, site_config):
+        from datetime import date
+        from decimal import Decimal
+
+        from billing.models import Enrollment, current_academic_year
+        from students.models import StudentParent
+
+        def make(name, **enrollment):
+            student = Student.objects.create(
+                first_name=name, last_name="Test", birth_date=date(2016, 1, 1), group=group
+            )
+            StudentParent.objects.create(student=student, parent=parent)
+            Enrollment.objects.create(
+                student=student,
+                enrollment_type=enrollment_type_monthly,
+                enrollment_period_start=date(2025, 9, 15),
+                enrollment_period_end=date(2026, 6, 27),
+                academic_year=current_academic_year(),
+                enrollment_amount=Decimal("54.00"),
+                final_amount=Decimal("54.00"),
+                enrollment_date=date(2025, 9, 1),
+                **enrollment,
+            )
+            return student
+
+        return make
+
+    def test_flags_come_from_annotations(self, authenticated_client, enroll):
+        from core.models import FunFridayAttendance
+        from core.views.students import get_last_friday, get_next_friday
+
+        plain = enroll("Plain")
+        cheque = enroll("Cheque", has_language_cheque=True)
+        FunFridayAttendance.objects.create(student=plain, date=get_next_friday())
+        FunFridayAttendance.objects.create(student=cheque, date=get_last_friday())
+
+        response = authenticated_client.get(reverse("students_list"))
+        rows = {s.id: s for s in response.context["students"]}
+        assert (rows[plain.id].ff_this_week, rows[plain.id].ff_last_week) == (True, False)
+        assert (rows[cheque.id].ff_this_week, rows[cheque.id].ff_last_week) == (False, True)
+        assert rows[cheque.id].has_language_cheque and not rows[plain.id].has_language_cheque
+        assert rows[plain.id].enrollment_type_name == "Mensual"
+        assert response.context["language_cheque_count"] == 1
+
+    def test_language_cheque_count_ignores_list_filters(self, authenticated_client, enroll):
+        enroll("Plain")
+        enroll("Cheque", has_language_cheque=True)
+        response = authenticated_client.get(reverse("students_list"), {"search": "Plain"})
+        assert len(response.context["students"]) == 1
+        assert response.context["language_cheque_count"] == 1
+
+    def test_two_enrollments_list_the_student_once(self, authenticated_client, enroll, enrollment_type_monthly):
+        from billing.models import Enrollment
+
+        student = enroll("Twice")
+        enrollment = Enrollment.objects.get(student=student)
+        enrollment.pk = None
+        enrollment.save()
+        response = authenticated_client.get(reverse("students_list"))
+        assert [s.id for s in response.context["students"]] == [student.id]
+        assert "DISTINCT" not in str(response.context["students"].query)
+
+    def test_query_count_does_not_grow_with_rows(self, authenticated_client, enroll):
+        def count():
+            authenticated_client.get(reverse("students_list"))
+            with CaptureQueriesContext(connection) as queries:
+                authenticated_client.get(reverse("students_list"))
+            return len(queries)
+
+        enroll("First")
+        one_row = count()
+        for i in range(10):
+            enroll(f"Kid{i}")
+        assert count() == one_row
+
+    def test_age_filter_and_sort(self, authenticated_client, enroll):
+        from datetime import date
+
+        from students.models import years_before
+
+        young = enroll("Young")
+        old = enroll("Old")
+        Student.objects.filter(id=young.id).update(birth_date=years_before(date.today(), 6))
+        Student.objects.filter(id=old.id).update(birth_date=years_before(date.today(), 11))
+
+        response = authenticated_client.get(reverse("students_list"), {"min_age": 5, "max_age": 8})
+        assert [s.id for s in response.context["students"]] == [young.id]
+        response = authenticated_client.get(reverse("students_list"), {"sort": "-age"})
+        assert [s.id for s in response.context["students"]] == [old.id, young.id]
 
 
 class TestStudentDetailView:
@@ -108,7 +205,54 @@ class TestStudentCreateViewPost:
 
 
 class TestSearchStudents:
-    def test_returns_students_page(self, authenticated_client, student):
-        response = authenticated_client.get(reverse("search_students"))
-        assert response.status_code == 200
-        assert "students" in response.context
+    def test_returns_json_matches(self, authenticated_client, student, inactive_student):
+        response = authenticated_client.get(reverse("search_students"), {"q": student.first_name})
+        assert response.json() == {
+            "results": [{"id": student.id, "full_name": student.full_name, "school": student.school}]
+        }
+
+    def test_short_query_returns_nothing(self, authenticated_client, student):
+        response = authenticated_client.get(reverse("search_students"), {"q": "L"})
+        assert response.json() == {"results": []}
+
+
+class TestTypeahead:
+    @pytest.fixture
+    def many_parents(self, db):
+        return Parent.objects.bulk_create(
+            Parent(first_name=f"Padre{i:02d}", last_name="Ruiz", dni=f"{i:08d}X", phone="600", email=f"p{i}@test.com")
+            for i in range(25)
+        )
+
+    def test_parents_paginated_in_one_query(self, authenticated_client, many_parents):
+        with CaptureQueriesContext(connection) as captured:
+            first = authenticated_client.get(reverse("typeahead_parents")).json()
+        assert len([q for q in captured.captured_queries if '"parents"' in q["sql"]]) == 1
+        assert len(first["results"]) == 20
+        assert first["has_more"] is True
+        assert set(first["results"][0]) == {"id", "label", "secondary"}
+
+        second = authenticated_client.get(reverse("typeahead_parents"), {"page": 2}).json()
+        assert len(second["results"]) == 5
+        assert second["has_more"] is False
+
+    def test_parents_search_matches_every_word(self, authenticated_client, parent, second_parent):
+        data = authenticated_client.get(reverse("typeahead_parents"), {"q": "maría lópez"}).json()
+        assert [r["id"] for r in data["results"]] == [parent.id]
+        assert data["results"][0]["secondary"] == f"{parent.email} • {parent.phone}"
+
+    def test_parents_by_ids(self, authenticated_client, parent, second_parent):
+        data = authenticated_client.get(reverse("typeahead_parents"), {"ids": f"{second_parent.id}"}).json()
+        assert [r["label"] for r in data["results"]] == [second_parent.full_name]
+        assert authenticated_client.get(reverse("typeahead_parents"), {"ids": "x"}).status_code == 400
+
+    def test_students_active_only(self, authenticated_client, student, inactive_student):
+        data = authenticated_client.get(reverse("typeahead_students")).json()
+        assert [r["id"] for r in data["results"]] == [student.id]
+        assert data["results"][0]["secondary"] == student.group.group_name
+        data = authenticated_client.get(reverse("typeahead_students"), {"active": "0"}).json()
+        assert {r["id"] for r in data["results"]} == {student.id, inactive_student.id}
+
+    def test_groups(self, authenticated_client, group):
+        data = authenticated_client.get(reverse("typeahead_groups"), {"q": group.group_name[:3]}).json()
+        assert data["results"] == [{"id": group.id, "label": group.group_name, "secondary": str(group.teacher)}]
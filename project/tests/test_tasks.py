@@ -0,0 +1,83 @@
+"""Tests for comms.tasks — Celery email tasks (run eagerly in tests)."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+
+from comms.tasks import chunked, send_birthday_chunk_task, send_birthday_emails_task
+from students.models import Student, StudentParent
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_outbox():
+    mail.outbox.clear()
+
+
+@pytest.fixture
+def birthday_students(group, parent, second_parent):
+    today = date.today()
+    students = []
+    for i, p in enumerate([parent, parent, second_parent]):
+        s = Student.objects.create(
+            first_name=f"Cumple{i}",
+            last_name="Test",
+            birth_date=date(2018, today.month, today.day) if (today.month, today.day) != (2, 29) else date(2016, 2, 29),
+            group=group,
+            active=True,
+        )
+        StudentParent.objects.create(student=s, parent=p)
+        students.append(s)
+    return students
+
+
+class TestChunked:
+    def test_splits_into_fixed_size_chunks(self):
+        assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+    def test_empty(self):
+        assert chunked([], 3) == []
+
+
+class TestSendBirthdayEmailsTask:
+    def test_no_birthdays(self, student):
+        result = send_birthday_emails_task.apply().get()
+        assert result["birthdays_found"] == 0
+        assert len(mail.outbox) == 0
+
+    def test_sends_one_email_per_student(self, birthday_students):
+        result = send_birthday_emails_task.apply(kwargs={"chunk_size": 2}).get()
+        assert result["birthdays_found"] == 3
+        assert result["chunks_queued"] == 2
+        assert len(mail.outbox) == 3
+        assert sorted(m.to[0] for m in mail.outbox) == ["maria@test.com", "maria@test.com", "pedro@test.com"]
+
+    def test_one_connection_per_chunk(self, birthday_students):
+        with patch("django.core.mail.get_connection", wraps=mail.get_connection) as get_conn:
+            send_birthday_emails_task.apply(kwargs={"chunk_size": 10}).get()
+        assert get_conn.call_count == 1
+
+
+class TestSendBirthdayChunkTask:
+    def test_failed_message_requeued_individually(self):
+        messages = [
+            {"student_id": 1, "first_name": "Ana", "recipient_email": "ok@test.com"},
+            {"student_id": 2, "first_name": "Bea", "recipient_email": "fail@test.com"},
+        ]
+
+        def fake_send(**kwargs):
+            if kwargs["recipients"] == "fail@test.com":
+                raise Exception("SMTP error")
+            return True
+
+        with (
+            patch("comms.services.email_service.email_service.send_email", side_effect=fake_send),
+            patch("comms.tasks.send_birthday_email_task.delay") as retry,
+        ):
+            result = send_birthday_chunk_task.apply(args=[messages]).get()
+
+        assert result == {"status": "success", "sent": 1, "requeued": 1}
+        retry.assert_called_once_with(2, recipient_email="fail@test.com", first_name="Bea")
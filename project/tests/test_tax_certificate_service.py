@@ -0,0 +1,172 @@
+"""Tests for comms.services.tax_certificate_service — annual tax certificate pipeline."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from billing.models import Payment
+from comms.services.pdf_service import STAGE_RENDER, STAGE_SEND
+from comms.services.tax_certificate_service import (
+    load_tax_certificates,
+    render_tax_certificate,
+    render_tax_certificate_batch,
+    render_tax_certificate_html,
+    render_tax_certificates,
+    run_tax_certificate_pipeline,
+)
+from students.models import StudentParent
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_outbox():
+    mail.outbox.clear()
+
+
+def make_payment(student, parent, payment_date, amount="54.00", status="completed", concept="Mensualidad"):
+    return Payment.objects.create(
+        student=student,
+        parent=parent,
+        payment_type="monthly",
+        amount=Decimal(amount),
+        payment_status=status,
+        due_date=payment_date,
+        payment_date=payment_date,
+        concept=concept,
+    )
+
+
+@pytest.fixture
+def year_payments(student_with_parent, parent, second_parent, adult_student):
+    StudentParent.objects.create(student=student_with_parent, parent=second_parent)
+    make_payment(student_with_parent, parent, date(2025, 10, 5), concept="Octubre")
+    make_payment(student_with_parent, parent, date(2025, 9, 5), concept="Septiembre")
+    make_payment(student_with_parent, second_parent, date(2025, 11, 5), amount="40.00")
+    # Fuera del certificado: otro ano, pendiente, sin padre
+    make_payment(student_with_parent, parent, date(2024, 12, 31))
+    make_payment(student_with_parent, parent, date(2025, 12, 1), status="pending")
+    make_payment(adult_student, None, date(2025, 6, 1))
+
+
+class TestLoadTaxCertificates:
+    def test_one_query_for_all_parents(self, year_payments):
+        with CaptureQueriesContext(connection) as ctx:
+            certificates = load_tax_certificates(2025)
+        assert len(ctx.captured_queries) == 1
+        assert [c.parent_name for c in certificates] == ["María López", "Pedro Martín"]
+
+    def test_groups_payments_by_student(self, year_payments, student_with_parent):
+        certificate = load_tax_certificates(2025)[0]
+        assert certificate.year == 2025
+        assert certificate.total == Decimal("108.00")
+        assert len(certificate.students) == 1
+        student = certificate.students[0]
+        assert student.name == student_with_parent.full_name
+        assert [p.concept for p in student.payments] == ["Septiembre", "Octubre"]
+        assert student.payments[0].payment_type == "Monthly Fee"
+
+    def test_filter_by_parent(self, year_payments, second_parent):
+        certificates = load_tax_certificates(2025, parent_ids=[second_parent.id])
+        assert [c.parent_id for c in certificates] == [second_parent.id]
+
+
+class TestRender:
+    def test_html_fallback_contains_payments(self, year_payments):
+        rendered = render_tax_certificate(load_tax_certificates(2025)[0])
+        assert rendered.error == ""
+        assert rendered.mimetype in ("application/pdf", "text/html")
+        if rendered.mimetype == "text/html":
+            assert b"TOTAL PAGADO EN 2025: 108.00 EUR" in rendered.content
+        assert rendered.attachment[0].startswith("certificado_fiscal_2025_12345678A.")
+
+    def test_template_escapes_and_formats(self, year_payments):
+        certificate = load_tax_certificates(2025)[0]
+        student = certificate.students[0]
+        payment = student.payments[0]._replace(concept="Clases <extra> & material")
+        certificate = certificate._replace(students=[student._replace(payments=[payment])])
+        html = render_tax_certificate_html(certificate)
+        assert "Clases &lt;extra&gt; &amp; material" in html
+        assert "05/09/2025" in html
+        assert "54.00 EUR" in html
+        assert "<style>" in html
+        assert "<style>" not in render_tax_certificate_html(certificate, inline_css=False)
+
+    def test_batch_renders_every_certificate(self, year_payments):
+        certificates = load_tax_certificates(2025)
+        rendered = render_tax_certificate_batch(certificates)
+        assert [r.document for r in rendered] == certificates
+        assert all(r.content for r in rendered)
+
+    def test_batch_isolates_failures(self, year_payments):
+        certificates = load_tax_certificates(2025)
+        with patch(
+            "comms.services.pdf_service.render_html",
+            side_effect=[RuntimeError("template error"), "<html></html>"],
+        ):
+            rendered = render_tax_certificate_batch(certificates)
+        assert rendered[0].error == "template error"
+        assert rendered[1].error == ""
+
+    def test_process_pool_keeps_order(self, year_payments):
+        certificates = load_tax_certificates(2025)
+        rendered = list(render_tax_certificates(certificates, workers=2))
+        assert [r.document.parent_id for r in rendered] == [c.parent_id for c in certificates]
+        assert all(r.error == "" for r in rendered)
+
+
+class TestRunPipeline:
+    def test_sends_one_email_per_parent(self, year_payments):
+        progress = []
+        results = run_tax_certificate_pipeline(2025, workers=1, on_progress=lambda *a: progress.append(a))
+        assert results == {"sent": 2, "failed": 0, "skipped": 0}
+        assert sorted(m.to[0] for m in mail.outbox) == ["maria@test.com", "pedro@test.com"]
+        assert len(mail.outbox[0].attachments) == 1
+        assert (STAGE_RENDER, 2, 2) in progress
+        assert (STAGE_SEND, 2, 2) in progress
+
+    def test_parent_without_email_skipped(self, year_payments, second_parent):
+        second_parent.email = ""
+        second_parent.save()
+        results = run_tax_certificate_pipeline(2025, workers=1)
+        assert results["skipped"] == 1
+        assert results["sent"] == 1
+
+    def test_no_payments(self, parent):
+        assert run_tax_certificate_pipeline(2025, workers=1) == {"sent": 0, "failed": 0, "skipped": 0}
+
+
+class TestSendTaxCertificatesCommand:
+    def test_dry_run_sends_nothing(self, year_payments):
+        out = StringIO()
+        call_command("send_tax_certificates", "--year", "2025", "--dry-run", stdout=out)
+        assert "2 padre(s) con pagos, 2 con email" in out.getvalue()
+        assert len(mail.outbox) == 0
+
+    def test_reports_progress_and_results(self, year_payments):
+        out = StringIO()
+        call_command("send_tax_certificates", "--year", "2025", "--workers", "1", "--progress-every", "1", stdout=out)
+        output = out.getvalue()
+        assert "Renderizados 2/2" in output
+        assert "Enviados 2/2" in output
+        assert "2 enviados, 0 omitidos, 0 fallidos" in output
+
+    def test_rejects_zero_workers(self):
+        with pytest.raises(CommandError, match="--workers"):
+            call_command("send_tax_certificates", "--year", "2025", "--workers", "0")
+
+
+class TestBenchmarkCommand:
+    def test_reports_docs_per_second(self):
+        out = StringIO()
+        call_command("benchmark_tax_certificates", "--count", "3", stdout=out)
+        output = out.getvalue()
+        assert output.count("docs/s") == 2
+        assert "Mejora: x" in output
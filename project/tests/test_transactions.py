@@ -1,63 +1,96 @@
 """Tests for core.transactions — queryset helper functions."""
 
+from datetime import date
+from decimal import Decimal
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
+from billing.models import Enrollment, Payment
 from core.transactions import (
-    get_active_students,
-    get_all_payments_unrestricted,
-    get_payments_for_last_two_school_years,
+    all_info_payments,
+    all_info_students,
+    payments_list_payments,
+    school_years_range,
 )
+from students.models import Parent, Student, StudentParent
 
 pytestmark = pytest.mark.django_db
 
 
-class TestGetActiveStudents:
-    def test_returns_active_only(self, student, inactive_student):
-        qs = get_active_students()
-        ids = set(qs.values_list("id", flat=True))
-        assert student.id in ids
-        assert inactive_student.id not in ids
-
-    def test_prefetches_parents(self, student_with_parent):
-        qs = get_active_students()
-        assert qs.get(id=student_with_parent.id).parents.count() == 1
-
-    def test_selects_related_group(self, student):
-        qs = get_active_students()
-        s = qs.get(id=student.id)
-        assert s.group.group_name == "Group A"
-
-    def test_empty_when_no_active_students(self, inactive_student):
-        assert get_active_students().count() == 0
-
-
-class TestGetPaymentsForLastTwoSchoolYears:
-    def test_includes_recent_payments(self, pending_payment):
-        qs = get_payments_for_last_two_school_years()
-        assert qs.filter(id=pending_payment.id).exists()
-
-    def test_selects_related_student(self, pending_payment):
-        qs = get_payments_for_last_two_school_years()
-        payment = qs.get(id=pending_payment.id)
-        assert payment.student.first_name == "Lucas"
-
-    def test_ordered_by_created_at_desc(self, pending_payment, completed_payment):
-        qs = get_payments_for_last_two_school_years()
-        if qs.count() >= 2:
-            ids = list(qs.values_list("id", flat=True))
-            # Most recently created should be first
-            assert ids[0] > ids[-1] or len(ids) == 1
-
-
-class TestGetAllPaymentsUnrestricted:
-    def test_returns_all_payments(self, pending_payment, completed_payment):
-        qs = get_all_payments_unrestricted()
-        assert qs.count() == 2
-
-    def test_ordered_by_created_at_desc(self, pending_payment, completed_payment):
-        qs = get_all_payments_unrestricted()
-        ids = list(qs.values_list("id", flat=True))
-        assert ids == sorted(ids, reverse=True)
-
-    def test_empty_when_no_payments(self, db):
-        assert get_all_payments_unrestricted().count() == 0
+class TestSchoolYearsRange:
+    def test_before_september(self):
+        assert school_years_range(2, today=date(2026, 4, 10)) == (date(2024, 9, 1), date(2026, 8, 31))
+
+    def test_from_september(self):
+        assert school_years_range(2, today=date(2026, 9, 1)) == (date(2025, 9, 1), date(2027, 8, 31))
+
+
+@pytest.fixture
+def make_families(group, enrollment_type_monthly, site_config):
+    """`n` students, each with a parent, an enrollment and a payment."""
+
+    def make(n):
+        offset = Student.objects.count()
+        for i in range(offset, offset + n):
+            student = Student.objects.create(
+                first_name=f"S{i}", last_name="Test", birth_date=date(2016, 1, 1), group=group
+            )
+            parent = Parent.objects.create(
+                first_name=f"P{i}", last_name="Test", dni=f"{i:08d}Z", phone="600", email=f"p{i}@test.com"
+            )
+            StudentParent.objects.create(student=student, parent=parent)
+            enrollment = Enrollment.objects.create(
+                student=student,
+                enrollment_type=enrollment_type_monthly,
+                enrollment_period_start=date(2025, 9, 15),
+                enrollment_period_end=date(2026, 6, 27),
+                academic_year="2025-2026",
+                enrollment_amount=Decimal("54.00"),
+                final_amount=Decimal("54.00"),
+                enrollment_date=date(2025, 9, 1),
+            )
+            Payment.objects.create(
+                student=student,
+                parent=parent,
+                enrollment=enrollment,
+                amount=Decimal("54.00"),
+                due_date=date(2025, 10, 1),
+                concept=f"Mensualidad {i}",
+            )
+
+    return make
+
+
+def count_queries(client, url):
+    client.get(url)  # warm the per-process caches (site config)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+class TestListViewProjections:
+    def test_all_info_query_count_is_fixed_per_page(self, authenticated_client, make_families):
+        make_families(1)
+        one_row = count_queries(authenticated_client, reverse("all_info"))
+        make_families(15)
+        assert count_queries(authenticated_client, reverse("all_info")) == one_row
+        # one per table shown plus auth/session, the paginator counts and the navbar
+        # (not cached with the per-process test cache), never one per row
+        assert one_row == 9
+
+    def test_payments_list_query_count_is_fixed(self, authenticated_client, make_families):
+        make_families(1)
+        one_row = count_queries(authenticated_client, reverse("payments_list"))
+        make_families(10)
+        assert count_queries(authenticated_client, reverse("payments_list")) == one_row
+
+    def test_projections_defer_unused_columns(self, make_families):
+        make_families(1)
+        student = all_info_students().get()
+        assert {"email", "phone", "withdrawal_reason"} <= student.get_deferred_fields()
+        assert {"document_url", "currency"} <= all_info_payments().get().get_deferred_fields()
+        assert {"concept", "observations"} <= payments_list_payments().get().get_deferred_fields()
@@ -210,9 +210,10 @@ class TestTodoAPI:
         )
         assert response.status_code == 400
 
-    def test_complete_todo(self, authenticated_client, db):
+    def test_complete_todo(self, authenticated_client, db, django_capture_on_commit_callbacks):
         todo = TodoItem.objects.create(text="To complete", due_date=date(2025, 10, 15))
-        response = authenticated_client.post(reverse("complete_todo", kwargs={"todo_id": todo.id}))
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.post(reverse("complete_todo", kwargs={"todo_id": todo.id}))
         assert response.status_code == 200
         assert not TodoItem.objects.filter(id=todo.id).exists()
         assert HistoryLog.objects.filter(action="todo_completed").exists()
@@ -232,16 +233,64 @@ class TestHistoryAPI:
     def test_history_list_pagination(self, authenticated_client, db):
         for i in range(25):
             HistoryLog.log("payment_completed", f"Entry {i}")
-        response = authenticated_client.get(reverse("history_list") + "?offset=0")
+        response = authenticated_client.get(reverse("history_list"))
         data = response.json()
         assert len(data["entries"]) == 20
         assert data["has_more"] is True
+        assert data["entries"][0]["message"] == "Entry 24"
 
-        response = authenticated_client.get(reverse("history_list") + "?offset=20")
+        response = authenticated_client.get(reverse("history_list"), {"cursor": data["next_cursor"]})
         data = response.json()
-        assert len(data["entries"]) == 5
+        assert [e["message"] for e in data["entries"]] == [f"Entry {i}" for i in range(4, -1, -1)]
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+
+    def test_history_cursor_breaks_created_at_ties_by_id(self, authenticated_client, db):
+        HistoryLog.log_many([("email_sent", f"Same instant {i}") for i in range(25)])
+        first = authenticated_client.get(reverse("history_list")).json()
+        second = authenticated_client.get(reverse("history_list"), {"cursor": first["next_cursor"]}).json()
+        ids = [e["id"] for e in first["entries"] + second["entries"]]
+        assert len(ids) == len(set(ids)) == 25
+
+    def test_history_page_is_one_query(self, authenticated_client, db, django_assert_num_queries):
+        for i in range(25):
+            HistoryLog.log("payment_completed", f"Entry {i}")
+        cursor = HistoryLog.page_before(limit=20)[0][-1].cursor
+        with django_assert_num_queries(1):
+            entries, has_more = HistoryLog.page_before(cursor, limit=20)
+        assert len(entries) == 5
+        assert has_more is False
+
+    def test_history_since_returns_only_new_entries(self, authenticated_client, db):
+        HistoryLog.log("payment_completed", "Old")
+        latest = authenticated_client.get(reverse("history_list")).json()["latest_cursor"]
+        HistoryLog.log("payment_completed", "New 1")
+        HistoryLog.log("payment_completed", "New 2")
+
+        data = authenticated_client.get(reverse("history_list"), {"since": latest}).json()
+        assert [e["message"] for e in data["entries"]] == ["New 1", "New 2"]
         assert data["has_more"] is False
 
+        data = authenticated_client.get(reverse("history_list"), {"since": data["latest_cursor"]}).json()
+        assert data["entries"] == []
+
+    def test_history_since_pages_through_a_burst(self, db):
+        cursor = HistoryLog.log("payment_completed", "Old").cursor
+        HistoryLog.log_many([("payment_completed", f"New {i}") for i in range(250)])
+
+        messages = []
+        while True:
+            entries, has_more = HistoryLog.since(cursor)
+            messages += [e.message for e in entries]
+            if not has_more:
+                break
+            cursor = entries[-1].cursor
+        assert messages == [f"New {i}" for i in range(250)]
+
+    def test_history_invalid_cursor(self, authenticated_client, db):
+        response = authenticated_client.get(reverse("history_list"), {"cursor": "garbage"})
+        assert response.status_code == 400
+
 
 # ── Management Views ─────────────────────────────────────────────────────────
 
@@ -510,6 +559,109 @@ class TestFunFridayViews:
         assert data["deleted"] is True
 
 
+class TestFunFridayRegister:
+    def _register(self, client, student_ids, day="2025-10-03", **extra):
+        return client.post(
+            reverse("register_fun_friday_attendance"),
+            data=json.dumps({"date": day, "student_ids": student_ids, **extra}),
+            content_type="application/json",
+        )
+
+    @pytest.fixture
+    def classmates(self, group):
+        from students.models import Student
+
+        return [
+            Student.objects.create(first_name=f"Kid{i}", last_name="Test", birth_date=date(2016, 1, 1), group=group)
+            for i in range(3)
+        ]
+
+    def test_reconciles_in_fixed_queries(self, authenticated_client, classmates, django_assert_max_num_queries):
+        from core.models import FunFridayAttendance
+
+        a, b, c = classmates
+        FunFridayAttendance.objects.create(student=a, date=date(2025, 10, 3))
+        FunFridayAttendance.objects.create(student=b, date=date(2025, 10, 3))
+        FunFridayAttendance.objects.create(student=a, date=date(2025, 10, 10))
+
+        authenticated_client.get(reverse("home"))  # warm session/user caches
+        # session, register ids, savepoint, existing rows, INSERT, DELETE, release
+        with django_assert_max_num_queries(7):
+            response = self._register(authenticated_client, [b.id, c.id], group_id=a.group_id)
+        assert response.json() == {"success": True, "date": "2025-10-03", "added": 1, "removed": 1, "attending": 2}
+        assert set(FunFridayAttendance.objects.filter(date=date(2025, 10, 3)).values_list("student_id", flat=True)) == {
+            b.id,
+            c.id,
+        }
+        # Other Fridays are untouched
+        assert FunFridayAttendance.objects.filter(student=a, date=date(2025, 10, 10)).exists()
+
+    def test_group_register_leaves_other_groups(self, authenticated_client, classmates, student):
+        from core.models import FunFridayAttendance
+        from students.models import Group
+
+        other = Group.objects.create(group_name="Other", color="#000000", teacher=student.group.teacher)
+        outsider = classmates[0]
+        outsider.group = other
+        outsider.save()
+        FunFridayAttendance.objects.create(student=outsider, date=date(2025, 10, 3))
+
+        response = self._register(authenticated_client, [student.id], group_id=student.group_id)
+        assert response.json()["removed"] == 0
+        assert FunFridayAttendance.objects.filter(student=outsider, date=date(2025, 10, 3)).exists()
+
+    def test_rejects_students_outside_register(self, authenticated_client, adult_student):
+        response = self._register(authenticated_client, [adult_student.id], full_school=True)
+        assert response.status_code == 400
+        assert response.json()["student_ids"] == [adult_student.id]
+
+    def test_rejects_non_friday(self, authenticated_client, student):
+        assert (
+            self._register(authenticated_client, [student.id], day="2025-10-02", group_id=student.group_id).status_code
+            == 400
+        )
+
+    def test_requires_group_or_full_school(self, authenticated_client, classmates, student):
+        from core.models import FunFridayAttendance
+
+        FunFridayAttendance.objects.create(student=classmates[0], date=date(2025, 10, 3))
+        response = self._register(authenticated_client, [student.id])
+        assert response.status_code == 400
+        assert FunFridayAttendance.objects.filter(student=classmates[0]).exists()
+
+        response = self._register(authenticated_client, [student.id], full_school=True)
+        assert response.json()["removed"] == 1
+
+
+class TestFunFridaySeasonMatrix:
+    def test_bitset_per_student(self, authenticated_client, student):
+        from core.models import FunFridayAttendance
+
+        for day in (date(2025, 9, 5), date(2025, 9, 19), date(2026, 8, 28)):
+            FunFridayAttendance.objects.create(student=student, date=day)
+        FunFridayAttendance.objects.create(student=student, date=date(2025, 8, 29))  # previous season
+
+        response = authenticated_client.get(reverse("fun_friday_season_matrix"), {"season": "2025"})
+        data = response.json()
+        assert data["season"] == "2025-2026"
+        assert data["fridays"][0] == "2025-09-05"
+        assert data["fridays"][-1] == "2026-08-28"
+        mask = int(data["students"][str(student.id)], 16)
+        assert mask == (1 << 0) | (1 << 2) | (1 << (len(data["fridays"]) - 1))
+
+    def test_group_filter_and_invalid_params(self, authenticated_client, student, group):
+        from core.models import FunFridayAttendance
+
+        FunFridayAttendance.objects.create(student=student, date=date(2025, 9, 5))
+        response = authenticated_client.get(
+            reverse("fun_friday_season_matrix"), {"season": "2025", "group_id": group.id + 1}
+        )
+        assert response.json()["students"] == {}
+        for season in ("x", "0", "10000", "1999"):
+            response = authenticated_client.get(reverse("fun_friday_season_matrix"), {"season": season})
+            assert response.status_code == 400
+
+
 # ── Support ─────────────────────────────────────────────────────────────────
 
 